@@ -1,24 +1,101 @@
 from __future__ import annotations
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from bcb.exceptions import (
     BCBError,
     BCBAPIError,
     CurrencyNotFoundError,
+    DeadlineExceededError,
     SGSError,
     ODataError,
 )
-from bcb.odata.api import (
-    ODataAPI,
-    Expectativas,
-    PTAX,
-    IFDATA,
-    TaxaJuros,
-    MercadoImobiliario,
-    SPI,
-    TarifasBancariasPorInstituicaoFinanceira,
-    TarifasBancariasPorServico,
-    PostosAtendimentoEletronicoPorInstituicaoFinanceira,
-    PostosAtendimentoCorrespondentesPorInstituicaoFinanceira,
-    EstatisticasSTR,
-    DinheiroCirculacao,
+
+if TYPE_CHECKING:
+    from bcb.client import AsyncClient, Client
+    from bcb.runner import as_completed, submit
+    from bcb.odata.api import (
+        ODataAPI,
+        Expectativas,
+        PTAX,
+        IFDATA,
+        TaxaJuros,
+        MercadoImobiliario,
+        SPI,
+        TarifasBancariasPorInstituicaoFinanceira,
+        TarifasBancariasPorServico,
+        PostosAtendimentoEletronicoPorInstituicaoFinanceira,
+        PostosAtendimentoCorrespondentesPorInstituicaoFinanceira,
+        EstatisticasSTR,
+        DinheiroCirculacao,
+    )
+
+# OData classes, sessions and the futures API are loaded on first access (PEP 562), so
+# ``import bcb`` does not import pandas, lxml, httpx or the OData framework.
+_LAZY_ATTRIBUTES = {
+    name: "bcb.odata.api"
+    for name in (
+        "ODataAPI",
+        "Expectativas",
+        "PTAX",
+        "IFDATA",
+        "TaxaJuros",
+        "MercadoImobiliario",
+        "SPI",
+        "TarifasBancariasPorInstituicaoFinanceira",
+        "TarifasBancariasPorServico",
+        "PostosAtendimentoEletronicoPorInstituicaoFinanceira",
+        "PostosAtendimentoCorrespondentesPorInstituicaoFinanceira",
+        "EstatisticasSTR",
+        "DinheiroCirculacao",
+    )
+}
+_LAZY_ATTRIBUTES.update(
+    {
+        "Client": "bcb.client",
+        "AsyncClient": "bcb.client",
+        "submit": "bcb.runner",
+        "as_completed": "bcb.runner",
+    }
 )
+
+# Submodules reachable as ``bcb.<name>`` after a bare ``import bcb``
+_LAZY_SUBMODULES = {
+    "client",
+    "currency",
+    "datacache",
+    "deadline",
+    "http",
+    "odata",
+    "parallel",
+    "runner",
+    "sgs",
+    "testing",
+    "utils",
+}
+
+__all__ = [
+    "BCBError",
+    "BCBAPIError",
+    "CurrencyNotFoundError",
+    "DeadlineExceededError",
+    "SGSError",
+    "ODataError",
+    *_LAZY_ATTRIBUTES,
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(module_name), name)
+        globals()[name] = value
+        return value
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"bcb.{name}")
+    raise AttributeError(f"module 'bcb' has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, *_LAZY_SUBMODULES})
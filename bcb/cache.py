@@ -0,0 +1,582 @@
+"""Persistent HTTP response cache for python-bcb.
+
+Responses are stored on disk keyed by method and canonical URL (query
+parameters sorted) and revalidated with conditional GETs using the
+``ETag`` and ``Last-Modified`` validators returned by BCB.
+
+Bodies of spooled requests (see :mod:`bcb.spool`) are streamed into the
+cache directory and replayed from there, never held in memory whole.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Optional, Union
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from bcb.spool import FileStream, spool_threshold
+
+logger = logging.getLogger(__name__)
+
+# Header used to tell callers how a response was produced by the cache.
+CACHE_STATUS_HEADER = "X-BCB-Cache"
+
+# Headers describing the wire encoding of the original body.  Cached bodies
+# are stored decoded, so these must not be replayed.
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def replayable_headers(headers: httpx.Headers) -> list[tuple[str, str]]:
+    """Headers of a buffered response that are safe to replay.
+
+    Wire-encoding headers are dropped because the buffered body is already
+    decoded.
+    """
+    return [
+        (k, v)
+        for k, v in headers.multi_items()
+        if k.lower() not in _HOP_HEADERS and k.lower() != CACHE_STATUS_HEADER.lower()
+    ]
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory.
+
+    Uses ``BCB_CACHE_DIR`` when set, otherwise ``$XDG_CACHE_HOME/python-bcb``
+    or ``~/.cache/python-bcb``.
+    """
+    env_dir = os.environ.get("BCB_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "python-bcb"
+
+
+def cache_key(method: str, url: Union[str, httpx.URL]) -> str:
+    """Build the cache key for a request.
+
+    Query parameters are sorted so that the same URL+params combination maps
+    to the same entry regardless of parameter order.
+    """
+    url = httpx.URL(str(url))
+    query = urlencode(sorted(parse_qsl(url.query.decode(), keep_blank_values=True)))
+    canonical = f"{method.upper()} {url.copy_with(query=query.encode() or None)}"
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A response body and the metadata needed to revalidate it.
+
+    Attributes
+    ----------
+    url : str
+        Request URL the response belongs to
+    status_code : int
+        HTTP status of the stored response
+    headers : list[tuple[str, str]]
+        Response headers, without wire-encoding headers
+    content : bytes
+        Decoded response body, empty when it is read from ``body_path``
+    stored_at : float
+        Epoch timestamp of the last successful fetch or revalidation
+    body_path : Path, optional
+        File the body is streamed from instead of ``content``
+    """
+
+    url: str
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes = field(repr=False)
+    stored_at: float
+    body_path: Optional[Path] = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._header("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self._header("last-modified")
+
+    def _header(self, name: str) -> Optional[str]:
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, cache_status: str) -> httpx.Response:
+        headers = [*self.headers, (CACHE_STATUS_HEADER, cache_status)]
+        if self.body_path is not None:
+            stream = FileStream(self.body_path.open("rb"))
+            return httpx.Response(self.status_code, headers=headers, stream=stream)
+        return httpx.Response(self.status_code, headers=headers, content=self.content)
+
+
+class PendingBody:
+    """A response body being streamed into the cache directory.
+
+    Chunks go to a temporary file next to the entry, which
+    :meth:`HTTPCache.store_streamed` moves into place.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        self._file: IO[bytes] = os.fdopen(fd, "wb")
+        self.path = path
+        self.location = Path(tmp)
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self.location, self.path)
+        self.location = self.path
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self.location)
+        except FileNotFoundError:
+            pass
+
+
+class HTTPCache:
+    """On-disk store of HTTP responses.
+
+    Each entry is a pair of files: ``<key>.json`` holding status, headers and
+    timestamps, and ``<key>.body`` holding the decoded body.  Writes are
+    atomic, so concurrent processes sharing a directory never observe
+    partial entries.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cache directory. Defaults to :func:`default_cache_dir`.
+    ttl : float, default 0
+        Seconds during which a stored response is served without contacting
+        BCB. With ``0`` every use triggers a conditional GET.
+    stale_while_revalidate : float, default 0
+        Seconds after ``ttl`` expires during which the stale response is
+        served immediately while it is revalidated in the background.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path, None] = None,
+        *,
+        ttl: float = 0.0,
+        stale_while_revalidate: float = 0.0,
+    ) -> None:
+        if ttl < 0 or stale_while_revalidate < 0:
+            raise ValueError("ttl and stale_while_revalidate must be non-negative")
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"HTTPCache(directory={str(self.directory)!r}, ttl={self.ttl}, "
+            f"stale_while_revalidate={self.stale_while_revalidate})"
+        )
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.age() <= self.ttl
+
+    def is_stale_usable(self, entry: CachedResponse) -> bool:
+        return entry.age() <= self.ttl + self.stale_while_revalidate
+
+    def load(self, key: str, *, stream: bool = False) -> Optional[CachedResponse]:
+        """Return the stored entry for ``key`` or ``None``.
+
+        With ``stream=True`` the body is left on disk and the entry's
+        responses read it from ``body_path``.
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            content = b"" if stream else body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if stream and not body_path.is_file():
+            return None
+        try:
+            return CachedResponse(
+                url=meta["url"],
+                status_code=int(meta["status_code"]),
+                headers=[(str(k), str(v)) for k, v in meta["headers"]],
+                content=content,
+                stored_at=float(meta["stored_at"]),
+                body_path=body_path if stream else None,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(
+        self, key: str, url: str, response: httpx.Response, content: bytes
+    ) -> CachedResponse:
+        """Persist a response body and metadata."""
+        entry = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            headers=replayable_headers(response.headers),
+            content=content,
+            stored_at=time.time(),
+        )
+        self._write(key, entry, write_body=True)
+        return entry
+
+    def begin_body(self, key: str) -> Optional[PendingBody]:
+        """Start streaming a body for ``key``, or ``None`` if it can't be written."""
+        try:
+            return PendingBody(self._paths(key)[1])
+        except OSError as ex:
+            logger.warning(f"Could not write HTTP cache entry {key}: {ex}")
+            return None
+
+    def store_streamed(
+        self, key: str, url: str, response: httpx.Response, body: PendingBody
+    ) -> CachedResponse:
+        """Persist the metadata of a response whose body was streamed to ``body``."""
+        entry = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            headers=replayable_headers(response.headers),
+            content=b"",
+            stored_at=time.time(),
+        )
+        try:
+            with self._lock:
+                body.commit()
+                self._write_meta(key, entry)
+        except OSError as ex:
+            logger.warning(f"Could not write HTTP cache entry {key}: {ex}")
+        entry.body_path = body.location
+        return entry
+
+    def refresh(
+        self, key: str, entry: CachedResponse, not_modified: httpx.Response
+    ) -> CachedResponse:
+        """Update an entry after a ``304 Not Modified`` revalidation."""
+        headers = dict((k.lower(), (k, v)) for k, v in entry.headers)
+        for name in ("etag", "last-modified", "cache-control", "expires", "date"):
+            value = not_modified.headers.get(name)
+            if value is not None:
+                headers[name] = (name, value)
+        entry.headers = list(headers.values())
+        entry.stored_at = time.time()
+        self._write(key, entry, write_body=False)
+        return entry
+
+    def _write(self, key: str, entry: CachedResponse, *, write_body: bool) -> None:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                if write_body:
+                    _atomic_write(body_path, entry.content)
+                self._write_meta(key, entry)
+        except OSError as ex:
+            logger.warning(f"Could not write HTTP cache entry {meta_path}: {ex}")
+
+    def _write_meta(self, key: str, entry: CachedResponse) -> None:
+        meta = {
+            "url": entry.url,
+            "status_code": entry.status_code,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+        }
+        _atomic_write(self._paths(key)[0], json.dumps(meta).encode())
+
+    def delete(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every entry from the cache directory."""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*/*"):
+            if path.suffix in (".json", ".body"):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _is_cacheable_request(request: httpx.Request) -> bool:
+    if request.method != "GET":
+        return False
+    cache_control = request.headers.get("Cache-Control", "").lower()
+    return "no-store" not in cache_control
+
+
+def _is_cacheable_response(response: httpx.Response) -> bool:
+    if response.status_code != 200:
+        return False
+    cache_control = response.headers.get("Cache-Control", "").lower()
+    return "no-store" not in cache_control
+
+
+def _conditional_request(
+    request: httpx.Request, entry: CachedResponse
+) -> httpx.Request:
+    headers = httpx.Headers(request.headers)
+    headers.update(entry.validators())
+    return httpx.Request(
+        request.method,
+        request.url,
+        headers=headers,
+        extensions=request.extensions,
+    )
+
+
+# Threads a CacheTransport uses to revalidate stale entries in the background
+_REVALIDATION_THREADS = 4
+
+
+class CacheTransport(httpx.BaseTransport):
+    """Transport wrapper that serves and revalidates cached responses.
+
+    Parameters
+    ----------
+    transport : httpx.BaseTransport
+        Transport that performs the actual network requests.
+    cache : HTTPCache
+        Response store.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, cache: HTTPCache) -> None:
+        self._transport = transport
+        self.cache = cache
+        self._revalidating: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_cacheable_request(request):
+            return self._transport.handle_request(request)
+        key = cache_key(request.method, request.url)
+        entry = self.cache.load(key, stream=spool_threshold(request) is not None)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                logger.debug(f"HTTP cache hit for {request.url}")
+                return entry.to_response("HIT")
+            if self.cache.is_stale_usable(entry):
+                logger.debug(f"HTTP cache stale hit for {request.url}, revalidating")
+                self._revalidate_in_background(request, key, entry)
+                return entry.to_response("STALE")
+        return self._fetch(request, key, entry)
+
+    def _revalidate_in_background(
+        self, request: httpx.Request, key: str, entry: CachedResponse
+    ) -> None:
+        # At most one revalidation per key, on a small pool shared by the
+        # transport; the caller's contextvars go along with it
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=_REVALIDATION_THREADS,
+                    thread_name_prefix="bcb-revalidate",
+                )
+            executor = self._executor
+        context = contextvars.copy_context()
+        try:
+            executor.submit(context.run, self._revalidate_quietly, request, key, entry)
+        except RuntimeError:  # transport closed meanwhile
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _revalidate_quietly(
+        self, request: httpx.Request, key: str, entry: CachedResponse
+    ) -> None:
+        try:
+            response = self._fetch(request, key, entry)
+            response.close()
+        except Exception as ex:  # background refresh must never raise
+            logger.debug(f"Background revalidation of {request.url} failed: {ex}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _fetch(
+        self, request: httpx.Request, key: str, entry: Optional[CachedResponse]
+    ) -> httpx.Response:
+        sent = request if entry is None else _conditional_request(request, entry)
+        response = self._transport.handle_request(sent)
+        if entry is not None and response.status_code == 304:
+            response.close()
+            logger.debug(f"HTTP cache revalidated {request.url} (304)")
+            return self.cache.refresh(key, entry, response).to_response("REVALIDATED")
+        if not _is_cacheable_response(response):
+            return response
+        if spool_threshold(request) is not None:
+            return self._store_streamed(request, key, response)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        stored = self.cache.store(key, str(request.url), response, content)
+        return stored.to_response("MISS")
+
+    def _store_streamed(
+        self, request: httpx.Request, key: str, response: httpx.Response
+    ) -> httpx.Response:
+        body = self.cache.begin_body(key)
+        if body is None:
+            return response
+        try:
+            for chunk in response.iter_bytes():
+                body.write(chunk)
+        except BaseException:
+            body.discard()
+            raise
+        finally:
+            response.close()
+        stored = self.cache.store_streamed(key, str(request.url), response, body)
+        return stored.to_response("MISS")
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._transport.close()
+
+
+class AsyncCacheTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`CacheTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache: HTTPCache) -> None:
+        self._transport = transport
+        self.cache = cache
+        self._background: set[asyncio.Task[Any]] = set()
+        self._revalidating: set[str] = set()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_cacheable_request(request):
+            return await self._transport.handle_async_request(request)
+        key = cache_key(request.method, request.url)
+        entry = self.cache.load(key, stream=spool_threshold(request) is not None)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                logger.debug(f"HTTP cache hit for {request.url}")
+                return entry.to_response("HIT")
+            if self.cache.is_stale_usable(entry):
+                logger.debug(f"HTTP cache stale hit for {request.url}, revalidating")
+                if key not in self._revalidating:
+                    # At most one revalidation per key
+                    self._revalidating.add(key)
+                    task = asyncio.create_task(
+                        self._revalidate_quietly(request, key, entry)
+                    )
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return entry.to_response("STALE")
+        return await self._fetch(request, key, entry)
+
+    async def _revalidate_quietly(
+        self, request: httpx.Request, key: str, entry: CachedResponse
+    ) -> None:
+        try:
+            response = await self._fetch(request, key, entry)
+            await response.aclose()
+        except Exception as ex:  # background refresh must never raise
+            logger.debug(f"Background revalidation of {request.url} failed: {ex}")
+        finally:
+            self._revalidating.discard(key)
+
+    async def _fetch(
+        self, request: httpx.Request, key: str, entry: Optional[CachedResponse]
+    ) -> httpx.Response:
+        sent = request if entry is None else _conditional_request(request, entry)
+        response = await self._transport.handle_async_request(sent)
+        if entry is not None and response.status_code == 304:
+            await response.aclose()
+            logger.debug(f"HTTP cache revalidated {request.url} (304)")
+            return self.cache.refresh(key, entry, response).to_response("REVALIDATED")
+        if not _is_cacheable_response(response):
+            return response
+        if spool_threshold(request) is not None:
+            return await self._store_streamed(request, key, response)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        stored = self.cache.store(key, str(request.url), response, content)
+        return stored.to_response("MISS")
+
+    async def _store_streamed(
+        self, request: httpx.Request, key: str, response: httpx.Response
+    ) -> httpx.Response:
+        body = self.cache.begin_body(key)
+        if body is None:
+            return response
+        try:
+            async for chunk in response.aiter_bytes():
+                body.write(chunk)
+        except BaseException:
+            body.discard()
+            raise
+        finally:
+            await response.aclose()
+        stored = self.cache.store_streamed(key, str(request.url), response, body)
+        return stored.to_response("MISS")
+
+    async def aclose(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await self._transport.aclose()
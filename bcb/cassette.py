@@ -0,0 +1,312 @@
+"""Record and replay BCB responses for offline, reproducible runs.
+
+A cassette is a directory of recorded responses keyed by method and
+canonical URL -- the same key used by :mod:`bcb.cache`, so the query
+parameters built by :mod:`bcb.sgs`, :mod:`bcb.currency` and OData queries
+match regardless of their order.  On replay the recorded time to first
+byte and transfer rate can be simulated, so parse and fan-out changes can
+be benchmarked against production-sized payloads without network noise::
+
+    from bcb import http, sgs
+
+    http.set_cassette("cassettes/sgs", mode="record")
+    sgs.get([1, 433], start="2000-01-01")
+
+    http.set_cassette("cassettes/sgs", mode="replay")
+    sgs.get([1, 433], start="2000-01-01")  # offline
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Literal, Optional, Union
+
+import httpx
+
+from bcb.cache import _atomic_write, cache_key, replayable_headers
+from bcb.exceptions import CassetteMissError
+
+logger = logging.getLogger(__name__)
+
+CassetteMode = Literal["record", "replay", "auto"]
+
+# Bytes released per step when simulating bandwidth
+_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Recording:
+    """A recorded response and its timings.
+
+    Attributes
+    ----------
+    method : str
+        Request method
+    url : str
+        Request URL, including query parameters
+    status_code : int
+        HTTP status of the response
+    headers : list[tuple[str, str]]
+        Response headers, without wire-encoding headers
+    content : bytes
+        Decoded response body
+    elapsed : float
+        Seconds until the response headers arrived
+    transfer : float
+        Seconds spent reading the body
+    """
+
+    method: str
+    url: str
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes = field(repr=False)
+    elapsed: float
+    transfer: float
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        if self.transfer <= 0:
+            return None
+        return len(self.content) / self.transfer
+
+
+class _ThrottledStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Body released in chunks at ``bytes_per_second``."""
+
+    def __init__(self, content: bytes, bytes_per_second: float) -> None:
+        self._content = content
+        self._rate = bytes_per_second
+
+    def _chunks(self) -> Iterator[bytes]:
+        for start in range(0, len(self._content), _CHUNK_SIZE):
+            yield self._content[start : start + _CHUNK_SIZE]
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks():
+            time.sleep(len(chunk) / self._rate)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks():
+            await asyncio.sleep(len(chunk) / self._rate)
+            yield chunk
+
+
+class Cassette:
+    """Directory of recorded responses.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Where recordings are stored, one ``.json``/``.body`` pair per
+        request under a folder per host.
+    mode : {"auto", "record", "replay"}, default "auto"
+        ``record`` always hits the network and overwrites recordings,
+        ``replay`` never does and raises :class:`CassetteMissError` for
+        unknown requests, ``auto`` replays known requests and records the
+        others.
+    latency : "recorded", float or None, default "recorded"
+        Delay before replayed headers: the recorded time to first byte, a
+        fixed number of seconds, or none.
+    bandwidth : "recorded", float or None, default "recorded"
+        Rate at which replayed bodies are released: the recorded transfer
+        rate, a fixed number of bytes per second, or instantly.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        mode: CassetteMode = "auto",
+        latency: Union[Literal["recorded"], float, None] = "recorded",
+        bandwidth: Union[Literal["recorded"], float, None] = "recorded",
+    ) -> None:
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"mode must be record, replay or auto, got {mode!r}")
+        if isinstance(bandwidth, (int, float)) and bandwidth <= 0:
+            raise ValueError(f"bandwidth must be positive, got {bandwidth!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def __repr__(self) -> str:
+        return (
+            f"Cassette(directory={str(self.directory)!r}, mode={self.mode!r}, "
+            f"latency={self.latency!r}, bandwidth={self.bandwidth!r})"
+        )
+
+    def _paths(self, request: httpx.Request) -> tuple[Path, Path]:
+        key = cache_key(request.method, request.url)
+        folder = self.directory / (request.url.host or "_")
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def load(self, request: httpx.Request) -> Optional[Recording]:
+        """Return the recording for ``request`` or ``None``."""
+        meta_path, body_path = self._paths(request)
+        try:
+            meta = json.loads(meta_path.read_text())
+            content = body_path.read_bytes()
+            return Recording(
+                method=meta["method"],
+                url=meta["url"],
+                status_code=int(meta["status_code"]),
+                headers=[(str(k), str(v)) for k, v in meta["headers"]],
+                content=content,
+                elapsed=float(meta["elapsed"]),
+                transfer=float(meta["transfer"]),
+            )
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def save(self, request: httpx.Request, recording: Recording) -> None:
+        """Write ``recording`` as the response to ``request``."""
+        meta_path, body_path = self._paths(request)
+        meta = {
+            "method": recording.method,
+            "url": recording.url,
+            "status_code": recording.status_code,
+            "headers": recording.headers,
+            "elapsed": recording.elapsed,
+            "transfer": recording.transfer,
+        }
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(body_path, recording.content)
+        _atomic_write(meta_path, json.dumps(meta, indent=1).encode())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*/*.json"))
+
+    def replay_delay(self, recording: Recording) -> float:
+        """Seconds to wait before returning the replayed headers."""
+        if self.latency == "recorded":
+            return recording.elapsed
+        return float(self.latency or 0.0)
+
+    def _bytes_per_second(self, recording: Recording) -> Optional[float]:
+        if self.bandwidth == "recorded":
+            return recording.bytes_per_second
+        return self.bandwidth
+
+    def response(self, recording: Recording) -> httpx.Response:
+        """Build the replayed response for ``recording``."""
+        headers = [*recording.headers, ("Content-Length", str(len(recording.content)))]
+        rate = self._bytes_per_second(recording)
+        if rate is None or not recording.content:
+            return httpx.Response(
+                recording.status_code, headers=headers, content=recording.content
+            )
+        return httpx.Response(
+            recording.status_code,
+            headers=headers,
+            stream=_ThrottledStream(recording.content, rate),
+        )
+
+    def lookup(self, request: httpx.Request) -> Optional[Recording]:
+        """Recording to replay for ``request``, ``None`` to go to the network."""
+        if self.mode == "record":
+            return None
+        recording = self.load(request)
+        if recording is None and self.mode == "replay":
+            raise CassetteMissError(
+                f"No recorded response for {request.method} {request.url} "
+                f"in {self.directory}",
+                str(request.url),
+            )
+        return recording
+
+
+def _recording(
+    request: httpx.Request,
+    response: httpx.Response,
+    content: bytes,
+    elapsed: float,
+    transfer: float,
+) -> Recording:
+    return Recording(
+        method=request.method,
+        url=str(request.url),
+        status_code=response.status_code,
+        headers=replayable_headers(response.headers),
+        content=content,
+        elapsed=elapsed,
+        transfer=transfer,
+    )
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Transport that records to or replays from a :class:`Cassette`.
+
+    Parameters
+    ----------
+    transport : httpx.BaseTransport
+        Network transport used when recording.
+    cassette : Cassette
+        Recording store and replay settings.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, cassette: Cassette) -> None:
+        self._transport = transport
+        self.cassette = cassette
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        recording = self.cassette.lookup(request)
+        if recording is not None:
+            logger.debug(f"Replaying {request.method} {request.url}")
+            time.sleep(self.cassette.replay_delay(recording))
+            return self.cassette.response(recording)
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        elapsed = time.perf_counter() - started
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        transfer = time.perf_counter() - started - elapsed
+        recording = _recording(request, response, content, elapsed, transfer)
+        self.cassette.save(request, recording)
+        logger.debug(f"Recorded {request.method} {request.url}")
+        return httpx.Response(
+            recording.status_code, headers=recording.headers, content=content
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`CassetteTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cassette: Cassette) -> None:
+        self._transport = transport
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        recording = self.cassette.lookup(request)
+        if recording is not None:
+            logger.debug(f"Replaying {request.method} {request.url}")
+            await asyncio.sleep(self.cassette.replay_delay(recording))
+            return self.cassette.response(recording)
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        elapsed = time.perf_counter() - started
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        transfer = time.perf_counter() - started - elapsed
+        recording = _recording(request, response, content, elapsed, transfer)
+        self.cassette.save(request, recording)
+        logger.debug(f"Recorded {request.method} {request.url}")
+        return httpx.Response(
+            recording.status_code, headers=recording.headers, content=content
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,322 @@
+"""Per-host circuit breaker for the shared HTTP clients.
+
+When a BCB host keeps failing -- connection errors, timeouts or ``5xx``
+responses -- its circuit opens and further requests fail immediately with
+:class:`~bcb.exceptions.BCBCircuitOpenError` instead of waiting for
+timeouts and retries.  Cached responses, when the HTTP cache is enabled,
+are served instead of failing.  After ``recovery_time`` a single probe is
+let through (half-open): success closes the circuit, failure opens it again.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Literal, Optional
+
+import httpx
+
+from bcb.cache import CACHE_STATUS_HEADER, HTTPCache, cache_key
+from bcb.exceptions import BCBCircuitOpenError
+from bcb.metrics import METRICS, MetricsRegistry, endpoint_of
+
+logger = logging.getLogger(__name__)
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class _HostCircuit:
+    def __init__(self) -> None:
+        self.state: CircuitState = "closed"
+        self.opened_at = 0.0
+        self.outcomes: deque[tuple[float, bool]] = deque()
+        self.probes = 0
+
+    def trim(self, now: float, window: float) -> None:
+        horizon = now - window
+        while self.outcomes and self.outcomes[0][0] < horizon:
+            self.outcomes.popleft()
+
+    def failures(self) -> int:
+        return sum(1 for _, failed in self.outcomes if failed)
+
+
+class CircuitBreaker:
+    """Failure tracking and open/half-open/closed state for each host.
+
+    Parameters
+    ----------
+    failure_rate : float, default 0.5
+        Share of failed requests, over the last ``window`` seconds, that
+        opens the circuit.
+    min_requests : int, default 5
+        Requests needed in the window before the circuit may open.
+    window : float, default 30.0
+        Length of the failure-rate window, in seconds.
+    recovery_time : float, default 30.0
+        Seconds an open circuit waits before letting a probe through.
+    half_open_probes : int, default 1
+        Probes allowed in flight while half-open.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        min_requests: int = 5,
+        window: float = 30.0,
+        recovery_time: float = 30.0,
+        half_open_probes: int = 1,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        if not 0 < failure_rate <= 1:
+            raise ValueError(f"failure_rate must be in (0, 1], got {failure_rate!r}")
+        if min_requests < 1 or half_open_probes < 1:
+            raise ValueError("min_requests and half_open_probes must be at least 1")
+        if window <= 0 or recovery_time < 0:
+            raise ValueError("window must be positive and recovery_time non-negative")
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.recovery_time = recovery_time
+        self.half_open_probes = half_open_probes
+        self.registry = registry
+        self._circuits: dict[str, _HostCircuit] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"CircuitBreaker(failure_rate={self.failure_rate}, "
+            f"min_requests={self.min_requests}, window={self.window}, "
+            f"recovery_time={self.recovery_time})"
+        )
+
+    def _circuit(self, host: str) -> _HostCircuit:
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _HostCircuit()
+        return circuit
+
+    def state(self, host: str) -> CircuitState:
+        """Current state of the circuit for ``host``."""
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "open" and self._recovered(circuit):
+                return "half_open"
+            return circuit.state
+
+    def _recovered(self, circuit: _HostCircuit) -> bool:
+        return time.monotonic() - circuit.opened_at >= self.recovery_time
+
+    def retry_after(self, host: str) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state != "open":
+                return 0.0
+            elapsed = time.monotonic() - circuit.opened_at
+            return max(0.0, self.recovery_time - elapsed)
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to ``host`` may be sent now.
+
+        Every allowed request must be followed by :meth:`record` or
+        :meth:`release`, so half-open probe slots are returned.
+        """
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "closed":
+                return True
+            if circuit.state == "open":
+                if not self._recovered(circuit):
+                    return False
+                logger.info(f"Circuit for {host} is half-open, probing")
+                circuit.state = "half_open"
+            if circuit.probes >= self.half_open_probes:
+                return False
+            circuit.probes += 1
+            return True
+
+    def record(self, host: str, *, failed: bool) -> None:
+        """Account for the outcome of an allowed request."""
+        with self._lock:
+            circuit = self._circuit(host)
+            now = time.monotonic()
+            if circuit.state == "half_open":
+                circuit.probes = max(0, circuit.probes - 1)
+                if failed:
+                    self._open(host, circuit, now)
+                else:
+                    logger.info(f"Circuit for {host} closed")
+                    circuit.state = "closed"
+                    circuit.outcomes.clear()
+                return
+            if circuit.state == "open":
+                return
+            circuit.outcomes.append((now, failed))
+            circuit.trim(now, self.window)
+            total = len(circuit.outcomes)
+            if (
+                failed
+                and total >= self.min_requests
+                and circuit.failures() >= self.failure_rate * total
+            ):
+                self._open(host, circuit, now)
+
+    def release(self, host: str) -> None:
+        """Return the slot of an allowed request that had no outcome."""
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "half_open":
+                circuit.probes = max(0, circuit.probes - 1)
+
+    def _open(self, host: str, circuit: _HostCircuit, now: float) -> None:
+        logger.warning(
+            f"Circuit for {host} opened; failing fast for {self.recovery_time:g}s"
+        )
+        circuit.state = "open"
+        circuit.opened_at = now
+        circuit.outcomes.clear()
+        self.registry.increment("circuit_opens")
+
+    def rejected(self, request: httpx.Request) -> BCBCircuitOpenError:
+        """Count a fail-fast rejection and build its exception."""
+        host = request.url.host
+        self.registry.increment(
+            "circuit_rejections", host=host, endpoint=endpoint_of(request.url)
+        )
+        return BCBCircuitOpenError(
+            f"Circuit for {host} is open after repeated failures",
+            host,
+            self.retry_after(host),
+        )
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """State and recent failure counts of every host seen so far."""
+        with self._lock:
+            hosts = list(self._circuits)
+        result = {}
+        for host in hosts:
+            state = self.state(host)
+            with self._lock:
+                circuit = self._circuit(host)
+                circuit.trim(time.monotonic(), self.window)
+                result[host] = {
+                    "state": state,
+                    "requests": len(circuit.outcomes),
+                    "failures": circuit.failures(),
+                }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._circuits.clear()
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500
+
+
+def _is_cached(response: httpx.Response) -> bool:
+    return response.headers.get(CACHE_STATUS_HEADER) in ("HIT", "STALE")
+
+
+def _fallback(
+    request: httpx.Request, cache: Optional[HTTPCache]
+) -> Optional[httpx.Response]:
+    # Serve whatever the cache holds, however old, while the circuit is open
+    if cache is None or request.method != "GET":
+        return None
+    entry = cache.load(cache_key(request.method, request.url))
+    if entry is None:
+        return None
+    logger.warning(f"Circuit open, serving cached response for {request.url}")
+    return entry.to_response("STALE")
+
+
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """Transport wrapper that fails fast for hosts with an open circuit.
+
+    Parameters
+    ----------
+    transport : httpx.BaseTransport
+        Transport that performs the requests.
+    breaker : CircuitBreaker
+        Per-host circuit state.
+    cache : HTTPCache, optional
+        Cache whose entries are served while a circuit is open.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        breaker: CircuitBreaker,
+        cache: Optional[HTTPCache] = None,
+    ) -> None:
+        self._transport = transport
+        self.breaker = breaker
+        self.cache = cache
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if not self.breaker.allow(host):
+            fallback = _fallback(request, self.cache)
+            if fallback is not None:
+                return fallback
+            raise self.breaker.rejected(request)
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.TransportError:
+            self.breaker.record(host, failed=True)
+            raise
+        except BaseException:
+            self.breaker.release(host)
+            raise
+        if _is_cached(response):
+            self.breaker.release(host)
+        else:
+            self.breaker.record(host, failed=_is_failure(response))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncCircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`CircuitBreakerTransport`."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        breaker: CircuitBreaker,
+        cache: Optional[HTTPCache] = None,
+    ) -> None:
+        self._transport = transport
+        self.breaker = breaker
+        self.cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if not self.breaker.allow(host):
+            fallback = _fallback(request, self.cache)
+            if fallback is not None:
+                return fallback
+            raise self.breaker.rejected(request)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.breaker.record(host, failed=True)
+            raise
+        except BaseException:
+            self.breaker.release(host)
+            raise
+        if _is_cached(response):
+            self.breaker.release(host)
+        else:
+            self.breaker.record(host, failed=_is_failure(response))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,379 @@
+"""Independent sessions with their own clients, caches and metrics.
+
+The module-level functions of :mod:`bcb.sgs`, :mod:`bcb.currency` and the
+OData APIs share one set of HTTP clients configured through
+:mod:`bcb.http`.  A :class:`Client` carries its own connection pool, rate
+limiter, response cache, circuit breaker and metrics registry, plus its own
+currency table and OData metadata caches, so two sessions in the same
+process never interfere::
+
+    import bcb
+    from bcb.ratelimit import RateLimiter
+
+    with bcb.Client(timeout=60, rate_limiter=RateLimiter(5)) as client:
+        df = client.sgs.get({"selic": 432}, last=10)
+        ptax = client.PTAX()
+        ep = ptax.get_endpoint("CotacaoMoedaDia")
+
+:class:`AsyncClient` is the same session for ``async with`` blocks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import importlib
+import inspect
+import os
+import sys
+import threading
+from dataclasses import replace
+from types import ModuleType, TracebackType
+from typing import Any, Callable, Iterator, Optional, TypeVar, Union
+
+import httpx
+
+from bcb import http, runner
+from bcb.cache import HTTPCache
+from bcb.cassette import Cassette
+from bcb.circuitbreaker import CircuitBreaker
+from bcb.concurrency import AdaptiveConcurrency
+from bcb.datacache import CacheBackend, MemoryLRUCache
+from bcb.hedging import HedgingPolicy
+from bcb.metrics import MetricsRegistry
+from bcb.ratelimit import RateLimiter
+
+T = TypeVar("T")
+
+# OData objects whose later method calls must also run in the session
+_BOUND_TYPES = ("BaseODataAPI", "Endpoint", "EndpointQuery")
+
+
+class Client:
+    """HTTP session for the BCB APIs.
+
+    ``client.sgs``, ``client.currency`` and ``client.odata`` mirror the
+    modules of the same name, and the OData API classes are available as
+    attributes (``client.PTAX()``, ``client.Expectativas()``); every call
+    made through them, including calls on the endpoints and queries they
+    return, uses this session instead of the shared clients.
+
+    Parameters
+    ----------
+    config : HTTPConfig, optional
+        Connection settings. Defaults to the ``BCB_HTTP_*`` environment
+        variables, like the shared clients.
+    timeout : float, optional
+        Overrides ``config.timeout``.
+    cache : HTTPCache, optional
+        Persistent response cache.
+    rate_limiter : RateLimiter, optional
+        Per-host request rate limits.
+    single_flight : bool, default False
+        Coalesce identical in-flight ``GET`` requests.
+    hedging : HedgingPolicy, optional
+        Hedge slow ``GET`` requests.
+    circuit_breaker : CircuitBreaker, optional
+        Fail fast on hosts that keep failing.
+    cassette : Cassette, optional
+        Record or replay responses.
+    concurrency : AdaptiveConcurrency or bool, default True
+        Adaptive limit on concurrent async requests per host. ``True``
+        creates one with the default settings, ``False`` disables it.
+    metrics : MetricsRegistry, optional
+        Registry fed by this session's requests. A new one by default.
+    data_cache : CacheBackend, optional
+        Backend of the currency tables, OData metadata and SGS series
+        cached by this session. A new :class:`bcb.datacache.MemoryLRUCache`
+        by default.
+    """
+
+    def __init__(
+        self,
+        *,
+        config: Optional[http.HTTPConfig] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[HTTPCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        single_flight: bool = False,
+        hedging: Optional[HedgingPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cassette: Optional[Cassette] = None,
+        concurrency: Union[AdaptiveConcurrency, bool] = True,
+        metrics: Optional[MetricsRegistry] = None,
+        data_cache: Optional[CacheBackend] = None,
+    ) -> None:
+        config = config or http.HTTPConfig.from_env()
+        if timeout is not None:
+            config = replace(config, timeout=timeout)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.data_cache = data_cache if data_cache is not None else MemoryLRUCache()
+        if concurrency is True:
+            concurrency = AdaptiveConcurrency(registry=self.metrics)
+        self._features = http._Features(
+            config=config,
+            cache=cache,
+            rate_limiter=rate_limiter,
+            single_flight=single_flight,
+            hedging=hedging,
+            circuit_breaker=circuit_breaker,
+            cassette=cassette,
+            concurrency=concurrency or None,
+            metrics=self.metrics,
+        )
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._loop_clients: dict[asyncio.AbstractEventLoop, http._LoopClient] = {}
+        self._module_state: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @property
+    def config(self) -> http.HTTPConfig:
+        """Connection settings of this session."""
+        return self._features.config
+
+    @property
+    def cache(self) -> Optional[HTTPCache]:
+        """Response cache of this session, or ``None``."""
+        return self._features.cache
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """Rate limiter of this session, or ``None``."""
+        return self._features.rate_limiter
+
+    @property
+    def circuit_breaker(self) -> Optional[CircuitBreaker]:
+        """Circuit breaker of this session, or ``None``."""
+        return self._features.circuit_breaker
+
+    def _check_fork(self) -> None:
+        # Pooled sockets inherited from the parent are abandoned, as in
+        # bcb.http._reinit_after_fork
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._client = None
+            self._async_client = None
+            self._loop_clients.clear()
+            if self._features.concurrency is not None:
+                self._features.concurrency.reset()
+
+    def get_client(self) -> httpx.Client:
+        """Return the synchronous HTTP client of this session."""
+        self._check_fork()
+        client = self._client
+        if client is None or client.is_closed:
+            with self._lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = http._make_client(self._features)
+                client = self._client
+        return client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Return this session's async HTTP client for the running loop.
+
+        As with :func:`bcb.http.get_async_client`, each event loop gets its
+        own client, closed when ``asyncio.run`` shuts the loop down.
+        """
+        self._check_fork()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._async_client is None or self._async_client.is_closed:
+                self._async_client = http._make_async_client(self._features)
+            return self._async_client
+        with http._LOOP_CLIENTS_LOCK:
+            entry = self._loop_clients.get(loop)
+            if entry is None or entry.client.is_closed:
+                http._forget_closed_loops(self._loop_clients)
+                entry = self._loop_clients[loop] = http._LoopClient(
+                    loop, http._make_async_client(self._features), self._loop_clients
+                )
+            return entry.client
+
+    def _state(self, key: str, factory: Callable[[], T]) -> T:
+        # Per-session caches owned by feature modules, e.g. the currency
+        # table and the OData metadata
+        with self._lock:
+            if key not in self._module_state:
+                self._module_state[key] = factory()
+            value: T = self._module_state[key]
+            return value
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[Client]:
+        """Route module-level calls made in this block through the session.
+
+        The session is held in a :mod:`contextvars` variable, so tasks
+        started inside the block inherit it; plain threads do not.
+        """
+        token = http._SESSION.set(self)
+        try:
+            yield self
+        finally:
+            http._SESSION.reset(token)
+
+    def _bind(self, value: Any) -> Any:
+        wrapped = self._wrap(value)
+        if wrapped is not value or not callable(value):
+            return wrapped
+        if inspect.iscoroutinefunction(value):
+            return self._bind_coroutine(value)
+        return self._bind_function(value)
+
+    def _bind_function(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self.activate():
+                return self._wrap(func(*args, **kwargs))
+
+        return call
+
+    def _bind_coroutine(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            with self.activate():
+                return self._wrap(await func(*args, **kwargs))
+
+        return call
+
+    def _wrap(self, value: Any) -> Any:
+        api = sys.modules.get("bcb.odata.api")
+        if api is not None and isinstance(
+            value, tuple(getattr(api, name) for name in _BOUND_TYPES)
+        ):
+            return _Bound(self, value)
+        return value
+
+    def _module(self, name: str) -> _Bound:
+        return _Bound(self, importlib.import_module(f"bcb.{name}"))
+
+    @property
+    def sgs(self) -> Any:
+        """:mod:`bcb.sgs` bound to this session."""
+        return self._module("sgs")
+
+    @property
+    def currency(self) -> Any:
+        """:mod:`bcb.currency` bound to this session."""
+        return self._module("currency")
+
+    @property
+    def odata(self) -> Any:
+        """:mod:`bcb.odata` bound to this session."""
+        return self._module("odata")
+
+    def __getattr__(self, name: str) -> Any:
+        # OData API classes, e.g. client.PTAX()
+        odata = importlib.import_module("bcb.odata")
+        if name in odata.__all__:
+            return self._bind(getattr(odata, name))
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def __dir__(self) -> list[str]:
+        odata = importlib.import_module("bcb.odata")
+        return sorted({*super().__dir__(), *odata.__all__})
+
+    def metrics_snapshot(self) -> dict[str, Any]:
+        """Return the metrics of this session, as in
+        :func:`bcb.http.metrics_snapshot`."""
+        snapshot = self.metrics.snapshot()
+        if self.circuit_breaker is not None:
+            snapshot["circuits"] = self.circuit_breaker.snapshot()
+        if self._features.concurrency is not None:
+            snapshot["concurrency"] = self._features.concurrency.snapshot()
+        return snapshot
+
+    def clear_caches(self) -> None:
+        """Discard the currency tables, OData metadata, SGS series and SGS
+        frequencies cached by this session."""
+        self.data_cache.clear()
+
+    def close(self) -> None:
+        """Close the synchronous client.
+
+        The client used by the sync API on the background loop (see
+        :mod:`bcb.runner`) is closed as well.  Other async clients are
+        closed by :meth:`aclose` or when their event loop shuts down.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+        loop = runner.running_loop()
+        if loop is None or runner.in_loop_thread():
+            return
+        with http._LOOP_CLIENTS_LOCK:
+            entry = self._loop_clients.pop(loop, None)
+        if entry is not None and not entry.client.is_closed:
+            runner.run(entry.client.aclose())
+
+    async def aclose(self) -> None:
+        """Close the synchronous client and the running loop's async client."""
+        self.close()
+        with http._LOOP_CLIENTS_LOCK:
+            entry = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None and not entry.client.is_closed:
+            await entry.client.aclose()
+        if self._async_client is not None and not self._async_client.is_closed:
+            await self._async_client.aclose()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} timeout={self.config.timeout}>"
+
+
+class AsyncClient(Client):
+    """:class:`Client` used as an async context manager.
+
+    ::
+
+        async with bcb.AsyncClient() as client:
+            df = await client.sgs.async_get([1, 433], last=10)
+    """
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+
+class _Bound:
+    """Module or OData object whose calls run inside a session."""
+
+    def __init__(self, session: Client, target: Any) -> None:
+        self._session = session
+        self._target = target
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if isinstance(value, ModuleType):
+            return _Bound(self._session, value)
+        return self._session._bind(value)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._target)
+
+    def __repr__(self) -> str:
+        return f"<bound {self._target!r}>"
@@ -0,0 +1,358 @@
+"""Adaptive (AIMD) concurrency limits for the async clients.
+
+``sgs.async_get`` and ``currency.async_get`` start one request per code or
+symbol at once.  The async transports cap the requests in flight to each
+host with a limit that adapts like TCP congestion control: it grows by
+about one slot per round of successful requests while latency stays close
+to its baseline, and is cut multiplicatively when a host answers ``429`` or
+``5xx``, a connection fails or latency spikes.  Bulk pulls therefore settle
+near the concurrency the host can actually sustain.
+
+Limits are shared by every event loop in the process: requests waiting for
+a slot are queued under a lock and woken on their own loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
+from bcb.metrics import METRICS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Weight of each new sample in the latency baseline
+_BASELINE_ALPHA = 0.1
+
+# Samples needed before latency spikes are acted upon
+_MIN_SAMPLES = 10
+
+
+def _grant(future: asyncio.Future[None], host_limit: _HostLimit) -> None:
+    # Runs on the waiter's loop; a waiter cancelled in the meantime hands
+    # its slot to the next one
+    if future.done():
+        host_limit.release_slot()
+    else:
+        future.set_result(None)
+
+
+class _HostLimit:
+    def __init__(self, initial: float, min_limit: int, max_limit: int) -> None:
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.baseline = 0.0
+        self.samples = 0
+        self.increases = 0
+        self.decreases = 0
+        self.last_decrease = float("-inf")
+        self.waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = (
+            deque()
+        )
+        self.lock = threading.Lock()
+
+    def has_slot(self) -> bool:
+        # Must be called with the lock held
+        return self.in_flight < max(self.min_limit, int(self.limit))
+
+    def try_acquire(self) -> Optional[asyncio.Future[None]]:
+        """Take a slot, or return a future resolved when one is granted."""
+        with self.lock:
+            if not self.waiters and self.has_slot():
+                self.in_flight += 1
+                return None
+            loop = asyncio.get_running_loop()
+            future: asyncio.Future[None] = loop.create_future()
+            self.waiters.append((loop, future))
+            return future
+
+    def abandon(self, future: asyncio.Future[None]) -> None:
+        """Withdraw a waiter whose task was cancelled."""
+        with self.lock:
+            for entry in self.waiters:
+                if entry[1] is future:
+                    self.waiters.remove(entry)
+                    return
+        # Granted before the cancellation arrived: give the slot back.  A
+        # cancelled future is handled by _grant instead.
+        if future.done() and not future.cancelled():
+            self.release_slot()
+
+    def release_slot(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def _wake(self) -> None:
+        # Must be called with the lock held
+        while self.waiters and self.has_slot():
+            loop, future = self.waiters.popleft()
+            if loop.is_closed():
+                continue
+            self.in_flight += 1
+            loop.call_soon_threadsafe(_grant, future, self)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queued": len(self.waiters),
+                "latency_baseline": self.baseline,
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
+
+
+class AdaptiveConcurrency:
+    """Per-host AIMD limit on the requests in flight.
+
+    Parameters
+    ----------
+    initial : int, default 8
+        Starting limit for each host.
+    min_limit, max_limit : int
+        Bounds for the limit.
+    backoff : float, default 0.5
+        Factor applied to the limit on overload.
+    latency_tolerance : float, default 3.0
+        A response slower than this multiple of the latency baseline counts
+        as overload.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(
+                "expected 1 <= min_limit <= initial <= max_limit, got "
+                f"{min_limit!r}, {initial!r}, {max_limit!r}"
+            )
+        if not 0 < backoff < 1:
+            raise ValueError(f"backoff must be in (0, 1), got {backoff!r}")
+        if latency_tolerance <= 1:
+            raise ValueError(
+                f"latency_tolerance must be greater than 1, got {latency_tolerance!r}"
+            )
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._registry = registry
+        self._hosts: dict[str, _HostLimit] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"AdaptiveConcurrency(initial={self.initial}, min_limit={self.min_limit}, "
+            f"max_limit={self.max_limit})"
+        )
+
+    def _host(self, host: str) -> _HostLimit:
+        with self._lock:
+            host_limit = self._hosts.get(host)
+            if host_limit is None:
+                host_limit = self._hosts[host] = _HostLimit(
+                    float(self.initial), self.min_limit, self.max_limit
+                )
+            return host_limit
+
+    def limit(self, host: str) -> int:
+        """Current limit for ``host``."""
+        host_limit = self._host(host)
+        with host_limit.lock:
+            return max(self.min_limit, int(host_limit.limit))
+
+    async def acquire(self, host: str) -> None:
+        """Wait without blocking the event loop for a slot to ``host``."""
+        host_limit = self._host(host)
+        future = host_limit.try_acquire()
+        if future is None:
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            host_limit.abandon(future)
+            raise
+
+    def release(
+        self, host: str, latency: Optional[float] = None, *, overloaded: bool = False
+    ) -> None:
+        """Free a slot and adapt the limit to how the request went.
+
+        Parameters
+        ----------
+        host : str
+            Host the slot was taken for.
+        latency : float, optional
+            Seconds until the response arrived. ``None`` releases the slot
+            without adapting the limit, e.g. for cancelled requests.
+        overloaded : bool, default False
+            Whether the host signalled overload (``429``, ``5xx`` or a
+            failed connection).
+        """
+        host_limit = self._host(host)
+        with host_limit.lock:
+            host_limit.in_flight -= 1
+            if latency is not None:
+                self._adapt(host, host_limit, latency, overloaded)
+            host_limit._wake()
+
+    def _adapt(
+        self, host: str, host_limit: _HostLimit, latency: float, overloaded: bool
+    ) -> None:
+        # Must be called with the host lock held
+        spike = (
+            host_limit.samples >= _MIN_SAMPLES
+            and latency > self.latency_tolerance * host_limit.baseline
+        )
+        if not overloaded:
+            host_limit.samples += 1
+            if host_limit.samples == 1:
+                host_limit.baseline = latency
+            else:
+                host_limit.baseline += _BASELINE_ALPHA * (latency - host_limit.baseline)
+        if overloaded or spike:
+            # One cut per round trip, so a burst of failures from requests
+            # sent under the old limit counts once
+            now = time.monotonic()
+            if now - host_limit.last_decrease < host_limit.baseline:
+                return
+            host_limit.last_decrease = now
+            old = host_limit.limit
+            host_limit.limit = max(float(self.min_limit), old * self.backoff)
+            host_limit.decreases += 1
+            self._registry.increment("concurrency_decreases", host=host)
+            logger.debug(
+                f"Lowering concurrency to {host} from {old:.1f} to "
+                f"{host_limit.limit:.1f} ({'overload' if overloaded else 'latency'})"
+            )
+        elif host_limit.in_flight + 1 >= int(host_limit.limit):
+            # Grow only while the limit is what holds requests back
+            if host_limit.limit < self.max_limit:
+                host_limit.limit = min(
+                    float(self.max_limit), host_limit.limit + 1 / host_limit.limit
+                )
+                host_limit.increases += 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Limit, requests in flight and queued, and latency baseline per host."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: host_limit.snapshot() for host, host_limit in hosts.items()}
+
+    def reset(self) -> None:
+        """Forget every host, including requests in flight.
+
+        Called in forked children, where requests of the parent will never
+        release their slots.
+        """
+        # The old lock may be held by a thread that does not exist anymore
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+
+def is_overload(response: httpx.Response) -> bool:
+    """Whether a response asks clients to back off."""
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class _SlotStream(httpx.AsyncByteStream):
+    """Response body that holds the slot of its request until closed."""
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        controller: AdaptiveConcurrency,
+        host: str,
+        started: float,
+        overloaded: bool,
+    ) -> None:
+        self._stream = stream
+        self._controller = controller
+        self._host = host
+        self._started = started
+        self._overloaded = overloaded
+        self._cancelled = False
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except httpx.TransportError:
+            self._overloaded = True
+            raise
+        except asyncio.CancelledError:
+            self._cancelled = True
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                latency = None
+                if not self._cancelled:
+                    latency = time.perf_counter() - self._started
+                self._controller.release(
+                    self._host, latency, overloaded=self._overloaded
+                )
+
+
+class AsyncAdaptiveConcurrencyTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that holds a slot of the host limit per request.
+
+    The slot is released when the response is closed, after its body was
+    read, and the time until then is the latency fed back to the limit.
+    """
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, controller: AdaptiveConcurrency
+    ) -> None:
+        self._transport = transport
+        self.controller = controller
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        await self.controller.acquire(host)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.controller.release(
+                host, time.perf_counter() - started, overloaded=True
+            )
+            raise
+        except BaseException:
+            self.controller.release(host)
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_SlotStream(
+                response.stream, self.controller, host, started, is_overload(response)
+            ),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
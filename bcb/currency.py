@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import logging
 import re
-import threading
 from datetime import date, timedelta
 from io import BytesIO, StringIO
-from typing import Dict, List, Literal, NamedTuple, NoReturn, Union, overload
+from typing import (
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    NoReturn,
+    Optional,
+    Union,
+    overload,
+)
 from urllib.parse import urlencode
 
 import httpx
@@ -16,13 +25,19 @@ from lxml import etree, html
 
 from bcb.http import (
     RequestTimeout,
+    current_session,
     get_async_client,
     get_client,
     raise_for_request_error,
     raise_for_status,
     timeout_kwargs,
+    with_retry,
 )
+from bcb import runner
+from bcb.datacache import CacheBackend, CacheNamespace
+from bcb.deadline import budget, wait_for
 from bcb.exceptions import BCBAPIError, CurrencyNotFoundError
+from bcb.spool import body_length
 from bcb.utils import Date, DateInput
 
 logger = logging.getLogger(__name__)
@@ -46,6 +61,18 @@ def _currency_url(currency_id: int, start_date: DateInput, end_date: DateInput)
     return f"https://ptax.bcb.gov.br/ptax_internet/consultaBoletim.do?{params}"
 
 
+@with_retry(module="currency")
+def _get_currency_response(url: str, timeout: RequestTimeout) -> httpx.Response:
+    return get_client().get(url, **timeout_kwargs(timeout))
+
+
+@with_retry(module="currency")
+async def _async_get_currency_response(
+    url: str, timeout: RequestTimeout
+) -> httpx.Response:
+    return await get_async_client().get(url, **timeout_kwargs(timeout))
+
+
 class _CacheKey(NamedTuple):
     """Structured cache key for currency module.
 
@@ -62,17 +89,21 @@ class _CacheKey(NamedTuple):
 
 
 class _ThreadSafeCache:
-    """Thread-safe cache wrapper for currency data.
+    """Currency tables kept in the ``"currency"`` namespace of a cache backend.
 
     Parameters
     ----------
-    initial_data : dict, optional
-        Initial cache data (default: empty)
+    backend : CacheBackend, optional
+        Backend to use. Defaults to the one active at each call, see
+        :func:`bcb.http.set_data_cache`.
     """
 
-    def __init__(self, initial_data: dict[_CacheKey, pd.DataFrame] | None = None):
-        self._lock = threading.RLock()
-        self._data: dict[_CacheKey, pd.DataFrame] = initial_data or {}
+    def __init__(self, backend: CacheBackend | None = None):
+        self._namespace = CacheNamespace("currency", backend)
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._namespace.backend
 
     def get(self, key: _CacheKey) -> pd.DataFrame | None:
         """Get value from cache.
@@ -85,10 +116,10 @@ class _ThreadSafeCache:
         Returns
         -------
         pd.DataFrame | None
-            Cached DataFrame or None if not found
+            Cached DataFrame or None if not found or expired
         """
-        with self._lock:
-            return self._data.get(key)
+        value: pd.DataFrame | None = self._namespace.get(key.type)
+        return value
 
     def set(self, key: _CacheKey, value: pd.DataFrame) -> None:
         """Set value in cache.
@@ -100,19 +131,25 @@ class _ThreadSafeCache:
         value : pd.DataFrame
             DataFrame to cache
         """
-        with self._lock:
-            self._data[key] = value
+        self._namespace.set(key.type, value)
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        with self._lock:
-            self._data.clear()
+        self._namespace.clear()
 
 
-# Default module-level cache instance
+# Default module-level cache instance, backed by the shared data cache
 _DEFAULT_CACHE = _ThreadSafeCache()
 
 
+def _default_cache() -> _ThreadSafeCache:
+    # Each bcb.Client session keeps its own currency tables
+    session = current_session()
+    if session is None:
+        return _DEFAULT_CACHE
+    return session._state("currency", lambda: _ThreadSafeCache(session.data_cache))
+
+
 def clear_cache(cache: _ThreadSafeCache | None = None) -> None:
     """Clear the module-level session cache.
 
@@ -127,7 +164,7 @@ def clear_cache(cache: _ThreadSafeCache | None = None) -> None:
     cache : _ThreadSafeCache, optional
         Cache instance to clear. If None, uses module-level default.
     """
-    (cache or _DEFAULT_CACHE).clear()
+    (cache or _default_cache()).clear()
 
 
 def _currency_id_list(
@@ -156,7 +193,7 @@ def _currency_id_list(
     BCBAPIError
         If API returns error response
     """
-    cache = cache or _DEFAULT_CACHE
+    cache = cache or _default_cache()
     cache_key = _CacheKey(type="currency_id_list")
     cached = cache.get(cache_key)
     if cached is not None:
@@ -168,11 +205,11 @@ def _currency_id_list(
     )
     logger.debug(f"Fetching currency ID list from {url1}")
     try:
-        res = get_client().get(url1, **timeout_kwargs(timeout))
+        res = _get_currency_response(url1, timeout)
     except httpx.HTTPError as ex:
         raise_for_request_error(ex, context="Currency ID list")
     logger.debug(
-        f"Currency ID list response: status={res.status_code}, length={len(res.content)}"
+        f"Currency ID list response: status={res.status_code}, length={body_length(res)}"
     )
     raise_for_status(
         res,
@@ -233,7 +270,7 @@ def _get_valid_currency_list(
     url2 = f"https://www4.bcb.gov.br/Download/fechamento/M{_date:%Y%m%d}.csv"
     logger.debug(f"Fetching currency list from {url2}")
     try:
-        res = get_client().get(url2, **timeout_kwargs(timeout))
+        res = _get_currency_response(url2, timeout)
     except httpx.HTTPError as ex:
         # Connection error: retry same date up to 3 times
         if n >= 3:
@@ -244,7 +281,7 @@ def _get_valid_currency_list(
         return _get_valid_currency_list(_date, n + 1, max_rollback, timeout=timeout)
 
     logger.debug(
-        f"Currency list response: status={res.status_code}, length={len(res.content)}"
+        f"Currency list response: status={res.status_code}, length={body_length(res)}"
     )
     if res.status_code == 200:
         return res
@@ -262,6 +299,7 @@ def get_currency_list(
     cache: _ThreadSafeCache | None = None,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
 ) -> pd.DataFrame:
     """Listagem com todas as moedas disponíveis na API e suas configurações de paridade.
 
@@ -269,6 +307,10 @@ def get_currency_list(
     ----------
     cache : _ThreadSafeCache, optional
         Cache instance to use. If None, uses module-level default.
+    timeout : float or httpx.Timeout, optional
+        Timeout por requisição HTTP.
+    deadline : float, optional
+        Tempo máximo, em segundos, incluindo os recuos de data.
 
     Returns
     -------
@@ -280,13 +322,14 @@ def get_currency_list(
     BCBAPIError
         If API returns error response
     """
-    cache = cache or _DEFAULT_CACHE
+    cache = cache or _default_cache()
     cache_key = _CacheKey(type="currency_list")
     cached = cache.get(cache_key)
     if cached is not None:
         return cached
 
-    res = _get_valid_currency_list(date.today(), timeout=timeout)
+    with budget(deadline):
+        res = _get_valid_currency_list(date.today(), timeout=timeout)
     df = pd.read_csv(StringIO(res.text), delimiter=";")
     df.columns = [
         "code",
@@ -309,8 +352,12 @@ def get_currency_list(
 def _get_currency_id(symbol: str, *, timeout: RequestTimeout = None) -> int:
     id_list = _currency_id_list(timeout=timeout)
     all_currencies = get_currency_list(timeout=timeout)
-    x = pd.merge(id_list, all_currencies, on=["name"])
-    matches = x.loc[x["symbol"] == symbol, "id"]
+    return _lookup_currency_id(pd.merge(id_list, all_currencies, on=["name"]), symbol)
+
+
+def _lookup_currency_id(table: pd.DataFrame, symbol: str) -> int:
+    # ``table`` is the ID list merged with the currency list on ``name``
+    matches = table.loc[table["symbol"] == symbol, "id"]
     if matches.empty:
         raise CurrencyNotFoundError(f"Unknown currency symbol: {symbol}")
     return int(matches.max())
@@ -401,11 +448,11 @@ def _fetch_symbol_response(
     url = _currency_url(cid, start_date, end_date)
     logger.debug(f"Fetching currency data for {symbol} from {url.split('?')[0]}")
     try:
-        res = get_client().get(url, **timeout_kwargs(timeout))
+        res = _get_currency_response(url, timeout)
     except httpx.HTTPError as ex:
         raise_for_request_error(ex, context=f"Currency data for {symbol}")
     logger.debug(
-        f"Currency data response: status={res.status_code}, length={len(res.content)}"
+        f"Currency data response: status={res.status_code}, length={body_length(res)}"
     )
 
     # Handle HTML error responses (e.g., no data for date range).
@@ -658,6 +705,7 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
 ) -> pd.DataFrame: ...
 
 
@@ -672,6 +720,7 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
 ) -> pd.DataFrame: ...
 
 
@@ -686,6 +735,7 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
 ) -> str: ...
 
 
@@ -700,6 +750,7 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
 ) -> CurrencyTextResult: ...
 
 
@@ -713,6 +764,7 @@ def get(
     tidy: bool = False,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
 ) -> Union[pd.DataFrame, str, Dict[str, str]]:
     """
     Retorna um DataFrame pandas com séries temporais com taxas de câmbio.
@@ -746,6 +798,11 @@ def get(
     timeout : float or httpx.Timeout, optional
         Timeout por requisição HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo a
+        busca da tabela de moedas (com recuos de data) e as requisições
+        concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
 
     Returns
     -------
@@ -763,15 +820,31 @@ def get(
     symbols = _validate_currency_query_inputs(
         symbols, start, end, side, groupby, output
     )
+    if len(symbols) > 1 and runner.is_enabled() and not runner.in_loop_thread():
+        # Several symbols are fetched concurrently on the background loop
+        return runner.run(
+            async_get(
+                symbols,
+                start,
+                end,
+                side,
+                groupby,
+                output,
+                tidy,
+                timeout=timeout,
+                deadline=deadline,
+            )
+        )
 
     if output == "text":
         results: Dict[str, str] = {}
-        for symbol in symbols:
-            try:
-                raw = _get_symbol_text(symbol, start, end, timeout=timeout)
-                results[symbol] = raw
-            except CurrencyNotFoundError:
-                pass  # Skip missing currencies
+        with budget(deadline):
+            for symbol in symbols:
+                try:
+                    raw = _get_symbol_text(symbol, start, end, timeout=timeout)
+                    results[symbol] = raw
+                except CurrencyNotFoundError:
+                    pass  # Skip missing currencies
         if not results:
             _raise_no_valid_currency_symbols(symbols)
         if len(symbols) == 1:
@@ -779,12 +852,13 @@ def get(
         return results
 
     dss = []
-    for symbol in symbols:
-        try:
-            df1 = _get_symbol(symbol, start, end, timeout=timeout)
-            dss.append(df1)
-        except CurrencyNotFoundError:
-            pass  # Skip missing currencies
+    with budget(deadline):
+        for symbol in symbols:
+            try:
+                df1 = _get_symbol(symbol, start, end, timeout=timeout)
+                dss.append(df1)
+            except CurrencyNotFoundError:
+                pass  # Skip missing currencies
     if len(dss) > 0:
         df = pd.concat(dss, axis=1)
         if tidy:
@@ -811,7 +885,7 @@ async def _async_currency_id_list(
     timeout: RequestTimeout = None,
 ) -> pd.DataFrame:
     """Async version of _currency_id_list()."""
-    cache = cache or _DEFAULT_CACHE
+    cache = cache or _default_cache()
     cache_key = _CacheKey(type="currency_id_list")
     cached = cache.get(cache_key)
     if cached is not None:
@@ -822,7 +896,7 @@ async def _async_currency_id_list(
         "method=exibeFormularioConsultaBoletim"
     )
     try:
-        res = await get_async_client().get(url1, **timeout_kwargs(timeout))
+        res = await _async_get_currency_response(url1, timeout)
     except httpx.HTTPError as ex:
         raise_for_request_error(ex, context="Currency ID list")
     raise_for_status(
@@ -857,7 +931,7 @@ async def _async_get_valid_currency_list(
 
     url2 = f"https://www4.bcb.gov.br/Download/fechamento/M{_date:%Y%m%d}.csv"
     try:
-        res = await get_async_client().get(url2, **timeout_kwargs(timeout))
+        res = await _async_get_currency_response(url2, timeout)
     except httpx.HTTPError as ex:
         if n >= 3:
             raise_for_request_error(ex, context="Currency list")
@@ -880,7 +954,7 @@ async def _async_get_currency_list(
     timeout: RequestTimeout = None,
 ) -> pd.DataFrame:
     """Async version of get_currency_list()."""
-    cache = cache or _DEFAULT_CACHE
+    cache = cache or _default_cache()
     cache_key = _CacheKey(type="currency_list")
     cached = cache.get(cache_key)
     if cached is not None:
@@ -906,17 +980,20 @@ async def _async_get_currency_list(
     return df
 
 
-async def _async_get_currency_id(symbol: str, *, timeout: RequestTimeout = None) -> int:
-    """Async version of _get_currency_id() with concurrent cache warming."""
+async def _async_currency_table(*, timeout: RequestTimeout = None) -> pd.DataFrame:
+    """Fetch the ID list and the currency list concurrently and merge them."""
     id_list, all_currencies = await asyncio.gather(
         _async_currency_id_list(timeout=timeout),
         _async_get_currency_list(timeout=timeout),
     )
-    x = pd.merge(id_list, all_currencies, on=["name"])
-    matches = x.loc[x["symbol"] == symbol, "id"]
-    if matches.empty:
-        raise CurrencyNotFoundError(f"Unknown currency symbol: {symbol}")
-    return int(matches.max())
+    table: pd.DataFrame = pd.merge(id_list, all_currencies, on=["name"])
+    return table
+
+
+async def _async_get_currency_id(symbol: str, *, timeout: RequestTimeout = None) -> int:
+    """Async version of _get_currency_id() with concurrent cache warming."""
+    table = await _async_currency_table(timeout=timeout)
+    return _lookup_currency_id(table, symbol)
 
 
 async def _async_fetch_symbol_response(
@@ -925,12 +1002,20 @@ async def _async_fetch_symbol_response(
     end_date: DateInput,
     *,
     timeout: RequestTimeout = None,
+    table: Optional[pd.DataFrame] = None,
 ) -> "httpx.Response":
-    """Async version of _fetch_symbol_response()."""
-    cid = await _async_get_currency_id(symbol, timeout=timeout)
+    """Async version of _fetch_symbol_response().
+
+    ``table`` is the merged currency table from :func:`_async_currency_table`;
+    it is fetched when not given.
+    """
+    if table is None:
+        cid = await _async_get_currency_id(symbol, timeout=timeout)
+    else:
+        cid = _lookup_currency_id(table, symbol)
     url = _currency_url(cid, start_date, end_date)
     try:
-        res = await get_async_client().get(url, **timeout_kwargs(timeout))
+        res = await _async_get_currency_response(url, timeout)
     except httpx.HTTPError as ex:
         raise_for_request_error(ex, context=f"Currency data for {symbol}")
 
@@ -952,10 +1037,11 @@ async def _async_get_symbol(
     end_date: DateInput,
     *,
     timeout: RequestTimeout = None,
+    table: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """Async version of _get_symbol()."""
     res = await _async_fetch_symbol_response(
-        symbol, start_date, end_date, timeout=timeout
+        symbol, start_date, end_date, timeout=timeout, table=table
     )
     df = _validate_currency_csv(res.text)
     df = _parse_currency_dates(df)
@@ -974,10 +1060,11 @@ async def _async_get_symbol_text(
     end_date: DateInput,
     *,
     timeout: RequestTimeout = None,
+    table: Optional[pd.DataFrame] = None,
 ) -> str:
     """Async version of _get_symbol_text()."""
     res = await _async_fetch_symbol_response(
-        symbol, start_date, end_date, timeout=timeout
+        symbol, start_date, end_date, timeout=timeout, table=table
     )
     return res.text
 
@@ -992,11 +1079,14 @@ async def async_get(
     tidy: bool = False,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
 ) -> Union[pd.DataFrame, str, Dict[str, str]]:
     """
     Retorna um DataFrame pandas com séries temporais com taxas de câmbio (async version).
 
-    Uses :func:`asyncio.gather` to fetch multiple symbols concurrently.
+    Uses :func:`asyncio.gather` to fetch multiple symbols concurrently,
+    capped by the adaptive concurrency limit (see
+    :func:`bcb.http.set_adaptive_concurrency`).
 
     Same signature as :func:`get`, but returns a coroutine.
 
@@ -1024,6 +1114,11 @@ async def async_get(
     timeout : float or httpx.Timeout, optional
         Timeout por requisição HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo a
+        busca da tabela de moedas (com recuos de data) e as requisições
+        concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
 
     Returns
     -------
@@ -1036,13 +1131,20 @@ async def async_get(
 
     if output == "text":
         results: Dict[str, str] = {}
-        texts = await asyncio.gather(
-            *[
-                _async_get_symbol_text(symbol, start, end, timeout=timeout)
-                for symbol in symbols
-            ],
-            return_exceptions=True,
-        )
+        with budget(deadline):
+            # The currency tables are resolved once, not by every symbol
+            table = await wait_for(_async_currency_table(timeout=timeout))
+            texts = await wait_for(
+                asyncio.gather(
+                    *[
+                        _async_get_symbol_text(
+                            symbol, start, end, timeout=timeout, table=table
+                        )
+                        for symbol in symbols
+                    ],
+                    return_exceptions=True,
+                )
+            )
         for symbol, text in zip(symbols, texts, strict=True):
             if isinstance(text, CurrencyNotFoundError):
                 continue
@@ -1055,10 +1157,17 @@ async def async_get(
             return results[symbols[0]]
         return results
 
-    dss = await asyncio.gather(
-        *[_async_get_symbol(symbol, start, end, timeout=timeout) for symbol in symbols],
-        return_exceptions=True,
-    )
+    with budget(deadline):
+        table = await wait_for(_async_currency_table(timeout=timeout))
+        dss = await wait_for(
+            asyncio.gather(
+                *[
+                    _async_get_symbol(symbol, start, end, timeout=timeout, table=table)
+                    for symbol in symbols
+                ],
+                return_exceptions=True,
+            )
+        )
     valid_dss = []
     for df in dss:
         if isinstance(df, CurrencyNotFoundError):
@@ -1085,3 +1194,44 @@ async def async_get(
             raise ValueError("Unknown side value, use: bid, ask, both")
     else:
         _raise_no_valid_currency_symbols(symbols)
+
+
+def submit(
+    symbols: Union[str, List[str]],
+    start: DateInput,
+    end: DateInput,
+    side: CurrencySide = "ask",
+    groupby: CurrencyGroupBy = "symbol",
+    output: CurrencyOutput = "dataframe",
+    tidy: bool = False,
+    *,
+    timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
+) -> concurrent.futures.Future[Union[pd.DataFrame, str, Dict[str, str]]]:
+    """
+    Inicia :func:`get` em segundo plano e retorna um ``Future`` imediatamente.
+
+    Same signature as :func:`get`.  The request runs as :func:`async_get`
+    on the background event loop of :mod:`bcb.runner`, sharing its async
+    client and concurrency limits.  Use :func:`bcb.as_completed` to collect
+    several results as they finish.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Resolvido com o resultado de :func:`get`.
+    """
+    _validate_currency_query_inputs(symbols, start, end, side, groupby, output)
+    return runner.submit(
+        async_get(
+            symbols,
+            start,
+            end,
+            side,
+            groupby,
+            output,
+            tidy,
+            timeout=timeout,
+            deadline=deadline,
+        )
+    )
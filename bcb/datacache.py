@@ -0,0 +1,628 @@
+"""Cache backends for parsed data.
+
+The currency tables, the OData metadata and, when enabled, downloaded SGS
+series are kept in a cache backend, each module in its own namespace
+(``"currency"``, ``"odata_metadata"`` and ``"sgs"``).  Every backend
+implements :class:`CacheBackend`:
+
+* :class:`MemoryLRUCache` -- in-process, bounded by the bytes it holds
+  (DataFrames are measured with ``memory_usage(deep=True)``), evicting the
+  least recently used entries.  The default.
+* :class:`DiskCache` -- pickles under a directory, shared by processes.
+* :class:`SQLiteCache` -- pickles in a SQLite database file.
+* :class:`TieredCache` -- an L1 backend in front of an L2 one, e.g. memory
+  in front of SQLite.
+
+Entries expire after a time-to-live, set per backend, per namespace or per
+entry, and backends count hits, misses, evictions and expirations per
+namespace::
+
+    from bcb import http
+    from bcb.datacache import MemoryLRUCache, SQLiteCache, TieredCache
+
+    http.set_data_cache(
+        TieredCache(MemoryLRUCache(max_bytes=64 * 2**20), SQLiteCache(ttl=86400))
+    )
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional, Protocol, Union, runtime_checkable
+
+from bcb.cache import _atomic_write, default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Default size bound of MemoryLRUCache (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+TTL = Union[None, float, Mapping[str, Optional[float]]]
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """Storage for cached values, grouped in namespaces.
+
+    ``None`` is never stored; :meth:`get` returns it for missing and expired
+    entries.
+    """
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the value stored under ``key``, or ``None``."""
+        ...
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        """Return the value under ``key`` and the seconds it has left to live.
+
+        The lifetime is ``None`` for entries that do not expire.
+        """
+        ...
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """Store ``value``, expiring after ``ttl`` seconds when given."""
+        ...
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove one entry."""
+        ...
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Remove every entry of ``namespace``, or of all namespaces."""
+        ...
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hit, miss, eviction and expiration counts per namespace."""
+        ...
+
+
+def size_of(value: Any) -> int:
+    """Approximate memory held by a cached value, in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        # pandas DataFrame or Series
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class _Stats:
+    """Counters per namespace, shared by the backends."""
+
+    _FIELDS = ("hits", "misses", "sets", "evictions", "expired")
+
+    def __init__(self) -> None:
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, namespace: str, field: str, n: int = 1) -> None:
+        with self._lock:
+            counts = self._counts.get(namespace)
+            if counts is None:
+                counts = self._counts[namespace] = dict.fromkeys(self._FIELDS, 0)
+            counts[field] += n
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {namespace: dict(c) for namespace, c in self._counts.items()}
+
+    def reset_lock(self) -> None:
+        self._lock = threading.Lock()
+
+
+class _Backend:
+    """TTL resolution and statistics common to the backends."""
+
+    def __init__(self, ttl: TTL) -> None:
+        if isinstance(ttl, Mapping):
+            self._default_ttl: Optional[float] = None
+            self._namespace_ttls = dict(ttl)
+        else:
+            self._default_ttl = ttl
+            self._namespace_ttls = {}
+        for value in (self._default_ttl, *self._namespace_ttls.values()):
+            if value is not None and value < 0:
+                raise ValueError(f"ttl must be non-negative, got {value!r}")
+        self._stats = _Stats()
+        _INSTANCES.add(self)
+
+    def ttl_for(self, namespace: str, ttl: Optional[float] = None) -> Optional[float]:
+        """Time-to-live applied to a new entry of ``namespace``."""
+        if ttl is not None:
+            return ttl
+        return self._namespace_ttls.get(namespace, self._default_ttl)
+
+    def _expires_at(
+        self, namespace: str, ttl: Optional[float], now: float
+    ) -> Optional[float]:
+        ttl = self.ttl_for(namespace, ttl)
+        return None if ttl is None else now + ttl
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        raise NotImplementedError
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        found = self.get_with_expiry(namespace, key)
+        return None if found is None else found[0]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hit, miss, set, eviction and expiration counts per namespace."""
+        return self._stats.snapshot()
+
+    def _reset_after_fork(self) -> None:
+        self._stats.reset_lock()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class MemoryLRUCache(_Backend):
+    """In-process cache bounded by size, evicting least recently used entries.
+
+    Parameters
+    ----------
+    max_bytes : int, default 256 MiB
+        Bound on the memory held by the values, measured by :func:`size_of`.
+        A value larger than this is not stored.
+    max_entries : int, optional
+        Bound on the number of entries.
+    ttl : float or dict, optional
+        Seconds entries live, for every namespace or as a mapping of
+        namespace to seconds. ``None`` keeps entries until evicted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        max_entries: Optional[int] = None,
+        ttl: TTL = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes!r}")
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got {max_entries!r}")
+        super().__init__(ttl)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoryLRUCache(max_bytes={self.max_bytes}, "
+            f"max_entries={self.max_entries})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the stored values."""
+        return self._bytes
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self._stats.add(namespace, "misses")
+                return None
+            now = time.monotonic()
+            if entry.expires_at is not None and now >= entry.expires_at:
+                self._remove((namespace, key))
+                self._stats.add(namespace, "expired")
+                self._stats.add(namespace, "misses")
+                return None
+            self._entries.move_to_end((namespace, key))
+            self._stats.add(namespace, "hits")
+            return entry.value, _remaining(entry.expires_at, now)
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        size = size_of(value)
+        with self._lock:
+            self._remove((namespace, key))
+            if size > self.max_bytes:
+                logger.debug(
+                    f"Not caching {namespace}/{key}: {size} bytes exceed max_bytes"
+                )
+                return
+            self._entries[(namespace, key)] = _Entry(
+                value, size, self._expires_at(namespace, ttl, time.monotonic())
+            )
+            self._bytes += size
+            self._stats.add(namespace, "sets")
+            self._evict()
+
+    def _evict(self) -> None:
+        # Must be called with the lock held
+        while self._bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            (namespace, _), entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats.add(namespace, "evictions")
+
+    def _remove(self, full_key: tuple[str, str]) -> None:
+        # Must be called with the lock held
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._remove((namespace, key))
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            for full_key in list(self._entries):
+                if namespace is None or full_key[0] == namespace:
+                    self._remove(full_key)
+
+    def _reset_after_fork(self) -> None:
+        super()._reset_after_fork()
+        self._lock = threading.RLock()
+
+
+def _remaining(expires_at: Optional[float], now: float) -> Optional[float]:
+    return None if expires_at is None else expires_at - now
+
+
+def _dumps(namespace: str, key: str, value: Any) -> Optional[bytes]:
+    try:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as ex:
+        logger.debug(f"Not caching {namespace}/{key}: value cannot be pickled ({ex})")
+        return None
+
+
+class DiskCache(_Backend):
+    """Cache of pickled values in a directory, shared by processes.
+
+    Each entry is a file ``<namespace>/<sha256 of key>.pkl``.  Writes are
+    atomic, so concurrent processes never read partial entries.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cache directory. Defaults to ``data`` under
+        :func:`bcb.cache.default_cache_dir`.
+    ttl : float or dict, optional
+        Seconds entries live, for every namespace or as a mapping of
+        namespace to seconds. ``None`` keeps entries until cleared.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path, None] = None, *, ttl: TTL = None
+    ) -> None:
+        super().__init__(ttl)
+        self.directory = Path(directory) if directory else default_cache_dir() / "data"
+
+    def __repr__(self) -> str:
+        return f"DiskCache(directory={str(self.directory)!r})"
+
+    def _path(self, namespace: str, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / namespace / f"{digest}.pkl"
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        path = self._path(namespace, key)
+        try:
+            expires_at, value = pickle.loads(path.read_bytes())
+        except FileNotFoundError:
+            self._stats.add(namespace, "misses")
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as ex:
+            logger.debug(f"Discarding unreadable cache entry {path}: {ex}")
+            self._unlink(path)
+            self._stats.add(namespace, "misses")
+            return None
+        now = time.time()
+        if expires_at is not None and now >= expires_at:
+            self._unlink(path)
+            self._stats.add(namespace, "expired")
+            self._stats.add(namespace, "misses")
+            return None
+        self._stats.add(namespace, "hits")
+        return value, _remaining(expires_at, now)
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        data = _dumps(
+            namespace, key, (self._expires_at(namespace, ttl, time.time()), value)
+        )
+        if data is None:
+            return
+        path = self._path(namespace, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, data)
+        except OSError as ex:
+            logger.warning(f"Could not write cache entry {path}: {ex}")
+            return
+        self._stats.add(namespace, "sets")
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._unlink(self._path(namespace, key))
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        folders = (
+            [self.directory / namespace]
+            if namespace is not None
+            else [p for p in self.directory.glob("*") if p.is_dir()]
+        )
+        for folder in folders:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+class SQLiteCache(_Backend):
+    """Cache of pickled values in a SQLite database.
+
+    The database runs in WAL mode, so several processes can share the file.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Database file. Defaults to ``data.sqlite`` under
+        :func:`bcb.cache.default_cache_dir`.
+    ttl : float or dict, optional
+        Seconds entries live, for every namespace or as a mapping of
+        namespace to seconds. ``None`` keeps entries until cleared.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None, *, ttl: TTL = None) -> None:
+        super().__init__(ttl)
+        self.path = Path(path) if path else default_cache_dir() / "data.sqlite"
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+
+    def __repr__(self) -> str:
+        return f"SQLiteCache(path={str(self.path)!r})"
+
+    def _connect(self) -> sqlite3.Connection:
+        # Must be called with the lock held.  A connection inherited through
+        # fork() is not used by the child.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        with self._lock:
+            now = time.time()
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, expires_at FROM entries "
+                    "WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                )
+                .fetchone()
+            )
+            if row is not None and row[1] is not None and now >= row[1]:
+                self._connect().execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                )
+                self._stats.add(namespace, "expired")
+                row = None
+        if row is None:
+            self._stats.add(namespace, "misses")
+            return None
+        try:
+            value = pickle.loads(row[0])
+        except (pickle.UnpicklingError, EOFError, ValueError) as ex:
+            logger.debug(f"Discarding unreadable cache entry {namespace}/{key}: {ex}")
+            self.delete(namespace, key)
+            self._stats.add(namespace, "misses")
+            return None
+        self._stats.add(namespace, "hits")
+        return value, _remaining(row[1], now)
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        data = _dumps(namespace, key, value)
+        if data is None:
+            return
+        expires_at = self._expires_at(namespace, ttl, time.time())
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (namespace, key, data, expires_at),
+            )
+        self._stats.add(namespace, "sets")
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._connect().execute("DELETE FROM entries")
+            else:
+                self._connect().execute(
+                    "DELETE FROM entries WHERE namespace = ?", (namespace,)
+                )
+
+    def close(self) -> None:
+        """Close the database connection; it is reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _reset_after_fork(self) -> None:
+        super()._reset_after_fork()
+        self._lock = threading.Lock()
+        # Abandoned without closing: the parent still uses it
+        self._connection = None
+
+
+class TieredCache(_Backend):
+    """Two-level cache: a fast L1 backend in front of a larger L2 one.
+
+    Reads try L1, then L2, copying L2 hits into L1 with the lifetime they
+    have left in L2.  Writes go to both.
+
+    Parameters
+    ----------
+    l1, l2 : CacheBackend
+        Backends, e.g. :class:`MemoryLRUCache` and :class:`SQLiteCache`.
+    """
+
+    def __init__(self, l1: CacheBackend, l2: CacheBackend) -> None:
+        super().__init__(None)
+        self.l1 = l1
+        self.l2 = l2
+
+    def __repr__(self) -> str:
+        return f"TieredCache(l1={self.l1!r}, l2={self.l2!r})"
+
+    def get_with_expiry(
+        self, namespace: str, key: str
+    ) -> Optional[tuple[Any, Optional[float]]]:
+        found = self.l1.get_with_expiry(namespace, key)
+        if found is None:
+            found = self.l2.get_with_expiry(namespace, key)
+            if found is None:
+                self._stats.add(namespace, "misses")
+                return None
+            self.l1.set(namespace, key, *found)
+        self._stats.add(namespace, "hits")
+        return found
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        self.l1.set(namespace, key, value, ttl)
+        self.l2.set(namespace, key, value, ttl)
+        self._stats.add(namespace, "sets")
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.l1.delete(namespace, key)
+        self.l2.delete(namespace, key)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        self.l1.clear(namespace)
+        self.l2.clear(namespace)
+
+
+class CacheNamespace:
+    """One module's view of a cache backend.
+
+    Parameters
+    ----------
+    name : str
+        Namespace of the entries.
+    backend : CacheBackend, optional
+        Backend to use. By default the one active when each call is made:
+        the :class:`bcb.Client` session's, or
+        :func:`bcb.http.get_data_cache`.
+    ttl : float, optional
+        Time-to-live of new entries, overriding the backend's.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: Optional[CacheBackend] = None,
+        *,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self._backend = backend
+        self.ttl = ttl
+
+    def __repr__(self) -> str:
+        return f"CacheNamespace({self.name!r}, backend={self.backend!r})"
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is not None:
+            return self._backend
+        from bcb.http import active_data_cache
+
+        return active_data_cache()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.backend.get(self.name, key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.backend.set(self.name, key, value, self.ttl if ttl is None else ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self.name, key)
+
+    def clear(self) -> None:
+        self.backend.clear(self.name)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+# Backends alive in this process, whose locks are replaced after fork()
+_INSTANCES: weakref.WeakSet[_Backend] = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    for backend in list(_INSTANCES):
+        backend._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
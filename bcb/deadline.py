@@ -0,0 +1,192 @@
+"""Deadline budgets covering whole operations.
+
+A ``timeout`` applies to a single HTTP attempt.  A deadline caps the wall
+time of everything done inside it -- retries, backoff sleeps, currency
+rollbacks and concurrent fan-out -- and is carried in a context variable,
+so every request made while it is active sees the remaining budget::
+
+    from bcb import deadline, sgs
+
+    with deadline.budget(5):
+        sgs.get([1, 433])
+
+Deadlines nest: an inner budget never extends an outer one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+import httpx
+
+from bcb.exceptions import DeadlineExceededError
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Point in time by which an operation must finish.
+
+    Parameters
+    ----------
+    seconds : float
+        Budget, in seconds from now.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError(f"deadline must be non-negative, got {seconds!r}")
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def __repr__(self) -> str:
+        return f"Deadline(seconds={self.seconds:g}, remaining={self.remaining():.3f})"
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise :class:`DeadlineExceededError` when the deadline has passed."""
+        if self.expired:
+            raise self.exceeded()
+
+    def exceeded(self) -> DeadlineExceededError:
+        """Exception describing this deadline running out."""
+        return DeadlineExceededError(
+            f"Deadline of {self.seconds:g}s exceeded", self.seconds
+        )
+
+
+_CURRENT_DEADLINE: ContextVar[Optional[Deadline]] = ContextVar(
+    "bcb_deadline", default=None
+)
+
+
+def current() -> Optional[Deadline]:
+    """Return the deadline in effect, or ``None``."""
+    return _CURRENT_DEADLINE.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current deadline, or ``None`` without one."""
+    active = _CURRENT_DEADLINE.get()
+    return None if active is None else active.remaining()
+
+
+def check() -> None:
+    """Raise :class:`DeadlineExceededError` if the current deadline passed."""
+    active = _CURRENT_DEADLINE.get()
+    if active is not None:
+        active.check()
+
+
+@contextmanager
+def budget(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Run the enclosed block under a deadline of ``seconds``.
+
+    Parameters
+    ----------
+    seconds : float, optional
+        Budget in seconds. ``None`` keeps the current deadline, if any.
+
+    Yields
+    ------
+    Deadline or None
+        The deadline in effect inside the block.
+    """
+    outer = _CURRENT_DEADLINE.get()
+    if seconds is None:
+        yield outer
+        return
+    active = Deadline(seconds)
+    if outer is not None and outer.expires_at <= active.expires_at:
+        active = outer
+    token = _CURRENT_DEADLINE.set(active)
+    try:
+        yield active
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+async def wait_for(awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it when the current deadline passes."""
+    active = _CURRENT_DEADLINE.get()
+    if active is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, active.remaining())
+    except asyncio.TimeoutError:
+        if not active.expired:
+            raise
+        raise active.exceeded() from None
+
+
+def _clamp_timeouts(request: httpx.Request, active: Deadline) -> None:
+    left = active.remaining()
+    timeouts = dict(request.extensions.get("timeout", {}))
+    for phase in ("connect", "read", "write", "pool"):
+        value = timeouts.get(phase)
+        timeouts[phase] = left if value is None else min(value, left)
+    request.extensions["timeout"] = timeouts
+
+
+class DeadlineTransport(httpx.BaseTransport):
+    """Transport wrapper that bounds request timeouts by the deadline.
+
+    Requests are refused once the deadline has passed, and timeouts caused
+    by the clamped values are reported as :class:`DeadlineExceededError`.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        active = _CURRENT_DEADLINE.get()
+        if active is None:
+            return self._transport.handle_request(request)
+        active.check()
+        _clamp_timeouts(request, active)
+        try:
+            return self._transport.handle_request(request)
+        except httpx.TimeoutException as ex:
+            if active.expired:
+                raise active.exceeded() from ex
+            raise
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncDeadlineTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`DeadlineTransport`.
+
+    The request is also cancelled when the deadline passes.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        active = _CURRENT_DEADLINE.get()
+        if active is None:
+            return await self._transport.handle_async_request(request)
+        active.check()
+        _clamp_timeouts(request, active)
+        try:
+            return await wait_for(self._transport.handle_async_request(request))
+        except httpx.TimeoutException as ex:
+            if active.expired:
+                raise active.exceeded() from ex
+            raise
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
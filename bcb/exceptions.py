@@ -31,6 +31,15 @@ class BCBAPIServerError(BCBAPIError):
     pass
 
 
+class BCBCircuitOpenError(BCBAPIError):
+    """Raised without contacting BCB while the host's circuit breaker is open."""
+
+    def __init__(self, message: str, host: str, retry_after: float = 0.0):
+        super().__init__(message, 503)
+        self.host = host
+        self.retry_after = retry_after
+
+
 class CurrencyNotFoundError(BCBError):
     """Raised when a requested currency symbol is not found."""
 
@@ -41,3 +50,19 @@ class SGSError(BCBError):
 
 class ODataError(BCBError):
     """Raised for OData query/metadata errors."""
+
+
+class DeadlineExceededError(BCBError, TimeoutError):
+    """Raised when an operation runs past its deadline budget."""
+
+    def __init__(self, message: str, deadline: float):
+        super().__init__(message)
+        self.deadline = deadline
+
+
+class CassetteMissError(BCBError):
+    """Raised when a replayed request has no recorded response."""
+
+    def __init__(self, message: str, url: str):
+        super().__init__(message)
+        self.url = url
@@ -0,0 +1,374 @@
+"""Hedged requests for idempotent ``GET`` calls.
+
+When a request has not answered within a delay derived from recent
+latencies (by default their 95th percentile), an identical second request
+is sent.  Whichever answers first wins and the other is cancelled, trading
+a few extra requests for a much shorter latency tail.  Hedges go through
+the rate limiter, are skipped when it has no spare capacity, and are capped
+to a fraction of the request volume.
+
+Sync requests that could not be hedged -- no hedge budget or rate limit
+capacity left, or every hedging thread busy -- run in the caller's thread.
+The others race on a pool of ``HedgingPolicy.max_threads`` threads, with a
+thread reserved for the request and one for its hedge before it starts, so
+a request never waits for a free thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import math
+import threading
+from collections import deque
+from time import perf_counter as _now
+from typing import Any, Callable, Optional
+
+import httpx
+
+from bcb.metrics import METRICS, MetricsRegistry, endpoint_of
+from bcb.ratelimit import RateLimiter
+from bcb.retry import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Latencies of the most recent requests.
+
+    Parameters
+    ----------
+    size : int, default 200
+        Number of samples kept.
+    """
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank ``q``-quantile of the window, ``None`` when empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(q * len(samples)))
+        return samples[rank - 1]
+
+
+class HedgingPolicy:
+    """When to send a hedge request, shared by the sync and async clients.
+
+    Parameters
+    ----------
+    percentile : float, default 0.95
+        Latency quantile, per host and endpoint, after which a request is
+        hedged.
+    initial_delay : float, default 1.0
+        Delay used until ``min_samples`` latencies have been observed.
+    min_delay, max_delay : float
+        Bounds for the adaptive delay, in seconds.
+    max_ratio : float, default 0.1
+        Hedges allowed per request over the last ``window`` seconds.
+    min_samples : int, default 20
+        Samples needed before the percentile is trusted.
+    window : float, default 10.0
+        Accounting window of ``max_ratio``, in seconds.
+    max_threads : int, default 16
+        Threads available to hedged sync requests, each taking one for
+        itself and one for its hedge.  Requests arriving while they are all
+        busy are not hedged.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.05,
+        max_delay: float = 10.0,
+        max_ratio: float = 0.1,
+        min_samples: int = 20,
+        window: float = 10.0,
+        max_threads: int = 16,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError(f"percentile must be in (0, 1), got {percentile!r}")
+        if min_delay < 0 or max_delay < min_delay:
+            raise ValueError("delays must satisfy 0 <= min_delay <= max_delay")
+        if max_threads < 2:
+            raise ValueError(f"max_threads must be at least 2, got {max_threads!r}")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.max_threads = max_threads
+        self._budget = RetryBudget(max_ratio, min_retries_per_second=0.0, window=window)
+        self._latencies: dict[tuple[str, str], LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._busy_threads = 0
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._threads_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"HedgingPolicy(percentile={self.percentile}, "
+            f"max_ratio={self.max_ratio}, "
+            f"delays=[{self.min_delay}, {self.max_delay}])"
+        )
+
+    def _window(self, key: tuple[str, str]) -> LatencyWindow:
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = LatencyWindow()
+            return window
+
+    def delay(self, host: str, endpoint: str) -> float:
+        """Seconds to wait for the first response before hedging."""
+        window = self._window((host, endpoint))
+        estimate = window.percentile(self.percentile)
+        if estimate is None or len(window) < self.min_samples:
+            estimate = self.initial_delay
+        return min(self.max_delay, max(self.min_delay, estimate))
+
+    def observe(self, host: str, endpoint: str, seconds: float) -> None:
+        self._window((host, endpoint)).add(seconds)
+
+    def record_request(self) -> None:
+        self._budget.record_request()
+
+    def try_hedge(self) -> bool:
+        """Reserve a hedge, ``False`` when the hedge budget is exhausted."""
+        return self._budget.try_spend()
+
+    def can_hedge(self) -> bool:
+        """Whether the hedge budget has room, without reserving a hedge."""
+        return self._budget.has_budget()
+
+    def _reserve_threads(self, count: int) -> bool:
+        with self._threads_lock:
+            if self._busy_threads + count > self.max_threads:
+                return False
+            self._busy_threads += count
+            return True
+
+    def _release_thread(self) -> None:
+        with self._threads_lock:
+            self._busy_threads -= 1
+
+    def _run(
+        self, send: Callable[[httpx.Request], httpx.Response], request: httpx.Request
+    ) -> concurrent.futures.Future[httpx.Response]:
+        # Runs send(request) on a thread reserved with _reserve_threads
+        def run() -> httpx.Response:
+            try:
+                return send(request)
+            finally:
+                self._release_thread()
+
+        with self._threads_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="bcb-hedge"
+                )
+            executor = self._executor
+        return executor.submit(contextvars.copy_context().run, run)
+
+    def _reset_after_fork(self) -> None:
+        # Worker threads do not survive fork(); the child starts a new pool
+        self._threads_lock = threading.Lock()
+        self._busy_threads = 0
+        self._executor = None
+
+
+def _clone(request: httpx.Request) -> httpx.Request:
+    return httpx.Request(
+        request.method,
+        request.url,
+        headers=request.headers,
+        extensions=dict(request.extensions),
+    )
+
+
+class _Hedge:
+    """Bookkeeping shared by the sync and async transports."""
+
+    def __init__(
+        self,
+        request: httpx.Request,
+        policy: HedgingPolicy,
+        limiter: Optional[RateLimiter],
+        registry: MetricsRegistry,
+    ) -> None:
+        self.host = request.url.host
+        self.endpoint = endpoint_of(request.url)
+        self.policy = policy
+        self.limiter = limiter
+        self.registry = registry
+        policy.record_request()
+
+    def delay(self) -> float:
+        return self.policy.delay(self.host, self.endpoint)
+
+    def possible(self) -> bool:
+        """Whether a hedge could be sent, without reserving it."""
+        if self.limiter is not None and not self.limiter.has_capacity(self.host):
+            return False
+        return self.policy.can_hedge()
+
+    def allowed(self) -> bool:
+        if self.limiter is not None and not self.limiter.has_capacity(self.host):
+            return False
+        if not self.policy.try_hedge():
+            return False
+        logger.debug(f"Hedging request to {self.host}{self.endpoint}")
+        self.registry.increment("hedges", host=self.host, endpoint=self.endpoint)
+        return True
+
+    def won(self, seconds: float, *, by_hedge: bool) -> None:
+        self.policy.observe(self.host, self.endpoint, seconds)
+        if by_hedge:
+            self.registry.increment(
+                "hedge_wins", host=self.host, endpoint=self.endpoint
+            )
+
+
+def _close_quietly(future: concurrent.futures.Future[httpx.Response]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class HedgingTransport(httpx.BaseTransport):
+    """Transport wrapper that hedges slow ``GET`` requests.
+
+    Parameters
+    ----------
+    transport : httpx.BaseTransport
+        Transport that performs the requests, usually rate limited.
+    policy : HedgingPolicy
+        Hedging delays and budget.
+    limiter : RateLimiter, optional
+        Limiter consulted before hedging; hosts without spare capacity are
+        not hedged.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        policy: HedgingPolicy,
+        limiter: Optional[RateLimiter] = None,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        self._transport = transport
+        self.policy = policy
+        self.limiter = limiter
+        self.registry = registry
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return self._transport.handle_request(request)
+        hedge = _Hedge(request, self.policy, self.limiter, self.registry)
+        if not hedge.possible() or not self.policy._reserve_threads(2):
+            started = _now()
+            response = self._transport.handle_request(request)
+            hedge.won(_now() - started, by_hedge=False)
+            return response
+        # Both threads are reserved, so neither attempt waits for one
+        started = _now()
+        primary = self.policy._run(self._transport.handle_request, request)
+        done, _ = concurrent.futures.wait([primary], timeout=hedge.delay())
+        if done or not hedge.allowed():
+            self.policy._release_thread()
+            response = primary.result()
+            hedge.won(_now() - started, by_hedge=False)
+            return response
+        secondary = self.policy._run(self._transport.handle_request, _clone(request))
+        futures = [primary, secondary]
+        error: Optional[BaseException] = None
+        for future in concurrent.futures.as_completed(futures):
+            exc = future.exception()
+            if exc is not None:
+                error = error or exc
+                continue
+            # A loser already running keeps its thread until it answers
+            loser = secondary if future is primary else primary
+            loser.add_done_callback(_close_quietly)
+            hedge.won(_now() - started, by_hedge=future is secondary)
+            return future.result()
+        assert error is not None
+        raise error
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncHedgingTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`HedgingTransport`."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        policy: HedgingPolicy,
+        limiter: Optional[RateLimiter] = None,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        self._transport = transport
+        self.policy = policy
+        self.limiter = limiter
+        self.registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+        hedge = _Hedge(request, self.policy, self.limiter, self.registry)
+        started = _now()
+        primary = asyncio.ensure_future(self._transport.handle_async_request(request))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge.delay())
+            if done or not hedge.allowed():
+                response = await primary
+                tasks.discard(primary)
+                hedge.won(_now() - started, by_hedge=False)
+                return response
+            secondary = asyncio.ensure_future(
+                self._transport.handle_async_request(_clone(request))
+            )
+            tasks.add(secondary)
+            error: Optional[BaseException] = None
+            pending: set[asyncio.Future[Any]] = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    exc = task.exception()
+                    if exc is not None:
+                        error = error or exc
+                        continue
+                    tasks.discard(task)
+                    hedge.won(_now() - started, by_hedge=task is secondary)
+                    return task.result()  # type: ignore[no-any-return]
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
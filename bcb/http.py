@@ -2,82 +2,552 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, NoReturn, TypeAlias, TypeVar
+import asyncio
+import contextvars
+import enum
+import importlib.util
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Literal,
+    Mapping,
+    NoReturn,
+    Optional,
+    TypeAlias,
+    TypeVar,
+    Union,
+    overload,
+)
 
 import httpx
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-)
+from tenacity import RetryCallState, retry
 
+from bcb import deadline
+from bcb.cache import AsyncCacheTransport, CacheTransport, HTTPCache
+from bcb.cassette import (
+    AsyncCassetteTransport,
+    Cassette,
+    CassetteMode,
+    CassetteTransport,
+)
+from bcb.concurrency import AdaptiveConcurrency, AsyncAdaptiveConcurrencyTransport
+from bcb.circuitbreaker import (
+    AsyncCircuitBreakerTransport,
+    CircuitBreaker,
+    CircuitBreakerTransport,
+)
+from bcb.datacache import CacheBackend, MemoryLRUCache
+from bcb.deadline import AsyncDeadlineTransport, DeadlineTransport
 from bcb.exceptions import (
     BCBAPIError,
     BCBAPINotFoundError,
     BCBAPIServerError,
     BCBRateLimitError,
 )
+from bcb.hedging import AsyncHedgingTransport, HedgingPolicy, HedgingTransport
+from bcb.metrics import (
+    METRICS,
+    AsyncInstrumentedTransport,
+    HTTPEvent,
+    InstrumentedTransport,
+    MetricsRegistry,
+    emit,
+    endpoint_of,
+)
+from bcb.metrics import add_event_hook as add_event_hook
+from bcb.metrics import remove_event_hook as remove_event_hook
+from bcb.ratelimit import AsyncRateLimitTransport, RateLimiter, RateLimitTransport
+from bcb.retry import DEFAULT_RETRY_POLICY, NO_RETRY, RetryPolicy
+from bcb.singleflight import AsyncSingleFlightTransport, SingleFlightTransport
+from bcb.spool import DEFAULT_SPOOL_THRESHOLD
+from bcb.upstream import AsyncUpstreamTransport, UpstreamTransport
+
+if TYPE_CHECKING:
+    from bcb.client import Client
+
+logger = logging.getLogger(__name__)
 
 # Default timeout for all HTTP requests (seconds)
 DEFAULT_TIMEOUT = 30.0
 
 RequestTimeout: TypeAlias = float | httpx.Timeout | None
 
-# Shared synchronous HTTP client
-_CLIENT = httpx.Client(
-    timeout=DEFAULT_TIMEOUT,
-    follow_redirects=True,
-)
 
+class _Unset(enum.Enum):
+    UNSET = enum.auto()
+
+
+# Marks arguments of configure() that were not given, where None is valid
+_UNSET = _Unset.UNSET
+
+
+@dataclass(frozen=True)
+class HTTPConfig:
+    """Connection settings of the shared clients.
+
+    Attributes
+    ----------
+    timeout : float
+        Default timeout in seconds for every request.
+    max_connections : int, optional
+        Maximum number of open connections per client; ``None`` is
+        unlimited.
+    max_keepalive_connections : int, optional
+        Maximum number of idle connections kept open for reuse.
+    keepalive_expiry : float, optional
+        Seconds an idle connection is kept open.
+    max_connections_per_host : Mapping[str, int]
+        Connection caps for specific hosts, e.g.
+        ``{"olinda.bcb.gov.br": 8}``. Each listed host gets a dedicated
+        pool of that size.
+    http2 : bool
+        Negotiate HTTP/2 so concurrent requests to a host are multiplexed
+        over one connection. Requires the ``h2`` package
+        (``pip install python-bcb[http2]``).
+    transport_retries : int
+        Times a failed connection attempt is retried by the transport
+        itself, before any response is received.
+    spool_threshold : int
+        Bytes of a streamed response body kept in memory before it rolls
+        over to a temporary file on disk.
+    upstream : str, optional
+        Base URL of a server that receives every request in place of the
+        BCB hosts, keeping path and query, e.g. a local stand-in from
+        :mod:`bcb.testing`.
+    """
+
+    timeout: float = DEFAULT_TIMEOUT
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    max_connections_per_host: Mapping[str, int] = field(default_factory=dict)
+    http2: bool = False
+    transport_retries: int = 0
+    spool_threshold: int = DEFAULT_SPOOL_THRESHOLD
+    upstream: Optional[str] = None
+
+    def limits(self, max_connections: Optional[int] = None) -> httpx.Limits:
+        if max_connections is None:
+            max_connections = self.max_connections
+        keepalive = self.max_keepalive_connections
+        if keepalive is not None and max_connections is not None:
+            keepalive = min(keepalive, max_connections)
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @classmethod
+    def from_env(cls) -> HTTPConfig:
+        """Build a configuration from ``BCB_HTTP_*`` environment variables.
+
+        Invalid values are logged and ignored.
+        """
+        settings: dict[str, Any] = {}
+        for name, (variable, parse) in _ENV_SETTINGS.items():
+            value = os.environ.get(variable)
+            if not value:
+                continue
+            try:
+                settings[name] = parse(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid {variable}={value!r}")
+        if settings.get("http2") and not _http2_available():
+            logger.warning("BCB_HTTP2 is set but the h2 package is not installed")
+            settings["http2"] = False
+        return cls(**settings)
+
+
+def _parse_optional_int(value: str) -> Optional[int]:
+    return None if value.lower() == "none" else int(value)
+
+
+def _parse_optional_float(value: str) -> Optional[float]:
+    return None if value.lower() == "none" else float(value)
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(value)
+
+
+def _parse_host_limits(value: str) -> dict[str, int]:
+    # "olinda.bcb.gov.br=8,api.bcb.gov.br=16"
+    limits = {}
+    for item in value.split(","):
+        host, sep, count = item.partition("=")
+        if not sep:
+            raise ValueError(item)
+        limits[host.strip()] = int(count)
+    return limits
+
+
+_ENV_SETTINGS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "timeout": ("BCB_HTTP_TIMEOUT", float),
+    "max_connections": ("BCB_HTTP_MAX_CONNECTIONS", _parse_optional_int),
+    "max_keepalive_connections": (
+        "BCB_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        _parse_optional_int,
+    ),
+    "keepalive_expiry": ("BCB_HTTP_KEEPALIVE_EXPIRY", _parse_optional_float),
+    "max_connections_per_host": (
+        "BCB_HTTP_MAX_CONNECTIONS_PER_HOST",
+        _parse_host_limits,
+    ),
+    "http2": ("BCB_HTTP2", _parse_bool),
+    "transport_retries": ("BCB_HTTP_TRANSPORT_RETRIES", int),
+    "spool_threshold": ("BCB_HTTP_SPOOL_THRESHOLD", int),
+    "upstream": ("BCB_HTTP_UPSTREAM", str),
+}
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+# Connection settings of the shared clients
+_CONFIG = HTTPConfig.from_env()
+
+# Persistent response cache shared by both clients (disabled by default)
+_HTTP_CACHE: Optional[HTTPCache] = None
+
+# Per-host rate limiter shared by both clients (disabled by default)
+_RATE_LIMITER: Optional[RateLimiter] = None
 
-def _make_async_client() -> httpx.AsyncClient:
+# Coalesce identical in-flight GET requests (disabled by default)
+_SINGLE_FLIGHT = False
+
+# Per-host circuit breaker shared by both clients (disabled by default)
+_CIRCUIT_BREAKER: Optional[CircuitBreaker] = None
+
+# Record/replay responses instead of always using the network (disabled by default)
+_CASSETTE: Optional[Cassette] = None
+
+# Hedge slow GET requests (disabled by default)
+_HEDGING: Optional[HedgingPolicy] = None
+
+# Adaptive per-host limit on concurrent async requests (enabled by default)
+_CONCURRENCY: Optional[AdaptiveConcurrency] = AdaptiveConcurrency()
+
+
+@dataclass(frozen=True)
+class _Features:
+    """Connection settings and the layers stacked on top of the pool."""
+
+    config: HTTPConfig
+    cache: Optional[HTTPCache] = None
+    rate_limiter: Optional[RateLimiter] = None
+    single_flight: bool = False
+    hedging: Optional[HedgingPolicy] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    cassette: Optional[Cassette] = None
+    concurrency: Optional[AdaptiveConcurrency] = None
+    metrics: MetricsRegistry = METRICS
+
+
+def _global_features() -> _Features:
+    # Settings made through the module-level setters
+    return _Features(
+        config=_CONFIG,
+        cache=_HTTP_CACHE,
+        rate_limiter=_RATE_LIMITER,
+        single_flight=_SINGLE_FLIGHT,
+        hedging=_HEDGING,
+        circuit_breaker=_CIRCUIT_BREAKER,
+        cassette=_CASSETTE,
+        concurrency=_CONCURRENCY,
+    )
+
+
+def _make_transport(
+    limits: Optional[httpx.Limits] = None, features: Optional[_Features] = None
+) -> httpx.BaseTransport:
+    f = features or _global_features()
+    transport: httpx.BaseTransport = httpx.HTTPTransport(
+        limits=limits or f.config.limits(),
+        http2=f.config.http2,
+        retries=f.config.transport_retries,
+    )
+    if f.config.upstream is not None:
+        transport = UpstreamTransport(transport, f.config.upstream)
+    if f.cassette is not None:
+        transport = CassetteTransport(transport, f.cassette)
+    transport = DeadlineTransport(transport)
+    if f.rate_limiter is not None:
+        transport = RateLimitTransport(transport, f.rate_limiter)
+    if f.hedging is not None:
+        transport = HedgingTransport(transport, f.hedging, f.rate_limiter, f.metrics)
+    if f.cache is not None:
+        transport = CacheTransport(transport, f.cache)
+    if f.circuit_breaker is not None:
+        transport = CircuitBreakerTransport(transport, f.circuit_breaker, f.cache)
+    if f.single_flight:
+        transport = SingleFlightTransport(transport)
+    return InstrumentedTransport(transport, f.metrics)
+
+
+def _make_async_transport(
+    limits: Optional[httpx.Limits] = None, features: Optional[_Features] = None
+) -> httpx.AsyncBaseTransport:
+    f = features or _global_features()
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        limits=limits or f.config.limits(),
+        http2=f.config.http2,
+        retries=f.config.transport_retries,
+    )
+    if f.config.upstream is not None:
+        transport = AsyncUpstreamTransport(transport, f.config.upstream)
+    if f.cassette is not None:
+        transport = AsyncCassetteTransport(transport, f.cassette)
+    transport = AsyncDeadlineTransport(transport)
+    if f.concurrency is not None:
+        transport = AsyncAdaptiveConcurrencyTransport(transport, f.concurrency)
+    if f.rate_limiter is not None:
+        transport = AsyncRateLimitTransport(transport, f.rate_limiter)
+    if f.hedging is not None:
+        transport = AsyncHedgingTransport(
+            transport, f.hedging, f.rate_limiter, f.metrics
+        )
+    if f.cache is not None:
+        transport = AsyncCacheTransport(transport, f.cache)
+    if f.circuit_breaker is not None:
+        transport = AsyncCircuitBreakerTransport(transport, f.circuit_breaker, f.cache)
+    if f.single_flight:
+        transport = AsyncSingleFlightTransport(transport)
+    return AsyncInstrumentedTransport(transport, f.metrics)
+
+
+def _host_limits(config: HTTPConfig) -> dict[str, httpx.Limits]:
+    # Mount patterns for hosts with a dedicated pool
+    return {
+        f"all://{host}": config.limits(count)
+        for host, count in config.max_connections_per_host.items()
+    }
+
+
+def _make_client(features: Optional[_Features] = None) -> httpx.Client:
+    f = features or _global_features()
+    return httpx.Client(
+        timeout=f.config.timeout,
+        follow_redirects=True,
+        transport=_make_transport(features=f),
+        mounts={
+            pattern: _make_transport(limits, f)
+            for pattern, limits in _host_limits(f.config).items()
+        },
+    )
+
+
+def _make_async_client(features: Optional[_Features] = None) -> httpx.AsyncClient:
+    f = features or _global_features()
     return httpx.AsyncClient(
-        timeout=DEFAULT_TIMEOUT,
+        timeout=f.config.timeout,
         follow_redirects=True,
+        transport=_make_async_transport(features=f),
+        mounts={
+            pattern: _make_async_transport(limits, f)
+            for pattern, limits in _host_limits(f.config).items()
+        },
     )
 
 
-# Shared asynchronous HTTP client
-_ASYNC_CLIENT = _make_async_client()
+# Shared synchronous HTTP client, created on first use
+_CLIENT: Optional[httpx.Client] = None
+
+
+# Async client handed out outside of a running event loop, created on first use
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+class _LoopClient:
+    """Async client owned by one event loop.
+
+    An async generator is started on the loop so that the loop's
+    ``shutdown_asyncgens()`` -- called by ``asyncio.run()`` on exit --
+    finalises it and closes the client while the loop is still running.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        client: httpx.AsyncClient,
+        registry: Optional[dict[asyncio.AbstractEventLoop, _LoopClient]] = None,
+    ) -> None:
+        self.loop = loop
+        self.client = client
+        self._registry = _LOOP_CLIENTS if registry is None else registry
+        self._closer = self._close_on_shutdown()
+        # The first step registers the generator with the running loop and
+        # stops at the ``yield`` without awaiting anything.
+        try:
+            self._closer.asend(None).send(None)
+        except StopIteration:
+            pass
+
+    async def _close_on_shutdown(self) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            with _LOOP_CLIENTS_LOCK:
+                if self._registry.get(self.loop) is self:
+                    del self._registry[self.loop]
+            if not self.client.is_closed:
+                await self.client.aclose()
+
+
+# Async clients by running event loop, each with its own connection pool
+_LOOP_CLIENTS: dict[asyncio.AbstractEventLoop, _LoopClient] = {}
+_LOOP_CLIENTS_LOCK = threading.Lock()
 
 
-# Retry decorator for transient failures
-# Retries on any exception (connection errors, timeouts, HTTP 5xx, etc.)
-_retry_decorator = retry(
-    stop=stop_after_attempt(4),  # 1 initial + 3 retries = 4 attempts
-    wait=wait_exponential(multiplier=1, min=1, max=10),
-    reraise=True,
+def _forget_closed_loops(
+    registry: Optional[dict[asyncio.AbstractEventLoop, _LoopClient]] = None,
+) -> None:
+    # Must be called with _LOOP_CLIENTS_LOCK held
+    registry = _LOOP_CLIENTS if registry is None else registry
+    for loop in [loop for loop in registry if loop.is_closed()]:
+        del registry[loop]
+
+
+# Session activated by bcb.Client for the current thread or task
+_SESSION: contextvars.ContextVar[Optional[Client]] = contextvars.ContextVar(
+    "bcb_session", default=None
 )
 
 
+def current_session() -> Optional[Client]:
+    """Return the :class:`bcb.Client` active in this context, if any."""
+    return _SESSION.get()
+
+
+# Guards creation of the shared sync client on first use
+_CLIENT_LOCK = threading.Lock()
+
+# Process that built the shared clients; another PID means we were forked
+_PID = os.getpid()
+
+
+def _reinit_after_fork() -> None:
+    """Replace the state inherited from the parent process after ``fork()``.
+
+    The inherited clients hold pooled sockets shared with the parent, so they
+    are abandoned without being closed -- closing them could shut down the
+    parent's TLS sessions -- and fresh clients are built on first use.
+    """
+    global _PID, _CLIENT, _ASYNC_CLIENT, _CLIENT_LOCK, _LOOP_CLIENTS_LOCK
+    _PID = os.getpid()
+    _LOOP_CLIENTS_LOCK = threading.Lock()
+    _CLIENT_LOCK = threading.Lock()
+    _LOOP_CLIENTS.clear()
+    if _HEDGING is not None:
+        _HEDGING._reset_after_fork()
+    if _CONCURRENCY is not None:
+        _CONCURRENCY.reset()
+    _CLIENT = None
+    _ASYNC_CLIENT = None
+
+
+def _check_fork() -> None:
+    # Catches forks that bypassed os.register_at_fork (e.g. from C code)
+    if os.getpid() != _PID:
+        logger.debug("Process id changed, rebuilding HTTP clients")
+        _reinit_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+# Retry policies by module name; modules without an entry use the default.
+# Currency and OData historically made a single attempt, so they keep doing
+# so unless a policy is registered for them.
+_DEFAULT_RETRY_POLICY = DEFAULT_RETRY_POLICY
+_RETRY_POLICIES: dict[str, RetryPolicy] = {
+    "currency": NO_RETRY,
+    "odata": NO_RETRY,
+}
+
+
 def get_client() -> httpx.Client:
     """Get the shared synchronous HTTP client.
 
+    Inside a :class:`bcb.Client` session the session's client is returned.
+
     Returns
     -------
     httpx.Client
         Shared client with connection pooling and configured timeout.
     """
-    return _CLIENT
+    global _CLIENT
+    session = _SESSION.get()
+    if session is not None:
+        return session.get_client()
+    _check_fork()
+    client = _CLIENT
+    if client is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = _make_client()
+            client = _CLIENT
+    return client
 
 
 def get_async_client() -> httpx.AsyncClient:
-    """Get the shared asynchronous HTTP client.
+    """Get the asynchronous HTTP client for the running event loop.
+
+    Each event loop gets its own client, created on first use, so
+    connections are never shared between loops (for example worker threads
+    that each call ``asyncio.run``).  The client is closed automatically
+    when ``asyncio.run`` shuts its loop down.  Outside of a running loop a
+    single module-level client is returned.  Inside a :class:`bcb.Client`
+    session the session's client is returned.
 
     Returns
     -------
     httpx.AsyncClient
-        Shared async client with connection pooling and configured timeout.
+        Async client with connection pooling and configured timeout.
     """
     global _ASYNC_CLIENT
-    if _ASYNC_CLIENT.is_closed:
-        _ASYNC_CLIENT = _make_async_client()
-    return _ASYNC_CLIENT
+    session = _SESSION.get()
+    if session is not None:
+        return session.get_async_client()
+    _check_fork()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+            _ASYNC_CLIENT = _make_async_client()
+        return _ASYNC_CLIENT
+    with _LOOP_CLIENTS_LOCK:
+        entry = _LOOP_CLIENTS.get(loop)
+        if entry is None or entry.client.is_closed:
+            _forget_closed_loops()
+            entry = _LOOP_CLIENTS[loop] = _LoopClient(loop, _make_async_client())
+        return entry.client
 
 
 async def aclose_async_client() -> None:
-    """Close the shared async client from async code."""
-    if not _ASYNC_CLIENT.is_closed:
+    """Close the running loop's async client from async code.
+
+    The client handed out outside of any loop is closed as well.
+    """
+    with _LOOP_CLIENTS_LOCK:
+        entry = _LOOP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if entry is not None and not entry.client.is_closed:
+        await entry.client.aclose()
+    if _ASYNC_CLIENT is not None and not _ASYNC_CLIENT.is_closed:
         await _ASYNC_CLIENT.aclose()
 
 
@@ -87,8 +557,6 @@ def close_async_client() -> None:
     Call this in long-running applications before shutdown to properly
     close HTTP connections.
     """
-    import asyncio
-
     try:
         loop = asyncio.get_running_loop()
     except RuntimeError:
@@ -97,6 +565,558 @@ def close_async_client() -> None:
         loop.create_task(aclose_async_client())
 
 
+def _rebuild_clients() -> None:
+    """Drop the shared clients so the next use builds them with the current
+    transports."""
+    global _CLIENT, _ASYNC_CLIENT
+    with _CLIENT_LOCK:
+        old_client, _CLIENT = _CLIENT, None
+    if old_client is not None:
+        old_client.close()
+    _ASYNC_CLIENT = None
+    with _LOOP_CLIENTS_LOCK:
+        dropped = list(_LOOP_CLIENTS.values())
+        _LOOP_CLIENTS.clear()
+    for entry in dropped:
+        _close_loop_client(entry)
+
+
+def _close_loop_client(entry: _LoopClient) -> None:
+    # The client is closed on its own loop: scheduled when the loop is
+    # running, perhaps in another thread, and run to completion otherwise
+    if entry.client.is_closed or entry.loop.is_closed():
+        return
+    if entry.loop.is_running():
+        asyncio.run_coroutine_threadsafe(entry.client.aclose(), entry.loop)
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        entry.loop.run_until_complete(entry.client.aclose())
+
+
+def enable_cache(
+    directory: Union[str, Path, None] = None,
+    *,
+    ttl: float = 0.0,
+    stale_while_revalidate: float = 0.0,
+) -> HTTPCache:
+    """Enable the persistent on-disk HTTP response cache.
+
+    Successful ``GET`` responses are stored on disk keyed by URL and query
+    parameters.  Within ``ttl`` seconds a stored response is returned without
+    contacting BCB; afterwards it is revalidated with a conditional GET using
+    ``ETag``/``Last-Modified``, so unchanged data costs a ``304`` instead of a
+    full download.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cache directory. Defaults to ``BCB_CACHE_DIR`` or
+        ``~/.cache/python-bcb``.
+    ttl : float, default 0
+        Seconds a response is served from disk without revalidation.
+    stale_while_revalidate : float, default 0
+        Seconds after ``ttl`` during which the stale response is returned
+        immediately and refreshed in the background.
+
+    Returns
+    -------
+    HTTPCache
+        The active cache.
+    """
+    global _HTTP_CACHE
+    _HTTP_CACHE = HTTPCache(
+        directory, ttl=ttl, stale_while_revalidate=stale_while_revalidate
+    )
+    _rebuild_clients()
+    return _HTTP_CACHE
+
+
+def disable_cache() -> None:
+    """Disable the persistent HTTP response cache.
+
+    Stored entries are kept on disk; use :meth:`HTTPCache.clear` to remove
+    them.
+    """
+    global _HTTP_CACHE
+    if _HTTP_CACHE is None:
+        return
+    _HTTP_CACHE = None
+    _rebuild_clients()
+
+
+def configure(
+    *,
+    timeout: Optional[float] = None,
+    max_connections: Union[int, None, _Unset] = _UNSET,
+    max_keepalive_connections: Union[int, None, _Unset] = _UNSET,
+    keepalive_expiry: Union[float, None, _Unset] = _UNSET,
+    max_connections_per_host: Optional[Mapping[str, int]] = None,
+    http2: Optional[bool] = None,
+    transport_retries: Optional[int] = None,
+    spool_threshold: Optional[int] = None,
+    upstream: Union[str, None, _Unset] = _UNSET,
+) -> HTTPConfig:
+    """Change the connection settings and rebuild the shared clients.
+
+    Only the arguments given are changed. Initial values come from the
+    ``BCB_HTTP_TIMEOUT``, ``BCB_HTTP_MAX_CONNECTIONS``,
+    ``BCB_HTTP_MAX_KEEPALIVE_CONNECTIONS``, ``BCB_HTTP_KEEPALIVE_EXPIRY``,
+    ``BCB_HTTP_MAX_CONNECTIONS_PER_HOST`` (``host=n,host=n``),
+    ``BCB_HTTP2``, ``BCB_HTTP_TRANSPORT_RETRIES``,
+    ``BCB_HTTP_SPOOL_THRESHOLD`` and ``BCB_HTTP_UPSTREAM`` environment
+    variables,
+    falling back to the httpx defaults.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        Default timeout in seconds for every request.
+    max_connections : int or None, optional
+        Maximum open connections per client; ``None`` removes the cap.
+    max_keepalive_connections : int or None, optional
+        Maximum idle connections kept for reuse; ``None`` removes the cap.
+    keepalive_expiry : float or None, optional
+        Seconds an idle connection is kept open; ``None`` keeps it forever.
+    max_connections_per_host : Mapping[str, int], optional
+        Dedicated connection pools for specific hosts, e.g.
+        ``{"olinda.bcb.gov.br": 8}``. Replaces the previous mapping.
+    http2 : bool, optional
+        Negotiate HTTP/2 with BCB hosts, multiplexing concurrent requests
+        over a single connection. Requires the ``h2`` package.
+    transport_retries : int, optional
+        Connection attempts retried by the transport before any response
+        is received (independent of :func:`set_retry_policy`).
+    spool_threshold : int, optional
+        Bytes of a large response body (SGS series, OData queries) kept in
+        memory while it downloads; the rest is written to a temporary file.
+    upstream : str, optional
+        Send every request to this base URL instead of the BCB hosts, e.g.
+        the ``url`` of a :class:`bcb.testing.StandInServer`.  ``None``
+        talks to the BCB hosts again.
+
+    Returns
+    -------
+    HTTPConfig
+        The configuration now in effect.
+
+    Raises
+    ------
+    ImportError
+        If ``http2=True`` and the ``h2`` package is not installed.
+    """
+    global _CONFIG
+    changes: dict[str, Any] = {
+        name: value
+        for name, value in {
+            "timeout": timeout,
+            "max_connections_per_host": max_connections_per_host,
+            "http2": http2,
+            "transport_retries": transport_retries,
+            "spool_threshold": spool_threshold,
+        }.items()
+        if value is not None
+    }
+    changes.update(
+        (name, value)
+        for name, value in {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "upstream": upstream,
+        }.items()
+        if value is not _UNSET
+    )
+    if changes.get("http2") and not _http2_available():
+        raise ImportError(
+            "HTTP/2 support requires the h2 package. "
+            "Install it with: pip install 'python-bcb[http2]'"
+        )
+    _CONFIG = replace(_CONFIG, **changes)
+    _rebuild_clients()
+    return _CONFIG
+
+
+def get_config() -> HTTPConfig:
+    """Return the connection settings of the shared clients."""
+    return _CONFIG
+
+
+def active_config() -> HTTPConfig:
+    """Return the settings of the active :class:`bcb.Client` session, or of
+    the shared clients outside of one."""
+    session = _SESSION.get()
+    return _CONFIG if session is None else session.config
+
+
+def get_cache() -> Optional[HTTPCache]:
+    """Return the active HTTP response cache, or ``None`` when disabled."""
+    return _HTTP_CACHE
+
+
+# Backend of the parsed-data caches (currency tables, OData metadata, SGS)
+_DATA_CACHE: CacheBackend = MemoryLRUCache()
+
+
+def set_data_cache(backend: CacheBackend) -> CacheBackend:
+    """Replace the backend of the parsed-data caches.
+
+    The currency tables, the OData metadata and, when enabled with
+    :func:`bcb.sgs.enable_cache`, the SGS series are kept in it.  Entries
+    of the previous backend are not copied.
+
+    Parameters
+    ----------
+    backend : CacheBackend
+        A backend from :mod:`bcb.datacache`, e.g. ``MemoryLRUCache(...)``,
+        ``SQLiteCache(...)`` or a ``TieredCache`` of both.
+
+    Returns
+    -------
+    CacheBackend
+        The backend now in use.
+    """
+    global _DATA_CACHE
+    _DATA_CACHE = backend
+    return _DATA_CACHE
+
+
+def get_data_cache() -> CacheBackend:
+    """Return the backend of the parsed-data caches."""
+    return _DATA_CACHE
+
+
+def active_data_cache() -> CacheBackend:
+    """Return the data cache of the active :class:`bcb.Client` session, or
+    the shared one outside of one."""
+    session = _SESSION.get()
+    return _DATA_CACHE if session is None else session.data_cache
+
+
+def set_rate_limit(
+    rate: Optional[float] = None,
+    *,
+    burst: int = 1,
+    per_host: Optional[Mapping[str, float]] = None,
+) -> Optional[RateLimiter]:
+    """Limit the request rate to each BCB host.
+
+    The limiter is shared by the sync and async clients, so requests made
+    from threads, event loops and ``async_get`` fan-outs all draw from the
+    same per-host budget.  When a host answers ``429`` its rate is halved and
+    paused for ``Retry-After`` seconds, then grows back towards the
+    configured value as requests succeed.
+
+    Parameters
+    ----------
+    rate : float, optional
+        Requests per second for every host not listed in ``per_host``.
+    burst : int, default 1
+        Requests allowed back-to-back before spacing kicks in.
+    per_host : Mapping[str, float], optional
+        Requests per second for specific hosts, e.g.
+        ``{"api.bcb.gov.br": 10, "olinda.bcb.gov.br": 4}``.
+
+    Returns
+    -------
+    RateLimiter or None
+        The active limiter, or ``None`` when both ``rate`` and ``per_host``
+        are omitted, which disables rate limiting.
+    """
+    global _RATE_LIMITER
+    if rate is None and not per_host:
+        _RATE_LIMITER = None
+    else:
+        _RATE_LIMITER = RateLimiter(rate, burst=burst, per_host=per_host)
+    _rebuild_clients()
+    return _RATE_LIMITER
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the active rate limiter, or ``None`` when disabled."""
+    return _RATE_LIMITER
+
+
+def set_single_flight(enabled: bool = True) -> None:
+    """Coalesce identical in-flight ``GET`` requests.
+
+    When enabled, concurrent requests for the same canonical URL (same path
+    and query parameters, in any order) share a single upstream request:
+    the first caller performs it and every other thread or task waiting on
+    the same URL receives a copy of its response, or of its exception.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        ``False`` turns coalescing off.
+    """
+    global _SINGLE_FLIGHT
+    _SINGLE_FLIGHT = enabled
+    _rebuild_clients()
+
+
+def set_hedging(
+    enabled: bool = True,
+    *,
+    percentile: float = 0.95,
+    initial_delay: float = 1.0,
+    min_delay: float = 0.05,
+    max_delay: float = 10.0,
+    max_ratio: float = 0.1,
+    max_threads: int = 16,
+) -> Optional[HedgingPolicy]:
+    """Hedge ``GET`` requests that are slower than usual.
+
+    When a request has not answered after the ``percentile`` latency of
+    recent requests to the same endpoint, an identical request is sent and
+    the first response wins; the other request is cancelled.  Hedges go
+    through the rate limiter, are skipped when the host has no spare
+    capacity, and never exceed ``max_ratio`` of the requests.  The
+    ``hedges`` and ``hedge_wins`` counters of :func:`metrics_snapshot`
+    report how often this happens.
+
+    Sync requests race on a pool of ``max_threads`` threads; requests that
+    cannot be hedged, or that arrive while the pool is busy, run in the
+    caller's thread without a hedge.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        ``False`` turns hedging off.
+    percentile : float, default 0.95
+        Latency quantile after which a request is hedged.
+    initial_delay : float, default 1.0
+        Delay used until enough latencies have been observed.
+    min_delay, max_delay : float
+        Bounds for the adaptive delay, in seconds.
+    max_ratio : float, default 0.1
+        Hedges allowed per request.
+    max_threads : int, default 16
+        Threads shared by hedged sync requests, one for each request and
+        one for its hedge.
+
+    Returns
+    -------
+    HedgingPolicy or None
+        The active policy, or ``None`` when hedging is disabled.
+    """
+    global _HEDGING
+    _HEDGING = (
+        HedgingPolicy(
+            percentile=percentile,
+            initial_delay=initial_delay,
+            min_delay=min_delay,
+            max_delay=max_delay,
+            max_ratio=max_ratio,
+            max_threads=max_threads,
+        )
+        if enabled
+        else None
+    )
+    _rebuild_clients()
+    return _HEDGING
+
+
+def get_hedging_policy() -> Optional[HedgingPolicy]:
+    """Return the active hedging policy, or ``None`` when disabled."""
+    return _HEDGING
+
+
+def set_circuit_breaker(
+    enabled: bool = True,
+    *,
+    failure_rate: float = 0.5,
+    min_requests: int = 5,
+    window: float = 30.0,
+    recovery_time: float = 30.0,
+) -> Optional[CircuitBreaker]:
+    """Fail fast on BCB hosts that keep failing.
+
+    Connection errors, timeouts and ``5xx`` responses count as failures.
+    Once ``failure_rate`` of at least ``min_requests`` requests to a host in
+    the last ``window`` seconds have failed, its circuit opens: requests to
+    it raise :class:`~bcb.exceptions.BCBCircuitOpenError` immediately, which
+    is never retried, or return the cached response when the HTTP cache
+    holds one.  After ``recovery_time`` seconds one probe request is let
+    through; its success closes the circuit.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        ``False`` turns the circuit breaker off.
+    failure_rate : float, default 0.5
+        Share of failed requests that opens the circuit.
+    min_requests : int, default 5
+        Requests needed in the window before the circuit may open.
+    window : float, default 30.0
+        Length of the failure-rate window, in seconds.
+    recovery_time : float, default 30.0
+        Seconds before an open circuit is probed.
+
+    Returns
+    -------
+    CircuitBreaker or None
+        The active breaker, or ``None`` when disabled.
+    """
+    global _CIRCUIT_BREAKER
+    _CIRCUIT_BREAKER = (
+        CircuitBreaker(
+            failure_rate=failure_rate,
+            min_requests=min_requests,
+            window=window,
+            recovery_time=recovery_time,
+        )
+        if enabled
+        else None
+    )
+    _rebuild_clients()
+    return _CIRCUIT_BREAKER
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """Return the active circuit breaker, or ``None`` when disabled."""
+    return _CIRCUIT_BREAKER
+
+
+def set_cassette(
+    directory: Union[str, Path, None] = None,
+    *,
+    mode: CassetteMode = "auto",
+    latency: Union[Literal["recorded"], float, None] = "recorded",
+    bandwidth: Union[Literal["recorded"], float, None] = "recorded",
+) -> Optional[Cassette]:
+    """Record responses to, or replay them from, a cassette directory.
+
+    Recordings are keyed by method and URL with sorted query parameters.
+    Replayed responses wait for the recorded time to first byte and release
+    the body at the recorded transfer rate, unless ``latency`` and
+    ``bandwidth`` say otherwise, so benchmarks run offline with realistic
+    timings.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cassette directory. ``None`` turns record/replay off.
+    mode : {"auto", "record", "replay"}, default "auto"
+        ``auto`` replays known requests and records the others, ``record``
+        always uses the network and ``replay`` never does.
+    latency : "recorded", float or None, default "recorded"
+        Replayed time to first byte, in seconds.
+    bandwidth : "recorded", float or None, default "recorded"
+        Replayed transfer rate, in bytes per second.
+
+    Returns
+    -------
+    Cassette or None
+        The active cassette, or ``None`` when disabled.
+    """
+    global _CASSETTE
+    _CASSETTE = (
+        None
+        if directory is None
+        else Cassette(directory, mode=mode, latency=latency, bandwidth=bandwidth)
+    )
+    _rebuild_clients()
+    return _CASSETTE
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the active cassette, or ``None`` when disabled."""
+    return _CASSETTE
+
+
+def set_adaptive_concurrency(
+    enabled: bool = True,
+    *,
+    initial: int = 8,
+    min_limit: int = 1,
+    max_limit: int = 64,
+    backoff: float = 0.5,
+    latency_tolerance: float = 3.0,
+) -> Optional[AdaptiveConcurrency]:
+    """Adapt the number of concurrent async requests to each host.
+
+    The async clients cap the requests in flight to each host, so the
+    fan-out of ``sgs.async_get`` and ``currency.async_get`` does not flood
+    BCB.  The cap grows by about one request per round of successful
+    responses and is multiplied by ``backoff`` on ``429``, ``5xx``,
+    connection failures and responses slower than ``latency_tolerance``
+    times the usual latency.  It is enabled by default; the state of each
+    host appears under ``"concurrency"`` in :func:`metrics_snapshot`.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        ``False`` lets every request through at once.
+    initial : int, default 8
+        Starting limit for each host.
+    min_limit, max_limit : int
+        Bounds for the limit.
+    backoff : float, default 0.5
+        Factor applied to the limit on overload.
+    latency_tolerance : float, default 3.0
+        Multiple of the latency baseline that counts as a spike.
+
+    Returns
+    -------
+    AdaptiveConcurrency or None
+        The active controller, or ``None`` when disabled.
+    """
+    global _CONCURRENCY
+    _CONCURRENCY = (
+        AdaptiveConcurrency(
+            initial=initial,
+            min_limit=min_limit,
+            max_limit=max_limit,
+            backoff=backoff,
+            latency_tolerance=latency_tolerance,
+        )
+        if enabled
+        else None
+    )
+    _rebuild_clients()
+    return _CONCURRENCY
+
+
+def get_adaptive_concurrency() -> Optional[AdaptiveConcurrency]:
+    """Return the active concurrency controller, or ``None`` when disabled."""
+    return _CONCURRENCY
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the metrics registry fed by the shared clients."""
+    return METRICS
+
+
+def metrics_snapshot() -> dict[str, Any]:
+    """Return a copy of the request metrics collected so far.
+
+    Returns
+    -------
+    dict
+        ``{"counters": {...}, "endpoints": {...}}``. Counters include
+        ``requests``, ``errors``, ``retries``, ``cache_hits``,
+        ``bytes_sent`` and ``bytes_received``; each endpoint, keyed as
+        ``"host/path"``, adds a count per HTTP status and a latency
+        histogram with ``p50``/``p95``/``p99`` estimates.  With the circuit
+        breaker enabled, ``"circuits"`` holds the state of each host, and
+        with adaptive concurrency ``"concurrency"`` holds the limit,
+        requests in flight and queued, and latency baseline of each host.
+    """
+    snapshot = METRICS.snapshot()
+    if _CIRCUIT_BREAKER is not None:
+        snapshot["circuits"] = _CIRCUIT_BREAKER.snapshot()
+    if _CONCURRENCY is not None and (concurrency := _CONCURRENCY.snapshot()):
+        snapshot["concurrency"] = concurrency
+    return snapshot
+
+
+def reset_metrics() -> None:
+    """Discard all collected request metrics."""
+    METRICS.reset()
+
+
 def timeout_kwargs(timeout: RequestTimeout) -> dict[str, Any]:
     """Build request kwargs without overriding the client default timeout."""
     if timeout is None:
@@ -105,6 +1125,7 @@ def timeout_kwargs(timeout: RequestTimeout) -> dict[str, Any]:
 
 
 T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
 
 
 def _raise_error(
@@ -168,17 +1189,157 @@ def raise_for_request_error(
     _raise_error(error_cls, f"{context} request failed: {exc}", status_code=0)
 
 
-def with_retry(func: Callable[..., T]) -> Callable[..., T]:
-    """Decorator to add automatic retry with exponential backoff to any function.
+def set_retry_policy(policy: RetryPolicy, module: Optional[str] = None) -> None:
+    """Set the retry policy for a module or the default policy.
+
+    Parameters
+    ----------
+    policy : RetryPolicy
+        Policy to apply.
+    module : {"sgs", "currency", "odata"}, optional
+        Module the policy applies to. When omitted, ``policy`` becomes the
+        default for modules without a specific policy.
+    """
+    global _DEFAULT_RETRY_POLICY
+    if module is None:
+        _DEFAULT_RETRY_POLICY = policy
+    else:
+        _RETRY_POLICIES[module] = policy
+
+
+def get_retry_policy(module: Optional[str] = None) -> RetryPolicy:
+    """Return the retry policy in effect for ``module``."""
+    if module is None:
+        return _DEFAULT_RETRY_POLICY
+    return _RETRY_POLICIES.get(module, _DEFAULT_RETRY_POLICY)
+
+
+def _failed_request(outcome: Any) -> Optional[httpx.Request]:
+    # The request behind a failed attempt, when it can be recovered
+    if outcome.failed:
+        try:
+            return getattr(outcome.exception(), "request", None)
+        except RuntimeError:
+            return None
+    return getattr(outcome.result(), "request", None)
+
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    outcome = retry_state.outcome
+    if outcome is None:
+        return
+    error = outcome.exception() if outcome.failed else None
+    if error is not None:
+        reason = repr(error)
+    else:
+        reason = f"status {getattr(outcome.result(), 'status_code', '?')}"
+    sleep = retry_state.next_action.sleep if retry_state.next_action else 0.0
+    logger.warning(
+        f"Retrying {getattr(retry_state.fn, '__name__', 'request')} after {reason} "
+        f"(attempt {retry_state.attempt_number}, sleeping {sleep:.2f}s)"
+    )
+    _emit_retry(retry_state, error)
+
+
+def _emit_retry(retry_state: RetryCallState, error: Optional[BaseException]) -> None:
+    assert retry_state.outcome is not None
+    request = _failed_request(retry_state.outcome)
+    session = _SESSION.get()
+    registry = METRICS if session is None else session.metrics
+    if request is None:
+        registry.increment("retries")
+        method = url = host = endpoint = ""
+    else:
+        method, url, host = request.method, str(request.url), request.url.host
+        endpoint = endpoint_of(request.url)
+        registry.increment("retries", host=host, endpoint=endpoint)
+    status_code = None
+    if error is None:
+        status_code = getattr(retry_state.outcome.result(), "status_code", None)
+    emit(
+        HTTPEvent(
+            "retry",
+            method,
+            url,
+            host,
+            endpoint,
+            status_code=status_code,
+            elapsed=retry_state.seconds_since_start,
+            attempt=retry_state.attempt_number,
+            error=error,
+        )
+    )
+
+
+def _last_outcome(retry_state: RetryCallState) -> Any:
+    # Return the last response (or re-raise the last exception) once retries
+    # are exhausted, so callers map it to a project exception as usual.
+    assert retry_state.outcome is not None
+    return retry_state.outcome.result()
+
+
+def _wait_within_deadline(policy: RetryPolicy, retry_state: RetryCallState) -> float:
+    # Give up instead of sleeping past the deadline of the current operation
+    sleep = policy.wait(retry_state)
+    active = deadline.current()
+    if retry_state.attempt_number >= policy.max_attempts:
+        # No retry follows; the stop condition returns the last outcome
+        return sleep
+    if active is not None and sleep >= active.remaining():
+        outcome = retry_state.outcome
+        cause = outcome.exception() if outcome is not None and outcome.failed else None
+        raise active.exceeded() from cause
+    return sleep
+
+
+def _make_retry_decorator(module: Optional[str]) -> Callable[[F], F]:
+    def policy() -> RetryPolicy:
+        return get_retry_policy(module)
+
+    return retry(  # type: ignore[return-value]
+        retry=lambda rs: policy().should_retry(rs),
+        stop=lambda rs: policy().should_stop(rs),
+        wait=lambda rs: _wait_within_deadline(policy(), rs),
+        before=lambda rs: policy().before(rs),
+        before_sleep=_log_retry,
+        retry_error_callback=_last_outcome,
+        reraise=True,
+    )
+
+
+@overload
+def with_retry(func: F, *, module: Optional[str] = ...) -> F: ...
+
+
+@overload
+def with_retry(*, module: Optional[str] = ...) -> Callable[[F], F]: ...
+
+
+def with_retry(
+    func: Optional[F] = None, *, module: Optional[str] = None
+) -> Union[F, Callable[[F], F]]:
+    """Decorator to retry transient failures according to a retry policy.
+
+    The wrapped function may raise (connection errors, timeouts) or return
+    an ``httpx.Response``; responses with retryable statuses (``429`` and
+    ``5xx``) are retried as well, honouring ``Retry-After``.  When attempts
+    run out the last response is returned, or the last exception re-raised.
 
     Parameters
     ----------
     func : Callable
         Function to retry on failure.
+    module : str, optional
+        Name of the module whose policy applies (see
+        :func:`set_retry_policy`). The policy is looked up on every call, so
+        changes take effect immediately.
 
     Returns
     -------
     Callable
         Wrapped function with automatic retry logic.
     """
-    return _retry_decorator(func)
+    decorator = _make_retry_decorator(module)
+    if func is None:
+        return decorator
+    return decorator(func)
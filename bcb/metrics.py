@@ -0,0 +1,477 @@
+"""Request instrumentation: event hooks and an in-process metrics registry.
+
+Every request made through the shared clients emits :class:`HTTPEvent`
+objects to the registered hooks and is accounted in a
+:class:`MetricsRegistry`, which keeps counters and latency histograms per
+host and endpoint.  Endpoints are URL paths with series codes and OData
+arguments collapsed, so ``bcdata.sgs.1`` and ``bcdata.sgs.433`` share the
+``bcdata.sgs.{n}`` endpoint.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterator, Literal, Optional
+
+import httpx
+
+from bcb.cache import CACHE_STATUS_HEADER
+
+logger = logging.getLogger(__name__)
+
+EventKind = Literal["request_start", "request_end", "retry", "cache_hit", "error"]
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_NUMERIC_SEGMENT = re.compile(r"(?<=[./])\d+(?=[./]|$)")
+_ODATA_ARGUMENTS = re.compile(r"\([^)]*\)")
+
+
+def endpoint_of(url: httpx.URL | str) -> str:
+    """Return the low-cardinality endpoint name for ``url``."""
+    path = httpx.URL(url).path
+    path = _ODATA_ARGUMENTS.sub("(...)", path)
+    return _NUMERIC_SEGMENT.sub("{n}", path)
+
+
+@dataclass(frozen=True)
+class HTTPEvent:
+    """Something that happened to a request.
+
+    Attributes
+    ----------
+    kind : str
+        ``"request_start"``, ``"request_end"``, ``"retry"``, ``"cache_hit"``
+        or ``"error"``.
+    method : str
+        HTTP method.
+    url : str
+        Full request URL.
+    host : str
+        Request host.
+    endpoint : str
+        Endpoint name, see :func:`endpoint_of`.
+    status_code : int, optional
+        Response status, when there is a response.
+    elapsed : float, optional
+        Seconds since the request started; for ``request_end`` this covers
+        the whole body transfer.
+    bytes_sent : int
+        Size of the request body.
+    bytes_received : int
+        Size of the response body received so far.
+    attempt : int, optional
+        Attempt number that failed, for ``retry`` events.
+    cache_status : str, optional
+        Value of the ``X-BCB-Cache`` header, for ``cache_hit`` events.
+    error : BaseException, optional
+        Exception raised, for ``error`` and ``retry`` events.
+    """
+
+    kind: EventKind
+    method: str
+    url: str
+    host: str
+    endpoint: str
+    status_code: Optional[int] = None
+    elapsed: Optional[float] = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    attempt: Optional[int] = None
+    cache_status: Optional[str] = None
+    error: Optional[BaseException] = field(default=None, compare=False)
+
+
+EventHook = Callable[[HTTPEvent], None]
+
+_HOOKS: list[EventHook] = []
+_HOOKS_LOCK = threading.Lock()
+
+
+def add_event_hook(hook: EventHook) -> None:
+    """Register ``hook`` to be called with every :class:`HTTPEvent`."""
+    with _HOOKS_LOCK:
+        _HOOKS.append(hook)
+
+
+def remove_event_hook(hook: EventHook) -> None:
+    """Unregister a hook added with :func:`add_event_hook`."""
+    with _HOOKS_LOCK:
+        _HOOKS.remove(hook)
+
+
+def emit(event: HTTPEvent) -> None:
+    """Deliver ``event`` to every hook; hook failures are logged, not raised."""
+    for hook in tuple(_HOOKS):
+        try:
+            hook(event)
+        except Exception:
+            logger.exception(f"Event hook {hook!r} failed on {event.kind}")
+
+
+class Histogram:
+    """Fixed-bucket histogram.
+
+    Parameters
+    ----------
+    bounds : sequence of float
+        Increasing upper bounds of the buckets; an overflow bucket is added.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q``-quantile by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [str(b) for b in self.bounds] + ["+Inf"]
+        buckets = dict(zip(labels, self.counts, strict=True))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+@dataclass
+class _EndpointStats:
+    counters: dict[str, int] = field(default_factory=dict)
+    status: dict[int, int] = field(default_factory=dict)
+    latency: Histogram = field(default_factory=Histogram)
+
+    def snapshot(self) -> dict[str, Any]:
+        extra: dict[str, Any] = {}
+        if "hedges" in self.counters:
+            requests = self.counters.get("requests", 0)
+            extra["hedge_rate"] = (
+                self.counters["hedges"] / requests if requests else 0.0
+            )
+        return {
+            **self.counters,
+            **extra,
+            "status": {str(k): v for k, v in sorted(self.status.items())},
+            "latency": self.latency.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe counters and latency histograms by host and endpoint.
+
+    Counters incremented with a ``host`` are also tracked per endpoint; all
+    counters contribute to a global total.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: dict[str, int] = {}
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+
+    def _stats(self, host: str, endpoint: str) -> _EndpointStats:
+        key = (host, endpoint)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats()
+        return stats
+
+    def increment(
+        self,
+        name: str,
+        value: int = 1,
+        *,
+        host: Optional[str] = None,
+        endpoint: str = "",
+    ) -> None:
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0) + value
+            if host is not None:
+                counters = self._stats(host, endpoint).counters
+                counters[name] = counters.get(name, 0) + value
+
+    def observe_response(
+        self, host: str, endpoint: str, status_code: int, elapsed: Optional[float]
+    ) -> None:
+        """Count a response status and, when timed, its latency."""
+        with self._lock:
+            stats = self._stats(host, endpoint)
+            stats.status[status_code] = stats.status.get(status_code, 0) + 1
+            if elapsed is not None:
+                stats.latency.observe(elapsed)
+
+    def counter(self, name: str) -> int:
+        """Global total of counter ``name``."""
+        with self._lock:
+            return self._totals.get(name, 0)
+
+    def histogram(self, host: str, endpoint: str) -> Optional[Histogram]:
+        with self._lock:
+            stats = self._endpoints.get((host, endpoint))
+            return None if stats is None else stats.latency
+
+    def snapshot(self) -> dict[str, Any]:
+        """Copy of all metrics as plain, JSON-serialisable data.
+
+        Returns
+        -------
+        dict
+            ``{"counters": {name: total}, "endpoints": {"host/path": {...}}}``
+            where each endpoint holds its counters, a ``status`` count per
+            HTTP status and a ``latency`` histogram summary.  Endpoints
+            with hedged requests also report ``hedge_rate``, the share of
+            requests that sent a hedge.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._totals),
+                "endpoints": {
+                    f"{host}{endpoint}": stats.snapshot()
+                    for (host, endpoint), stats in sorted(self._endpoints.items())
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._endpoints.clear()
+
+
+# Registry fed by the shared clients
+METRICS = MetricsRegistry()
+
+
+def _reset_lock_after_fork() -> None:
+    # Counters carry over to the child, the parent's lock state must not
+    METRICS._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+class _RequestProbe:
+    """Bookkeeping for one request, shared by the sync and async transports."""
+
+    def __init__(self, request: httpx.Request, registry: MetricsRegistry) -> None:
+        self.request = request
+        self.registry = registry
+        self.host = request.url.host
+        self.endpoint = endpoint_of(request.url)
+        self.started = time.perf_counter()
+        self.bytes_sent = int(request.headers.get("Content-Length", 0))
+        self.bytes_received = 0
+        self.status_code: Optional[int] = None
+        self.cache_status: Optional[str] = None
+        self._finished = False
+
+    def event(self, kind: EventKind, **kwargs: Any) -> HTTPEvent:
+        return HTTPEvent(
+            kind,
+            self.request.method,
+            str(self.request.url),
+            self.host,
+            self.endpoint,
+            status_code=self.status_code,
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+            **kwargs,
+        )
+
+    def start(self) -> None:
+        self.registry.increment("requests", host=self.host, endpoint=self.endpoint)
+        self.registry.increment(
+            "bytes_sent", self.bytes_sent, host=self.host, endpoint=self.endpoint
+        )
+        emit(self.event("request_start"))
+
+    def failed(self, error: BaseException) -> None:
+        self._finished = True
+        self.registry.increment("errors", host=self.host, endpoint=self.endpoint)
+        emit(self.event("error", elapsed=self.elapsed(), error=error))
+
+    def responded(self, response: httpx.Response) -> None:
+        self.status_code = response.status_code
+        self.cache_status = response.headers.get(CACHE_STATUS_HEADER)
+        if self.cache_status in ("HIT", "STALE", "REVALIDATED"):
+            self.registry.increment(
+                "cache_hits", host=self.host, endpoint=self.endpoint
+            )
+            emit(
+                self.event(
+                    "cache_hit",
+                    elapsed=self.elapsed(),
+                    cache_status=self.cache_status,
+                )
+            )
+
+    def finished(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        elapsed = self.elapsed()
+        assert self.status_code is not None
+        # Responses served from disk say nothing about the server latency
+        timed = self.cache_status not in ("HIT", "STALE")
+        self.registry.observe_response(
+            self.host, self.endpoint, self.status_code, elapsed if timed else None
+        )
+        self.registry.increment(
+            "bytes_received",
+            self.bytes_received,
+            host=self.host,
+            endpoint=self.endpoint,
+        )
+        emit(self.event("request_end", elapsed=elapsed))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class _InstrumentedStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, probe: _RequestProbe) -> None:
+        self._stream = stream
+        self._probe = probe
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._probe.bytes_received += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._probe.finished()
+
+
+class _AsyncInstrumentedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, probe: _RequestProbe) -> None:
+        self._stream = stream
+        self._probe = probe
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._probe.bytes_received += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._probe.finished()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Transport wrapper that emits events and records metrics.
+
+    ``request_end`` is emitted once the response body has been consumed,
+    so its ``elapsed`` covers the transfer and ``bytes_received`` is the
+    actual number of bytes read.
+    """
+
+    def __init__(
+        self, transport: httpx.BaseTransport, registry: MetricsRegistry = METRICS
+    ) -> None:
+        self._transport = transport
+        self.registry = registry
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        probe = _RequestProbe(request, self.registry)
+        probe.start()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException as ex:
+            probe.failed(ex)
+            raise
+        probe.responded(response)
+        assert isinstance(response.stream, httpx.SyncByteStream)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_InstrumentedStream(response.stream, probe),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`InstrumentedTransport`."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        registry: MetricsRegistry = METRICS,
+    ) -> None:
+        self._transport = transport
+        self.registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        probe = _RequestProbe(request, self.registry)
+        probe.start()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as ex:
+            probe.failed(ex)
+            raise
+        probe.responded(response)
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_AsyncInstrumentedStream(response.stream, probe),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
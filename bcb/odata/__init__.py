@@ -1,17 +1,51 @@
 from __future__ import annotations
 
-from bcb.odata.api import (
-    ODataAPI,
-    Expectativas,
-    PTAX,
-    IFDATA,
-    TaxaJuros,
-    MercadoImobiliario,
-    SPI,
-    TarifasBancariasPorInstituicaoFinanceira,
-    TarifasBancariasPorServico,
-    PostosAtendimentoEletronicoPorInstituicaoFinanceira,
-    PostosAtendimentoCorrespondentesPorInstituicaoFinanceira,
-    EstatisticasSTR,
-    DinheiroCirculacao,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from bcb.odata.api import (
+        ODataAPI,
+        Expectativas,
+        PTAX,
+        IFDATA,
+        TaxaJuros,
+        MercadoImobiliario,
+        SPI,
+        TarifasBancariasPorInstituicaoFinanceira,
+        TarifasBancariasPorServico,
+        PostosAtendimentoEletronicoPorInstituicaoFinanceira,
+        PostosAtendimentoCorrespondentesPorInstituicaoFinanceira,
+        EstatisticasSTR,
+        DinheiroCirculacao,
+    )
+
+# The API classes pull in pandas and lxml, so they are loaded on first
+# access (PEP 562)
+__all__ = [
+    "ODataAPI",
+    "Expectativas",
+    "PTAX",
+    "IFDATA",
+    "TaxaJuros",
+    "MercadoImobiliario",
+    "SPI",
+    "TarifasBancariasPorInstituicaoFinanceira",
+    "TarifasBancariasPorServico",
+    "PostosAtendimentoEletronicoPorInstituicaoFinanceira",
+    "PostosAtendimentoCorrespondentesPorInstituicaoFinanceira",
+    "EstatisticasSTR",
+    "DinheiroCirculacao",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        value = getattr(importlib.import_module("bcb.odata.api"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'bcb.odata' has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Literal, Optional, Union, overload
+import concurrent.futures
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, overload
 
+from bcb import runner
+from bcb.deadline import budget, wait_for
 from bcb.http import RequestTimeout
 from bcb.utils import Date
 from bcb.odata.framework import (
@@ -14,7 +17,10 @@ from bcb.odata.framework import (
     ODataProperty,
     ODataService,
 )
-import pandas as pd
+
+if TYPE_CHECKING:
+    # Imported on first use so that text output does not pay for pandas
+    import pandas as pd
 
 OLINDA_BASE_URL = "https://olinda.bcb.gov.br/olinda/servico"
 
@@ -100,6 +106,8 @@ class EndpointQuery(ODataQuery):
     ) -> Union[pd.DataFrame, str]:
         if output == "text":
             return self.text(timeout=timeout)
+        import pandas as pd
+
         raw_data = super().collect(timeout=timeout)
         data = pd.DataFrame(raw_data["value"])
         if not self._raw:
@@ -128,6 +136,8 @@ class EndpointQuery(ODataQuery):
         """Async version of collect(). Awaits super().async_collect() for data fetch."""
         if output == "text":
             return await self.async_text(timeout=timeout)
+        import pandas as pd
+
         raw_data = await super().async_collect(timeout=timeout)
         data = pd.DataFrame(raw_data["value"])
         if not self._raw:
@@ -202,6 +212,7 @@ class Endpoint(metaclass=EndpointMeta):
         skip: Optional[int] = None,
         output: str = "dataframe",
         timeout: RequestTimeout = None,
+        deadline: Optional[float] = None,
         verbose: bool = False,
         **kwargs: Any,
     ) -> Union[pd.DataFrame, str]:
@@ -224,6 +235,10 @@ class Endpoint(metaclass=EndpointMeta):
         output : str, default "dataframe"
             Output format. Use ``'text'`` to get the raw OData JSON response
             string instead of a DataFrame.
+        deadline : float, optional
+            Maximum time in seconds for the whole query, including retries.
+            Raises :py:class:`bcb.exceptions.DeadlineExceededError` when
+            exceeded.
         verbose : bool, default False
             Print the query before executing it
         **kwargs : argumentos adicionais para a consulta
@@ -270,10 +285,11 @@ class Endpoint(metaclass=EndpointMeta):
 
         if verbose:
             _query.show()
-        if output == "text":
-            data = _query.collect(output="text", timeout=timeout)
-        else:
-            data = _query.collect(timeout=timeout)
+        with budget(deadline):
+            if output == "text":
+                data = _query.collect(output="text", timeout=timeout)
+            else:
+                data = _query.collect(timeout=timeout)
         _query.reset()
         return data
 
@@ -320,6 +336,7 @@ class Endpoint(metaclass=EndpointMeta):
         skip: Optional[int] = None,
         output: str = "dataframe",
         timeout: RequestTimeout = None,
+        deadline: Optional[float] = None,
         verbose: bool = False,
         **kwargs: Any,
     ) -> Union[pd.DataFrame, str]:
@@ -344,6 +361,10 @@ class Endpoint(metaclass=EndpointMeta):
             Skip the first N results
         output : str, default "dataframe"
             Output format. Use ``'text'`` for raw JSON.
+        deadline : float, optional
+            Maximum time in seconds for the whole query, including retries.
+            Raises :py:class:`bcb.exceptions.DeadlineExceededError` when
+            exceeded.
         verbose : bool, default False
             Print the query before executing it
         **kwargs : argumentos adicionais para a consulta
@@ -390,13 +411,33 @@ class Endpoint(metaclass=EndpointMeta):
 
         if verbose:
             _query.show()
-        if output == "text":
-            data = await _query.async_collect(output="text", timeout=timeout)
-        else:
-            data = await _query.async_collect(timeout=timeout)
+        with budget(deadline):
+            if output == "text":
+                data = await wait_for(
+                    _query.async_collect(output="text", timeout=timeout)
+                )
+            else:
+                data = await wait_for(_query.async_collect(timeout=timeout))
         _query.reset()
         return data
 
+    def submit(
+        self, *args: Any, **kwargs: Any
+    ) -> concurrent.futures.Future[Union[pd.DataFrame, str]]:
+        """
+        Starts get() in the background and returns a Future right away.
+
+        Same signature as :func:`get`.  The query runs as :func:`async_get`
+        on the background event loop of :mod:`bcb.runner`, sharing its
+        async client and concurrency limits.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolved with the result of :func:`get`.
+        """
+        return runner.submit(self.async_get(*args, **kwargs))
+
 
 class BaseODataAPI:
     """
@@ -5,7 +5,7 @@ import logging
 import math
 import threading
 from io import BytesIO
-from typing import Any, Optional, Union
+from typing import IO, Any, Optional, Union
 from urllib.parse import quote
 
 import httpx
@@ -14,21 +14,91 @@ from typing_extensions import Self
 
 from bcb.http import (
     RequestTimeout,
+    active_config,
+    current_session,
     get_async_client,
     get_client,
     raise_for_request_error,
     raise_for_status,
     timeout_kwargs,
+    with_retry,
 )
+from bcb.datacache import CacheNamespace
 from bcb.exceptions import ODataError
+from bcb.spool import (
+    SpooledBody,
+    async_stream_get,
+    body_length,
+    body_of,
+    stream_get,
+)
 
 logger = logging.getLogger(__name__)
 
-# Module-level metadata cache for OData services
-# Maps service URL → ODataMetadata instance
-_METADATA_CACHE: dict[str, "ODataMetadata"] = {}
+# Module-level metadata cache for OData services, backed by the shared data
+# cache: maps metadata URL → ODataMetadata instance
+_METADATA_CACHE = CacheNamespace("odata_metadata")
 _METADATA_CACHE_LOCK = threading.RLock()
 
+_QUERY_HEADERS = {"OData-Version": "4.0", "OData-MaxVersion": "4.0"}
+
+
+def _metadata_cache() -> CacheNamespace:
+    # Each bcb.Client session keeps its own metadata
+    session = current_session()
+    if session is None:
+        return _METADATA_CACHE
+    return session._state(
+        "odata_metadata", lambda: CacheNamespace("odata_metadata", session.data_cache)
+    )
+
+
+@with_retry(module="odata")
+def _get_odata_response(
+    url: str,
+    *,
+    headers: Optional[dict[str, str]] = None,
+    timeout: RequestTimeout = None,
+) -> httpx.Response:
+    return get_client().get(url, headers=headers, **timeout_kwargs(timeout))
+
+
+@with_retry(module="odata")
+async def _async_get_odata_response(
+    url: str,
+    *,
+    headers: Optional[dict[str, str]] = None,
+    timeout: RequestTimeout = None,
+) -> httpx.Response:
+    return await get_async_client().get(url, headers=headers, **timeout_kwargs(timeout))
+
+
+@with_retry(module="odata")
+def _get_odata_query_response(
+    url: str, *, timeout: RequestTimeout = None
+) -> httpx.Response:
+    # Query results can be large, so their bodies are spooled
+    return stream_get(
+        get_client(),
+        url,
+        threshold=active_config().spool_threshold,
+        headers=_QUERY_HEADERS,
+        **timeout_kwargs(timeout),
+    )
+
+
+@with_retry(module="odata")
+async def _async_get_odata_query_response(
+    url: str, *, timeout: RequestTimeout = None
+) -> httpx.Response:
+    return await async_stream_get(
+        get_async_client(),
+        url,
+        threshold=active_config().spool_threshold,
+        headers=_QUERY_HEADERS,
+        **timeout_kwargs(timeout),
+    )
+
 
 def _load_json_object(text: str, *, context: str) -> dict[str, Any]:
     try:
@@ -40,6 +110,16 @@ def _load_json_object(text: str, *, context: str) -> dict[str, Any]:
     return data
 
 
+def _load_json_file(file: IO[str], *, context: str) -> dict[str, Any]:
+    try:
+        data = json.load(file)
+    except json.JSONDecodeError as ex:
+        raise ODataError(f"{context} returned invalid JSON: {ex}") from ex
+    if not isinstance(data, dict):
+        raise ODataError(f"{context} returned invalid JSON payload: expected object")
+    return data
+
+
 def _required_field(data: dict[str, Any], field: str, *, context: str) -> Any:
     try:
         return data[field]
@@ -403,13 +483,13 @@ class ODataMetadata:
     def _load_document(self, *, timeout: RequestTimeout = None) -> None:
         logger.debug(f"Fetching OData metadata from {self.url}")
         try:
-            res = get_client().get(self.url, **timeout_kwargs(timeout))
+            res = _get_odata_response(self.url, timeout=timeout)
         except httpx.HTTPError as ex:
             raise_for_request_error(
                 ex, context=f"OData metadata {self.url}", error_cls=ODataError
             )
         logger.debug(
-            f"OData metadata response: status={res.status_code}, length={len(res.content)}"
+            f"OData metadata response: status={res.status_code}, length={body_length(res)}"
         )
         raise_for_status(
             res,
@@ -421,6 +501,13 @@ class ODataMetadata:
         )
         self.doc = _load_xml_document(res.content, context=f"OData metadata {self.url}")
 
+    def __getstate__(self) -> dict[str, Any]:
+        # The XML document is only needed while parsing; without it the
+        # metadata can be pickled by persistent cache backends
+        state = self.__dict__.copy()
+        state.pop("doc", None)
+        return state
+
     def _parse_entity(self, entity_element: Any, namespace: str) -> ODataEntity:
         name = entity_element.attrib["Name"]
         props = {
@@ -512,7 +599,7 @@ class ODataService:
         self.url = url
         self._timeout = timeout
         try:
-            res = get_client().get(self.url, **timeout_kwargs(timeout))
+            res = _get_odata_response(self.url, timeout=timeout)
         except httpx.HTTPError as ex:
             raise_for_request_error(
                 ex, context=f"OData service {self.url}", error_cls=ODataError
@@ -548,12 +635,13 @@ class ODataService:
         self._odata_context_url = odata_context
 
         # Use cached metadata if available, otherwise create and cache new one
+        cache = _metadata_cache()
         with _METADATA_CACHE_LOCK:
-            if self._odata_context_url in _METADATA_CACHE:
-                self.metadata = _METADATA_CACHE[self._odata_context_url]
-            else:
-                self.metadata = ODataMetadata(self._odata_context_url, timeout=timeout)
-                _METADATA_CACHE[self._odata_context_url] = self.metadata
+            metadata = cache.get(self._odata_context_url)
+            if metadata is None:
+                metadata = ODataMetadata(self._odata_context_url, timeout=timeout)
+                cache.set(self._odata_context_url, metadata)
+            self.metadata = metadata
 
     def __getitem__(self, item: str) -> Union[ODataEntitySet, ODataFunctionImport]:
         es = self.entity_sets.get(item)
@@ -718,16 +806,7 @@ class ODataQuery:
             return self._timeout
         return timeout
 
-    def collect(self, *, timeout: RequestTimeout = None) -> Any:
-        url = self.odata_url()
-        data = _load_json_object(
-            self.text(timeout=timeout), context=f"OData query {url}"
-        )
-        _required_field(data, "value", context=f"OData query {url}")
-        return data
-
-    async def async_text(self, *, timeout: RequestTimeout = None) -> str:
-        """Async version of text(). Fetches OData response using shared client."""
+    def _query_url(self) -> str:
         params = self._build_parameters()
         if self.is_function and len(self.function_parameters):
             for p in self.entity.function.parameters:  # type: ignore[union-attr]
@@ -736,71 +815,72 @@ class ODataQuery:
                     raise ODataError("Parameter not set: " + (p.name or ""))
                 params["@" + (p.name or "")] = self._format_parameter(p, val)
         qs = "&".join([f"{quote(k)}={quote(str(v))}" for k, v in params.items()])
-        headers = {"OData-Version": "4.0", "OData-MaxVersion": "4.0"}
-        url = self.odata_url()
-        try:
-            res = await get_async_client().get(
-                url + "?" + qs,
-                headers=headers,
-                **timeout_kwargs(self._resolve_timeout(timeout)),
-            )
-        except httpx.HTTPError as ex:
-            raise_for_request_error(
-                ex, context=f"OData query {url}", error_cls=ODataError
-            )
+        return self.odata_url() + "?" + qs
+
+    def _check_query_response(self, res: httpx.Response) -> SpooledBody:
         raise_for_status(
             res,
-            context=f"OData query {url}",
+            context=f"OData query {self.odata_url()}",
             error_cls=ODataError,
             not_found_cls=ODataError,
             rate_limit_cls=ODataError,
             server_error_cls=ODataError,
         )
-        return res.text
+        return body_of(res)
 
-    async def async_collect(self, *, timeout: RequestTimeout = None) -> Any:
-        """Async version of collect(). Awaits async_text() and parses JSON."""
-        url = self.odata_url()
-        data = _load_json_object(
-            await self.async_text(timeout=timeout), context=f"OData query {url}"
-        )
-        _required_field(data, "value", context=f"OData query {url}")
-        return data
-
-    def text(self, *, timeout: RequestTimeout = None) -> str:
-        params = self._build_parameters()
-        if self.is_function and len(self.function_parameters):
-            for p in self.entity.function.parameters:  # type: ignore[union-attr]
-                val = self.function_parameters[p.name or ""]
-                if p.required and val is None:
-                    raise ODataError("Parameter not set: " + (p.name or ""))
-                params["@" + (p.name or "")] = self._format_parameter(p, val)
-        qs = "&".join([f"{quote(k)}={quote(str(v))}" for k, v in params.items()])
-        headers = {"OData-Version": "4.0", "OData-MaxVersion": "4.0"}
+    def _fetch(self, *, timeout: RequestTimeout = None) -> SpooledBody:
+        # Download the query result into a spool file
+        query_url = self._query_url()
         url = self.odata_url()
         logger.debug(f"Fetching OData query from {url}")
         try:
-            res = get_client().get(
-                url + "?" + qs,
-                headers=headers,
-                **timeout_kwargs(self._resolve_timeout(timeout)),
+            res = _get_odata_query_response(
+                query_url, timeout=self._resolve_timeout(timeout)
             )
         except httpx.HTTPError as ex:
             raise_for_request_error(
                 ex, context=f"OData query {url}", error_cls=ODataError
             )
         logger.debug(
-            f"OData query response: status={res.status_code}, length={len(res.text)}"
+            f"OData query response: status={res.status_code}, length={body_length(res)}"
         )
-        raise_for_status(
-            res,
-            context=f"OData query {url}",
-            error_cls=ODataError,
-            not_found_cls=ODataError,
-            rate_limit_cls=ODataError,
-            server_error_cls=ODataError,
-        )
-        return res.text
+        return self._check_query_response(res)
+
+    async def _async_fetch(self, *, timeout: RequestTimeout = None) -> SpooledBody:
+        query_url = self._query_url()
+        url = self.odata_url()
+        try:
+            res = await _async_get_odata_query_response(
+                query_url, timeout=self._resolve_timeout(timeout)
+            )
+        except httpx.HTTPError as ex:
+            raise_for_request_error(
+                ex, context=f"OData query {url}", error_cls=ODataError
+            )
+        return self._check_query_response(res)
+
+    def _parse(self, body: SpooledBody) -> Any:
+        context = f"OData query {self.odata_url()}"
+        with body:
+            data = _load_json_file(body.text(), context=context)
+        _required_field(data, "value", context=context)
+        return data
+
+    def collect(self, *, timeout: RequestTimeout = None) -> Any:
+        return self._parse(self._fetch(timeout=timeout))
+
+    async def async_text(self, *, timeout: RequestTimeout = None) -> str:
+        """Async version of text(). Fetches OData response using shared client."""
+        with await self._async_fetch(timeout=timeout) as body:
+            return body.read_text()
+
+    async def async_collect(self, *, timeout: RequestTimeout = None) -> Any:
+        """Async version of collect(). Awaits the download and parses JSON."""
+        return self._parse(await self._async_fetch(timeout=timeout))
+
+    def text(self, *, timeout: RequestTimeout = None) -> str:
+        with self._fetch(timeout=timeout) as body:
+            return body.read_text()
 
     def show(self) -> None:
         print("URL:")
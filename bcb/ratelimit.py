@@ -0,0 +1,247 @@
+"""Per-host request rate limiting shared by the sync and async clients.
+
+Each host gets a token bucket.  Callers *reserve* a slot under a lock and
+then sleep outside of it, so the same limiter works from any number of
+threads and event loops at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+import httpx
+
+from bcb import deadline
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[float] = None) -> float:
+    """Return the delay in seconds requested by a ``Retry-After`` header.
+
+    Both delta-seconds and HTTP-date forms are accepted. Invalid or missing
+    values give ``0``.
+    """
+    if not value:
+        return 0.0
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+def _check_deadline(wait: float) -> None:
+    # Fail now rather than sleep past the deadline of the current operation
+    active = deadline.current()
+    if active is not None and wait >= active.remaining():
+        raise active.exceeded()
+
+
+class TokenBucket:
+    """Token bucket that adapts its rate to ``429`` responses.
+
+    Parameters
+    ----------
+    rate : float
+        Target requests per second.
+    burst : int, default 1
+        Maximum number of requests sent back-to-back.
+    min_rate : float, optional
+        Floor for the rate after ``429`` penalties (default ``rate / 16``).
+    """
+
+    def __init__(
+        self, rate: float, burst: int = 1, *, min_rate: Optional[float] = None
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst!r}")
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"TokenBucket(rate={self.rate:g}, burst={self.burst})"
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - max(self._updated, self._paused_until))
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated = max(now, self._updated)
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = max(0.0, self._paused_until - now)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def available(self) -> bool:
+        """Whether a token can be taken right now without waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self._tokens >= 1.0 and now >= self._paused_until
+
+    def penalize(self, retry_after: float = 0.0) -> None:
+        """Halve the rate and pause the bucket after a ``429`` response."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after > 0:
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + retry_after
+                )
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self) -> None:
+        """Grow the rate back towards ``max_rate`` after a success."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiter:
+    """Registry of per-host token buckets.
+
+    Parameters
+    ----------
+    rate : float, optional
+        Requests per second for hosts without an explicit entry in
+        ``per_host``. ``None`` leaves those hosts unlimited.
+    burst : int, default 1
+        Bucket size for every host.
+    per_host : Mapping[str, float], optional
+        Requests per second for specific hosts, e.g.
+        ``{"olinda.bcb.gov.br": 5}``.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        *,
+        burst: int = 1,
+        per_host: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.per_host = dict(per_host or {})
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimiter(rate={self.rate!r}, burst={self.burst}, "
+            f"per_host={self.per_host!r})"
+        )
+
+    def bucket(self, host: str) -> Optional[TokenBucket]:
+        """Return the bucket for ``host`` or ``None`` when it is unlimited."""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = self.per_host.get(host, self.rate)
+                if rate is None:
+                    return None
+                bucket = self._buckets[host] = TokenBucket(rate, self.burst)
+            return bucket
+
+    def acquire(self, host: str) -> None:
+        """Block the current thread until a request to ``host`` may be sent."""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            wait = bucket.reserve()
+            if wait > 0:
+                _check_deadline(wait)
+                time.sleep(wait)
+
+    async def async_acquire(self, host: str) -> None:
+        """Wait without blocking the event loop until ``host`` may be called."""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            wait = bucket.reserve()
+            if wait > 0:
+                _check_deadline(wait)
+                await asyncio.sleep(wait)
+
+    def has_capacity(self, host: str) -> bool:
+        """Whether a request to ``host`` could be sent without waiting."""
+        bucket = self.bucket(host)
+        return bucket is None or bucket.available()
+
+    def feedback(self, host: str, response: httpx.Response) -> None:
+        """Adapt the host rate to the status of a response."""
+        bucket = self.bucket(host)
+        if bucket is None:
+            return
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            bucket.penalize(retry_after)
+            logger.warning(
+                f"Rate limited by {host}, lowering rate to {bucket.rate:g} req/s"
+            )
+        elif response.status_code < 400:
+            bucket.reward()
+
+    def snapshot(self) -> dict[str, float]:
+        """Current requests-per-second for every host seen so far."""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+
+class RateLimitTransport(httpx.BaseTransport):
+    """Transport wrapper that spaces requests according to a limiter."""
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: RateLimiter) -> None:
+        self._transport = transport
+        self.limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.limiter.acquire(host)
+        response = self._transport.handle_request(request)
+        self.limiter.feedback(host, response)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`RateLimitTransport`."""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter
+    ) -> None:
+        self._transport = transport
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        await self.limiter.async_acquire(host)
+        response = await self._transport.handle_async_request(request)
+        self.limiter.feedback(host, response)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,220 @@
+"""Retry policies for requests to BCB services.
+
+A :class:`RetryPolicy` decides which failures are worth another attempt and
+how long to wait before it.  Transient failures (connection errors,
+timeouts, ``429`` and ``5xx`` responses) are retried with jittered
+exponential backoff, honouring ``Retry-After``; client errors and parse
+errors fail fast.  A shared :class:`RetryBudget` caps retries to a fraction
+of the request volume so a struggling host is not hit by a retry storm.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+from tenacity import RetryCallState
+
+from bcb.exceptions import BCBAPIError, BCBCircuitOpenError
+from bcb.ratelimit import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryBudget:
+    """Sliding-window cap on the number of retries.
+
+    Retries are allowed while, within the last ``window`` seconds,
+    ``retries < min_retries_per_second * window + ratio * requests``.
+
+    Parameters
+    ----------
+    ratio : float, default 0.2
+        Retries allowed per original request.
+    min_retries_per_second : float, default 1.0
+        Retries always allowed regardless of traffic, so low-volume callers
+        can still recover from blips.
+    window : float, default 10.0
+        Length of the accounting window in seconds.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        *,
+        min_retries_per_second: float = 1.0,
+        window: float = 10.0,
+    ) -> None:
+        if ratio < 0 or min_retries_per_second < 0 or window <= 0:
+            raise ValueError(
+                "ratio and min_retries_per_second must be non-negative "
+                "and window positive"
+            )
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryBudget(ratio={self.ratio}, "
+            f"min_retries_per_second={self.min_retries_per_second}, "
+            f"window={self.window})"
+        )
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self) -> None:
+        """Account for an original (non-retry) request."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def _available(self, now: float) -> bool:
+        # Must be called with the lock held
+        self._trim(now)
+        allowed = self.min_retries_per_second * self.window + self.ratio * len(
+            self._requests
+        )
+        return len(self._retries) < allowed
+
+    def has_budget(self) -> bool:
+        """Whether a retry would be allowed now, without reserving it."""
+        with self._lock:
+            return self._available(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Reserve a retry, returning ``False`` when the budget is exhausted."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._available(now):
+                return False
+            self._retries.append(now)
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._retries.clear()
+
+
+# Budget shared by every policy that does not define its own
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Classification and backoff rules for retrying requests.
+
+    Attributes
+    ----------
+    max_attempts : int
+        Total attempts, including the first one. ``1`` disables retries.
+    backoff_base : float
+        Backoff before the first retry, doubled on every further retry.
+    backoff_max : float
+        Upper bound for the backoff.
+    max_retry_after : float
+        Upper bound for waits requested via ``Retry-After``. Longer requests
+        are not retried.
+    retry_statuses : frozenset[int]
+        HTTP statuses considered transient.
+    budget : RetryBudget, optional
+        Shared retry budget; ``None`` disables budgeting.
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    max_retry_after: float = 30.0
+    retry_statuses: frozenset[int] = RETRYABLE_STATUS_CODES
+    budget: Optional[RetryBudget] = field(default=DEFAULT_RETRY_BUDGET, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be >= 1, got {self.max_attempts}")
+        if self.backoff_base < 0 or self.backoff_max < 0:
+            raise ValueError("backoff values must be non-negative")
+
+    def is_retryable_exception(self, exc: BaseException) -> bool:
+        """Transport failures and transient project errors are retryable."""
+        if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError)):
+            return True
+        if isinstance(exc, httpx.RemoteProtocolError):
+            return True
+        if isinstance(exc, BCBCircuitOpenError):
+            return False
+        if isinstance(exc, BCBAPIError):
+            return exc.status_code in self.retry_statuses
+        return False
+
+    def is_retryable_response(self, response: Any) -> bool:
+        if not isinstance(response, httpx.Response):
+            return False
+        if response.status_code not in self.retry_statuses:
+            return False
+        return self._retry_after(response) <= self.max_retry_after
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        return parse_retry_after(response.headers.get("Retry-After"))
+
+    def backoff(self, retry_number: int) -> float:
+        """Full-jitter exponential backoff for the ``retry_number``-th retry."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (retry_number - 1))
+        return random.uniform(0, ceiling)
+
+    # tenacity callbacks -------------------------------------------------
+
+    def should_retry(self, retry_state: RetryCallState) -> bool:
+        outcome = retry_state.outcome
+        if outcome is None:
+            return False
+        if outcome.failed:
+            exc = outcome.exception()
+            return exc is not None and self.is_retryable_exception(exc)
+        return self.is_retryable_response(outcome.result())
+
+    def should_stop(self, retry_state: RetryCallState) -> bool:
+        if retry_state.attempt_number >= self.max_attempts:
+            return True
+        if self.budget is not None and not self.budget.try_spend():
+            logger.warning("Retry budget exhausted, giving up without retrying")
+            return True
+        return False
+
+    def wait(self, retry_state: RetryCallState) -> float:
+        outcome = retry_state.outcome
+        if outcome is not None and not outcome.failed:
+            response = outcome.result()
+            if isinstance(response, httpx.Response):
+                retry_after = self._retry_after(response)
+                if retry_after > 0:
+                    return retry_after + random.uniform(0, self.backoff_base)
+        return self.backoff(retry_state.attempt_number)
+
+    def before(self, retry_state: RetryCallState) -> None:
+        if retry_state.attempt_number == 1 and self.budget is not None:
+            self.budget.record_request()
+
+
+# Policy applied when no module-specific policy is registered
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# Policy that performs a single attempt
+NO_RETRY = RetryPolicy(max_attempts=1)
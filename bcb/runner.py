@@ -0,0 +1,287 @@
+"""Background event loop that runs async work for the synchronous API.
+
+``sgs.get`` and ``currency.get`` with several codes or symbols fetch them
+concurrently by running the async pipeline on an event loop owned by a
+daemon thread, and blocking on the result.  The loop is started on first
+use and kept for the lifetime of the process, so its async client and
+pooled connections are reused between calls.  Because the loop runs in its
+own thread, the sync functions also work where the calling thread already
+runs a loop, e.g. in Jupyter notebooks.
+
+The same loop backs :func:`submit` (``bcb.submit``), which starts a fetch
+and returns a :class:`concurrent.futures.Future` right away, and the
+``submit`` functions of :mod:`bcb.sgs`, :mod:`bcb.currency` and OData
+endpoints.  Collect the results as they finish with :func:`as_completed`.
+
+Coroutines run in a copy of the caller's context, so an active
+:class:`bcb.Client` session and deadline apply to them.  Set
+:func:`set_enabled` to ``False`` to fetch one code after the other instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import inspect
+import logging
+import os
+import threading
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    TypeVar,
+    Union,
+    overload,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+# Whether the sync API fans out through the background loop
+_ENABLED = True
+
+# Loop and the thread running it, started on first use
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_THREAD: Optional[threading.Thread] = None
+_LOCK = threading.Lock()
+
+# Seconds to wait at shutdown for async clients to close
+_SHUTDOWN_TIMEOUT = 5.0
+
+
+def set_enabled(enabled: bool = True) -> None:
+    """Enable or disable the background loop used by the sync API.
+
+    When disabled, ``sgs.get`` fetches codes on a pool of up to 8 threads
+    (or ``max_workers``), and ``currency.get`` fetches symbols one after
+    the other in the calling thread.
+    """
+    global _ENABLED
+    _ENABLED = enabled
+
+
+def is_enabled() -> bool:
+    """Whether the sync API fans out through the background loop."""
+    return _ENABLED
+
+
+def _serve(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background loop, starting its thread if needed."""
+    global _LOOP, _THREAD
+    with _LOCK:
+        if _LOOP is None or _THREAD is None or not _THREAD.is_alive():
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(
+                concurrent.futures.ThreadPoolExecutor(thread_name_prefix="bcb-worker")
+            )
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=_serve, args=(loop, ready), name="bcb-loop", daemon=True
+            )
+            thread.start()
+            ready.wait()
+            logger.debug("Started background event loop")
+            _LOOP, _THREAD = loop, thread
+        return _LOOP
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Return the background loop if it was started, without starting it."""
+    return _LOOP
+
+
+def in_loop_thread() -> bool:
+    """Whether the calling thread is the one running the background loop."""
+    return _THREAD is not None and threading.current_thread() is _THREAD
+
+
+def _settle(future: concurrent.futures.Future[T], task: asyncio.Future[T]) -> None:
+    # Copies the outcome of the task; the caller may have cancelled the
+    # future in the meantime
+    if future.done():
+        return
+    try:
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+def submit(
+    fn: Union[Callable[..., Any], Coroutine[Any, Any, Any]],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> concurrent.futures.Future[Any]:
+    """Start ``fn(*args, **kwargs)`` in the background and return its future.
+
+    Coroutine functions (and coroutine objects, passed without arguments)
+    run on the background loop, sharing its async client and concurrency
+    limits.  Other callables run in the loop's worker threads.  Either way
+    the call runs in a copy of the caller's context, so an active session
+    and deadline apply, and cancelling the future cancels the task::
+
+        import bcb
+        from bcb import sgs
+
+        futures = {name: sgs.submit(code, last=12) for name, code in codes.items()}
+        for name, future in bcb.as_completed(futures):
+            print(name, future.result())
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Resolved with the return value or exception of the call.
+    """
+    if inspect.iscoroutine(fn):
+        if args or kwargs:
+            fn.close()
+            raise TypeError("arguments cannot be passed with a coroutine object")
+        return _schedule(fn)
+    if not callable(fn):
+        raise TypeError(f"expected a callable or a coroutine, got {fn!r}")
+    if inspect.iscoroutinefunction(fn):
+        return _schedule(fn(*args, **kwargs))
+    return _schedule(asyncio.to_thread(fn, *args, **kwargs))
+
+
+@overload
+def as_completed(  # type: ignore[overload-overlap]
+    fs: Mapping[K, concurrent.futures.Future[T]], timeout: Optional[float] = None
+) -> Iterator[tuple[K, concurrent.futures.Future[T]]]: ...
+
+
+@overload
+def as_completed(
+    fs: Iterable[concurrent.futures.Future[T]], timeout: Optional[float] = None
+) -> Iterator[concurrent.futures.Future[T]]: ...
+
+
+def as_completed(fs: Any, timeout: Optional[float] = None) -> Iterator[Any]:
+    """Yield futures as they finish, like :func:`concurrent.futures.as_completed`.
+
+    Given a mapping of names to futures, yields ``(name, future)`` pairs.
+
+    Raises
+    ------
+    TimeoutError
+        When ``timeout`` seconds pass before every future finishes.
+    """
+    if isinstance(fs, Mapping):
+        names = {future: name for name, future in fs.items()}
+        for future in concurrent.futures.as_completed(names, timeout):
+            yield names[future], future
+    else:
+        yield from concurrent.futures.as_completed(fs, timeout)
+
+
+def _schedule(coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+    # Runs coro as a task of the background loop, in a copy of the caller's
+    # context; cancelling the future cancels the task
+    loop = get_loop()
+    context = contextvars.copy_context()
+    future: concurrent.futures.Future[T] = concurrent.futures.Future()
+
+    def start() -> None:
+        if future.cancelled():
+            coro.close()
+            return
+        # Created in ``context``, so the task runs in a copy of it
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda _: _settle(future, task))
+
+        def cancel(done: concurrent.futures.Future[T]) -> None:
+            if done.cancelled():
+                loop.call_soon_threadsafe(task.cancel)
+
+        future.add_done_callback(cancel)
+
+    loop.call_soon_threadsafe(start, context=context)
+    return future
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the background loop and block until it finishes.
+
+    Raises
+    ------
+    RuntimeError
+        When called from a coroutine running on the background loop, which
+        would block the loop on itself.
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError("cannot block the background loop from its own thread")
+    future = _schedule(coro)
+    try:
+        return future.result()
+    except BaseException:
+        # E.g. KeyboardInterrupt while waiting: stop the task as well
+        future.cancel()
+        raise
+
+
+async def _close(loop: asyncio.AbstractEventLoop) -> None:
+    await loop.shutdown_asyncgens()
+    await loop.shutdown_default_executor()
+
+
+def shutdown(timeout: float = _SHUTDOWN_TIMEOUT) -> None:
+    """Close the async clients of the background loop and stop its thread.
+
+    The loop is started again by the next call that needs it.  Called
+    automatically at interpreter exit.
+    """
+    global _LOOP, _THREAD
+    with _LOCK:
+        loop, thread = _LOOP, _THREAD
+        _LOOP = _THREAD = None
+    if loop is None or thread is None or not thread.is_alive():
+        return
+    if in_loop_thread():
+        raise RuntimeError("cannot shut down the background loop from its own thread")
+    # Finalising the async generators closes the clients bound to the loop
+    closing = asyncio.run_coroutine_threadsafe(_close(loop), loop)
+    try:
+        closing.result(timeout)
+    except Exception as ex:
+        logger.debug(f"Background loop did not shut down cleanly: {ex!r}")
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout)
+    if not thread.is_alive():
+        loop.close()
+
+
+def _reset_after_fork() -> None:
+    # The loop thread does not survive fork(); the child starts its own.
+    # The inherited loop is abandoned without being closed, as it shares
+    # its selector and sockets with the parent.
+    global _LOOP, _THREAD, _LOCK
+    _LOOP = None
+    _THREAD = None
+    _LOCK = threading.Lock()
+
+
+atexit.register(shutdown)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
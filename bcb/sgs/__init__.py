@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import contextvars
+import functools
 import json
 import logging
 from dataclasses import dataclass
-from io import StringIO
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
 from typing import (
+    Awaitable,
+    Callable,
     Dict,
     Generator,
     List,
@@ -13,16 +19,19 @@ from typing import (
     Mapping,
     Optional,
     Tuple,
+    TYPE_CHECKING,
     TypeAlias,
     Union,
+    cast,
     overload,
 )
 
 import httpx
-import pandas as pd
 
 from bcb.http import (
     RequestTimeout,
+    active_config,
+    current_session,
     get_async_client,
     get_client,
     raise_for_request_error,
@@ -30,9 +39,27 @@ from bcb.http import (
     timeout_kwargs,
     with_retry,
 )
-from bcb.exceptions import SGSError
+from bcb import runner
+from bcb.datacache import CacheNamespace
+from bcb.deadline import budget, wait_for
+from bcb.exceptions import BCBError, DeadlineExceededError, SGSError
+from bcb.sgs import decoder
+from bcb.sgs.store import SeriesStore
+from bcb.spool import (
+    SpooledBody,
+    async_stream_get,
+    body_length,
+    body_of,
+    spool_chunks,
+    stream_get,
+)
 from bcb.utils import Date, DateInput
 
+if TYPE_CHECKING:
+    # pandas is imported on first use so that text-only calls such as
+    # ``get_json`` do not pay for it
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 """
@@ -113,6 +140,11 @@ def _validate_sgs_output(output: str) -> None:
         raise ValueError("Unknown output value, use: dataframe, text")
 
 
+def _validate_errors(errors: str) -> None:
+    if errors not in ("raise", "skip", "collect"):
+        raise ValueError("Unknown errors value, use: raise, skip, collect")
+
+
 def _validate_last(last: int) -> None:
     if not isinstance(last, int) or last < 0:
         raise ValueError(f"last must be a non-negative integer, got {last!r}")
@@ -208,6 +240,146 @@ def _get_url_and_payload(
     return url, payload
 
 
+# Longest date range the API serves for daily series
+_MAX_WINDOW_YEARS = 10
+
+# Seconds the frequency learned for a code is remembered
+_FREQUENCY_TTL = 7 * 24 * 3600
+
+# Whether each code is a daily series, learned from downloads split into
+# windows; codes known not to be daily are requested in a single window
+_FREQUENCIES = CacheNamespace("sgs_frequency", ttl=_FREQUENCY_TTL)
+
+# Open-ended ranges of daily series are not walked back past this date
+_EARLIEST_DATE = date(1900, 1, 1)
+
+
+class _RangeRefused(SGSError):
+    """The API refused a date range longer than it serves for daily series."""
+
+
+def _add_years(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year + years, day=28)
+
+
+def _windows(
+    code: int,
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+) -> List[Tuple[Optional[DateInput], Optional[DateInput]]]:
+    """Split ``start``-``end`` into the date windows requested for ``code``.
+
+    Daily series are served at most ``_MAX_WINDOW_YEARS`` at a time.  The
+    frequency is not known before the first download, so long ranges are
+    split until a response shows the series is not daily.  Ranges without
+    ``start`` are requested whole; when the API refuses them, they are
+    walked back with :func:`_windows_back`.
+    """
+    if last != 0 or start is None or _frequencies().get(str(code)) is False:
+        return [(start, end)]
+    first = Date(start).date
+    final = Date(end if end else "today").date
+    windows: List[Tuple[Optional[DateInput], Optional[DateInput]]] = []
+    while True:
+        stop = _add_years(first, _MAX_WINDOW_YEARS) - timedelta(days=1)
+        if stop >= final:
+            windows.append((first, final))
+            return windows
+        windows.append((first, stop))
+        first = stop + timedelta(days=1)
+
+
+def _windows_back(end: Optional[DateInput]) -> Generator[Tuple[date, date], None, None]:
+    # Windows of _MAX_WINDOW_YEARS ending at ``end`` (today by default),
+    # latest first, down to _EARLIEST_DATE
+    final = Date(end if end else "today").date
+    while final >= _EARLIEST_DATE:
+        first = max(
+            _add_years(final, -_MAX_WINDOW_YEARS) + timedelta(days=1), _EARLIEST_DATE
+        )
+        yield first, final
+        final = first - timedelta(days=1)
+
+
+def _stitch(code: int, bodies: List[Optional[SpooledBody]]) -> SpooledBody:
+    # Join the windows of one series, oldest first, into a single JSON array
+    # in a spool file, one window in memory at a time.  Dates repeated at
+    # the start of a window are dropped; windows without data (404) are
+    # skipped.
+    if all(body is None for body in bodies):
+        raise SGSError(f"BCB error: no data found for code = {code}")
+    try:
+        return spool_chunks(
+            _stitched_chunks(code, bodies), active_config().spool_threshold
+        )
+    finally:
+        for body in bodies:
+            if body is not None:
+                body.close()
+
+
+def _stitched_chunks(
+    code: int, bodies: List[Optional[SpooledBody]]
+) -> Generator[bytes, None, None]:
+    yield b"["
+    last: Optional[date] = None
+    written = False
+    for body in bodies:
+        if body is None:
+            continue
+        with body:
+            content = body.binary().read()
+        items = decoder.loads(content)
+        if not items:
+            continue
+        if last is None:
+            _note_frequency(code, items)
+        skip = 0
+        while (
+            last is not None
+            and skip < len(items)
+            and _parse_date(items[skip]["data"]) <= last
+        ):
+            skip += 1
+        if skip == 0:
+            chunk = content.strip()[1:-1].strip()
+        else:
+            chunk = json.dumps(items[skip:], separators=(",", ":"))[1:-1].encode()
+        if chunk:
+            yield b"," + chunk if written else chunk
+            written = True
+        last = max(last or date.min, _parse_date(items[-1]["data"]))
+    yield b"]"
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%d/%m/%Y").date()
+
+
+def _frequencies() -> CacheNamespace:
+    # Each bcb.Client session learns frequencies in its own data cache
+    session = current_session()
+    if session is None:
+        return _FREQUENCIES
+    return session._state(
+        "sgs_frequency",
+        lambda: CacheNamespace("sgs_frequency", session.data_cache, ttl=_FREQUENCY_TTL),
+    )
+
+
+def _note_frequency(code: int, items: List[Dict[str, str]]) -> None:
+    # Observations typically a week or more apart: not a daily series
+    days = sorted(_parse_date(item["data"]) for item in items)
+    gaps = sorted((b - a).days for a, b in zip(days, days[1:], strict=False))
+    if gaps:
+        _frequencies().set(str(code), gaps[len(gaps) // 2] < 7)
+
+
 def _raise_sgs_response_error(res: httpx.Response, code: int) -> None:
     if res.status_code == 429:
         raise_for_status(res, context=f"SGS time series code={code}")
@@ -217,10 +389,12 @@ def _raise_sgs_response_error(res: httpx.Response, code: int) -> None:
     except json.JSONDecodeError:
         res_json = {}
 
+    # A daily series asked for more than the API serves at once
+    error_cls = _RangeRefused if res.status_code == 406 else SGSError
     if "error" in res_json:
-        raise SGSError(f"BCB error: {res_json['error']}")
+        raise error_cls(f"BCB error: {res_json['error']}")
     if "erro" in res_json:
-        raise SGSError(f"BCB error: {res_json['erro']['detail']}")
+        raise error_cls(f"BCB error: {res_json['erro']['detail']}")
 
     raise_for_status(
         res,
@@ -232,21 +406,95 @@ def _raise_sgs_response_error(res: httpx.Response, code: int) -> None:
     )
 
 
-@with_retry
+# Seconds downloaded series stay in the data cache; None disables caching
+_CACHE_TTL: Optional[float] = None
+
+# Downloaded series, keyed by URL and query parameters
+_CACHE = CacheNamespace("sgs")
+
+
+def enable_cache(ttl: float) -> None:
+    """Cache downloaded series in the data cache for ``ttl`` seconds.
+
+    Series are stored as the raw JSON returned by the API, keyed by code and
+    date range, in the ``"sgs"`` namespace of the backend set with
+    :func:`bcb.http.set_data_cache`.  Series are revised and extended over
+    time, so the cache is disabled by default.
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds a downloaded series is reused.
+    """
+    global _CACHE_TTL
+    if ttl < 0:
+        raise ValueError(f"ttl must be non-negative, got {ttl!r}")
+    _CACHE_TTL = ttl
+
+
+def disable_cache() -> None:
+    """Stop caching downloaded series and drop the cached ones."""
+    global _CACHE_TTL
+    _CACHE_TTL = None
+    _cache().clear()
+
+
+def _cache() -> CacheNamespace:
+    # Each bcb.Client session keeps its own series
+    session = current_session()
+    if session is None:
+        return _CACHE
+    return session._state("sgs", lambda: CacheNamespace("sgs", session.data_cache))
+
+
+def _cache_key(url: str, payload: Dict[str, str]) -> str:
+    return f"{url}?{urlencode(sorted(payload.items()))}"
+
+
+def _cached_body(url: str, payload: Dict[str, str]) -> Optional[SpooledBody]:
+    if _CACHE_TTL is None:
+        return None
+    content = _cache().get(_cache_key(url, payload))
+    if content is None:
+        return None
+    logger.debug(f"SGS cache hit: {url}")
+    return SpooledBody.from_bytes(content)
+
+
+def _store_body(url: str, payload: Dict[str, str], body: SpooledBody) -> None:
+    if _CACHE_TTL is not None:
+        _cache().set(_cache_key(url, payload), body.binary().read(), ttl=_CACHE_TTL)
+
+
+@with_retry(module="sgs")
 def _get_sgs_response(
     url: str, payload: Dict[str, str], timeout: RequestTimeout
 ) -> httpx.Response:
-    return get_client().get(url, params=payload, **timeout_kwargs(timeout))
+    return stream_get(
+        get_client(),
+        url,
+        threshold=active_config().spool_threshold,
+        params=payload,
+        **timeout_kwargs(timeout),
+    )
 
 
-@with_retry
+@with_retry(module="sgs")
 async def _async_get_sgs_response(
     url: str, payload: Dict[str, str], timeout: RequestTimeout
 ) -> httpx.Response:
-    return await get_async_client().get(url, params=payload, **timeout_kwargs(timeout))
+    return await async_stream_get(
+        get_async_client(),
+        url,
+        threshold=active_config().spool_threshold,
+        params=payload,
+        **timeout_kwargs(timeout),
+    )
 
 
 def _format_df(df: pd.DataFrame, code: SGSCode, freq: Optional[str]) -> pd.DataFrame:
+    import pandas as pd
+
     cns = {"data": "Date", "valor": code.name, "datafim": "enddate"}
     df = df.rename(columns=cns)
     if "Date" in df:
@@ -260,6 +508,8 @@ def _format_df(df: pd.DataFrame, code: SGSCode, freq: Optional[str]) -> pd.DataF
 
 
 def _tidy_df(df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
     frames = []
     for position, series_name in enumerate(df.columns):
         frames.append(
@@ -276,6 +526,58 @@ def _tidy_df(df: pd.DataFrame) -> pd.DataFrame:
     return pd.concat(frames, ignore_index=True)
 
 
+def _build_result(
+    code_list: List[SGSCode],
+    bodies: List[SpooledBody],
+    multi: bool,
+    freq: Optional[str],
+    output: str,
+    tidy: bool,
+    many: Optional[bool] = None,
+) -> Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]:
+    # Parse the downloaded series into the output of get() and async_get().
+    # ``many`` keeps the shape of a multi-code request when only some of
+    # its codes were downloaded.
+    if output == "text":
+        results: Dict[int, str] = {}
+        for code, body in zip(code_list, bodies, strict=True):
+            with body:
+                results[code.value] = body.read_text()
+        values = list(results.values())
+        if not (len(values) > 1 if many is None else many):
+            return values[0]
+        return results
+
+    import pandas as pd
+
+    dfs = []
+    for code, body in zip(code_list, bodies, strict=True):
+        with body:
+            df = decoder.decode(body.binary().read(), code.name)
+            if df is None:
+                df = _format_df(pd.read_json(body.text()), code, None)
+        if freq:
+            df = df.to_period(freq)
+        dfs.append(df)
+    return _combine(dfs, multi, tidy, many)
+
+
+def _combine(
+    dfs: List[pd.DataFrame], multi: bool, tidy: bool, many: Optional[bool] = None
+) -> Union[pd.DataFrame, List[pd.DataFrame]]:
+    import pandas as pd
+
+    if tidy:
+        return _tidy_df(pd.concat(dfs, axis=1))
+    if not (len(dfs) > 1 if many is None else many):
+        return dfs[0]
+    else:
+        if multi:
+            return pd.concat(dfs, axis=1)
+        else:
+            return dfs
+
+
 @overload
 def get(
     codes: SGSCodeInput,
@@ -288,6 +590,8 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
+    max_workers: Optional[int] = ...,
 ) -> Union[pd.DataFrame, List[pd.DataFrame]]: ...
 
 
@@ -303,6 +607,8 @@ def get(
     tidy: bool = ...,
     *,
     timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
+    max_workers: Optional[int] = ...,
 ) -> Union[str, Dict[int, str]]: ...
 
 
@@ -317,6 +623,8 @@ def get(
     tidy: bool = False,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
+    max_workers: Optional[int] = None,
 ) -> Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]:
     """
     Retorna um DataFrame pandas com séries temporais obtidas do SGS.
@@ -361,6 +669,17 @@ def get(
     timeout : float or httpx.Timeout, optional
         Timeout por tentativa HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo novas
+        tentativas e requisições concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
+    max_workers : int, optional
+        Número máximo de códigos baixados ao mesmo tempo. Por padrão os
+        códigos são baixados em paralelo no loop de :mod:`bcb.runner`,
+        limitados apenas pelo controle adaptativo de concorrência; com
+        ``1`` são baixados um após o outro.  Com o loop desativado
+        (:func:`bcb.runner.set_enabled`), os códigos são baixados em um pool
+        de ``max_workers`` threads, ou de até 8 threads quando omitido.
 
     Returns
     -------
@@ -381,35 +700,13 @@ def get(
         múltiplos códigos).
     """
     _validate_sgs_output(output)
+    _validate_max_workers(max_workers)
     code_list = list(_codes(codes))
 
-    if output == "text":
-        results: Dict[int, str] = {}
-        for code in code_list:
-            results[code.value] = get_json(
-                code.value, start, end, last, timeout=timeout
-            )
-        values = list(results.values())
-        if len(values) == 1:
-            return values[0]
-        return results
+    with budget(deadline):
+        bodies = _fetch_all(code_list, start, end, last, timeout, max_workers)
 
-    dfs = []
-    for code in code_list:
-        text = get_json(code.value, start, end, last, timeout=timeout)
-        df = pd.read_json(StringIO(text))
-        df = _format_df(df, code, freq)
-        dfs.append(df)
-
-    if tidy:
-        return _tidy_df(pd.concat(dfs, axis=1))
-    if len(dfs) == 1:
-        return dfs[0]
-    else:
-        if multi:
-            return pd.concat(dfs, axis=1)
-        else:
-            return dfs
+    return _build_result(code_list, bodies, multi, freq, output, tidy)
 
 
 def get_json(
@@ -419,6 +716,7 @@ def get_json(
     last: int = 0,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
 ) -> str:
     """
     Retorna um JSON com séries temporais obtidas do SGS.
@@ -441,6 +739,10 @@ def get_json(
     timeout : float or httpx.Timeout, optional
         Timeout por tentativa HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo novas
+        tentativas e requisições concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
 
     Returns
     -------
@@ -448,23 +750,85 @@ def get_json(
     JSON :
         série temporal univariada em formato JSON.
     """
+    with _fetch(code, start, end, last, timeout, deadline) as body:
+        return body.read_text()
+
+
+def _fetch(
+    code: int | str,
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    deadline: Optional[float] = None,
+) -> SpooledBody:
+    # Download one series into a spool file, in date windows the API accepts
     code_obj = SGSCode.from_code(code)
     _validate_sgs_code(code_obj)
-    url, payload = _get_url_and_payload(code_obj.value, start, end, last)
-    logger.debug(
-        f"Fetching SGS time series code={code_obj.value} from {url.split('/dados')[0]}"
-    )
+    windows = _windows(code_obj.value, start, end, last)
+    if len(windows) == 1:
+        with budget(deadline):
+            try:
+                body = _fetch_window(code_obj.value, start, end, last, timeout)
+            except _RangeRefused:
+                if start is not None or last != 0:
+                    raise
+                return _fetch_back(code_obj.value, end, timeout)
+        assert body is not None
+        return body
+    if runner.is_enabled() and not runner.in_loop_thread():
+        return runner.run(_async_fetch(code, start, end, last, timeout, deadline))
+    with budget(deadline):
+        bodies = [
+            _fetch_window(code_obj.value, first, final, 0, timeout, missing_ok=True)
+            for first, final in windows
+        ]
+    return _stitch(code_obj.value, bodies)
+
+
+def _fetch_window(
+    code: int,
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    missing_ok: bool = False,
+) -> Optional[SpooledBody]:
+    url, payload = _get_url_and_payload(code, start, end, last)
+    cached = _cached_body(url, payload)
+    if cached is not None:
+        return cached
+    logger.debug(f"Fetching SGS time series code={code} from {url.split('/dados')[0]}")
     try:
         res = _get_sgs_response(url, payload, timeout)
     except httpx.HTTPError as ex:
         raise_for_request_error(
-            ex, context=f"SGS time series code={code_obj.value}", error_cls=SGSError
+            ex, context=f"SGS time series code={code}", error_cls=SGSError
         )
-    logger.debug(f"SGS response: status={res.status_code}, length={len(res.text)}")
+    logger.debug(f"SGS response: status={res.status_code}, length={body_length(res)}")
 
+    if res.status_code == 404 and missing_ok:
+        res.close()
+        return None
     if res.status_code != 200:
-        _raise_sgs_response_error(res, code_obj.value)
-    return str(res.text)
+        _raise_sgs_response_error(res, code)
+    body = body_of(res)
+    _store_body(url, payload, body)
+    return body
+
+
+def _fetch_back(
+    code: int, end: Optional[DateInput], timeout: RequestTimeout
+) -> SpooledBody:
+    # Full history of a daily series: windows are fetched from ``end``
+    # backwards until one is empty after data was found
+    bodies: List[Optional[SpooledBody]] = []
+    for first, final in _windows_back(end):
+        body = _fetch_window(code, first, final, 0, timeout, missing_ok=True)
+        if body is None and any(b is not None for b in bodies):
+            break
+        bodies.append(body)
+    return _stitch(code, bodies[::-1])
 
 
 async def async_get_json(
@@ -474,6 +838,7 @@ async def async_get_json(
     last: int = 0,
     *,
     timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
 ) -> str:
     """
     Retorna um JSON com séries temporais obtidas do SGS (async version).
@@ -493,6 +858,10 @@ async def async_get_json(
     timeout : float or httpx.Timeout, optional
         Timeout por tentativa HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo novas
+        tentativas e requisições concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
 
     Returns
     -------
@@ -506,26 +875,267 @@ async def async_get_json(
     SGSError
         Se a API retorna um erro
     """
+    with await _async_fetch(code, start, end, last, timeout, deadline) as body:
+        return body.read_text()
+
+
+async def _async_fetch(
+    code: int | str,
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    deadline: Optional[float] = None,
+) -> SpooledBody:
     code_obj = SGSCode.from_code(code)
     _validate_sgs_code(code_obj)
-    url, payload = _get_url_and_payload(code_obj.value, start, end, last)
+    windows = _windows(code_obj.value, start, end, last)
+    with budget(deadline):
+        if len(windows) == 1:
+            try:
+                body = await _async_fetch_window(
+                    code_obj.value, start, end, last, timeout
+                )
+            except _RangeRefused:
+                if start is not None or last != 0:
+                    raise
+                return await _async_fetch_back(code_obj.value, end, timeout)
+            assert body is not None
+            return body
+        bodies = await wait_for(
+            asyncio.gather(
+                *[
+                    _async_fetch_window(
+                        code_obj.value, first, final, 0, timeout, missing_ok=True
+                    )
+                    for first, final in windows
+                ]
+            )
+        )
+    return _stitch(code_obj.value, bodies)
+
+
+async def _async_fetch_back(
+    code: int, end: Optional[DateInput], timeout: RequestTimeout
+) -> SpooledBody:
+    # Async version of _fetch_back()
+    bodies: List[Optional[SpooledBody]] = []
+    for first, final in _windows_back(end):
+        body = await _async_fetch_window(
+            code, first, final, 0, timeout, missing_ok=True
+        )
+        if body is None and any(b is not None for b in bodies):
+            break
+        bodies.append(body)
+    return _stitch(code, bodies[::-1])
+
+
+async def _async_fetch_window(
+    code: int,
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    missing_ok: bool = False,
+) -> Optional[SpooledBody]:
+    url, payload = _get_url_and_payload(code, start, end, last)
+    cached = _cached_body(url, payload)
+    if cached is not None:
+        return cached
     logger.debug(
-        f"Fetching SGS time series (async) code={code_obj.value} "
-        f"from {url.split('/dados')[0]}"
+        f"Fetching SGS time series (async) code={code} from {url.split('/dados')[0]}"
     )
     try:
-        res = await _async_get_sgs_response(url, payload, timeout)
+        res = await wait_for(_async_get_sgs_response(url, payload, timeout))
     except httpx.HTTPError as ex:
         raise_for_request_error(
-            ex, context=f"SGS time series code={code_obj.value}", error_cls=SGSError
+            ex, context=f"SGS time series code={code}", error_cls=SGSError
         )
     logger.debug(
-        f"SGS (async) response: status={res.status_code}, length={len(res.text)}"
+        f"SGS (async) response: status={res.status_code}, length={body_length(res)}"
     )
 
+    if res.status_code == 404 and missing_ok:
+        await res.aclose()
+        return None
     if res.status_code != 200:
-        _raise_sgs_response_error(res, code_obj.value)
-    return str(res.text)
+        _raise_sgs_response_error(res, code)
+    body = body_of(res)
+    _store_body(url, payload, body)
+    return body
+
+
+def _validate_max_workers(max_workers: Optional[int]) -> None:
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers!r}")
+
+
+# Threads fetching codes when the background loop is disabled and
+# max_workers is not given
+_DEFAULT_THREADS = 8
+
+
+def _fetch_all(
+    code_list: List[SGSCode],
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    max_workers: Optional[int] = None,
+) -> List[SpooledBody]:
+    # Several codes are fetched concurrently on the background loop, so the
+    # sync API gets the same fan-out as async_get
+    if len(code_list) > 1 and max_workers != 1:
+        if runner.is_enabled() and not runner.in_loop_thread():
+            bodies = runner.run(
+                _async_fetch_all(code_list, start, end, last, timeout, max_workers)
+            )
+            return cast(List[SpooledBody], bodies)
+        if not runner.is_enabled():
+            return _fetch_in_threads(
+                code_list, start, end, last, timeout, max_workers or _DEFAULT_THREADS
+            )
+    return [_fetch(c.value, start, end, last, timeout) for c in code_list]
+
+
+def _fetch_in_threads(
+    code_list: List[SGSCode],
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    max_workers: int,
+) -> List[SpooledBody]:
+    # Each call runs in its own copy of the caller's context, so the active
+    # session and deadline apply in the worker threads
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(code_list)), thread_name_prefix="bcb-sgs"
+    ) as executor:
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run,
+                _fetch,
+                c.value,
+                start,
+                end,
+                last,
+                timeout,
+            )
+            for c in code_list
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # Codes not started yet are dropped
+            for future in futures:
+                future.cancel()
+            raise
+
+
+async def _async_fetch_all(
+    code_list: List[SGSCode],
+    start: Optional[DateInput],
+    end: Optional[DateInput],
+    last: int,
+    timeout: RequestTimeout,
+    limit: Optional[int] = None,
+    collect: bool = False,
+) -> List[Union[SpooledBody, BCBError]]:
+    # Concurrent HTTP requests, at most ``limit`` codes at a time
+    return await _fan_out(
+        [
+            functools.partial(_async_fetch, c.value, start, end, last, timeout)
+            for c in code_list
+        ],
+        limit,
+        collect,
+    )
+
+
+async def _fan_out(
+    calls: List[Callable[[], Awaitable[SpooledBody]]],
+    limit: Optional[int] = None,
+    collect: bool = False,
+) -> List[Union[SpooledBody, BCBError]]:
+    # Runs the calls as tasks, at most ``limit`` at a time, and returns
+    # their results in order.  Like a TaskGroup, the first fatal error
+    # cancels the other tasks and is raised once they have stopped, as does
+    # the deadline passing.  With ``collect``, the BCBError of a single call
+    # is returned in its place; running out of time stays fatal.
+    semaphore = asyncio.Semaphore(limit or len(calls) or 1)
+
+    async def run(
+        call: Callable[[], Awaitable[SpooledBody]],
+    ) -> Union[SpooledBody, BCBError]:
+        async with semaphore:
+            try:
+                return await call()
+            except DeadlineExceededError:
+                raise
+            except BCBError as ex:
+                if not collect:
+                    raise
+                return ex
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        if tasks:
+            await wait_for(asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION))
+        for task in tasks:
+            error = task.exception() if task.done() else None
+            if error is not None:
+                raise error
+        return [task.result() for task in tasks]
+    except BaseException:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in tasks:
+            if not task.cancelled() and task.exception() is None:
+                result = task.result()
+                if isinstance(result, SpooledBody):
+                    result.close()
+        raise
+
+
+@overload
+async def async_get(
+    codes: SGSCodeInput,
+    start: Optional[DateInput] = ...,
+    end: Optional[DateInput] = ...,
+    last: int = ...,
+    multi: bool = ...,
+    freq: Optional[str] = ...,
+    output: Literal["dataframe", "text"] = ...,
+    tidy: bool = ...,
+    *,
+    timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
+    max_concurrency: Optional[int] = ...,
+    errors: Literal["raise", "skip"] = ...,
+) -> Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]: ...
+
+
+@overload
+async def async_get(
+    codes: SGSCodeInput,
+    start: Optional[DateInput] = ...,
+    end: Optional[DateInput] = ...,
+    last: int = ...,
+    multi: bool = ...,
+    freq: Optional[str] = ...,
+    output: Literal["dataframe", "text"] = ...,
+    tidy: bool = ...,
+    *,
+    timeout: RequestTimeout = ...,
+    deadline: Optional[float] = ...,
+    max_concurrency: Optional[int] = ...,
+    errors: Literal["collect"],
+) -> Tuple[
+    Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]],
+    Dict[int, BCBError],
+]: ...
 
 
 async def async_get(
@@ -539,12 +1149,28 @@ async def async_get(
     tidy: bool = False,
     *,
     timeout: RequestTimeout = None,
-) -> Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]:
+    deadline: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    errors: Literal["raise", "skip", "collect"] = "raise",
+) -> Union[
+    pd.DataFrame,
+    List[pd.DataFrame],
+    str,
+    Dict[int, str],
+    Tuple[
+        Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]],
+        Dict[int, BCBError],
+    ],
+]:
     """
     Retorna um DataFrame pandas com séries temporais obtidas do SGS (async version).
 
-    Same signature as :func:`get`, but uses async HTTP requests and
-    :func:`asyncio.gather` to fetch multiple codes concurrently.
+    Same signature as :func:`get`, but uses async HTTP requests to fetch
+    multiple codes concurrently.  The requests in flight are capped by the
+    adaptive concurrency limit, see :func:`bcb.http.set_adaptive_concurrency`,
+    and the codes downloaded at once by ``max_concurrency``.  When a code
+    fails, the downloads still running are cancelled before the error is
+    raised, unless ``errors`` keeps the other series.
 
     Parameters
     ----------
@@ -571,39 +1197,242 @@ async def async_get(
     timeout : float or httpx.Timeout, optional
         Timeout por tentativa HTTP, em segundos ou como ``httpx.Timeout``.
         Quando omitido, usa o timeout padrão do cliente compartilhado.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira, incluindo novas
+        tentativas e requisições concorrentes. Ao ser excedido levanta
+        :py:class:`bcb.exceptions.DeadlineExceededError`.
+    max_concurrency : int, optional
+        Número máximo de códigos baixados ao mesmo tempo.
+    errors : {'raise', 'skip', 'collect'}, default 'raise'
+        O que fazer quando um código falha com
+        :py:class:`bcb.exceptions.BCBError`. ``'raise'`` levanta o erro;
+        ``'skip'`` retorna apenas as séries obtidas; ``'collect'`` retorna
+        também um ``dict`` de código → erro.  Com ``'skip'`` e ``'collect'``
+        o resultado mantém o formato de uma consulta com vários códigos; se
+        nenhum código for obtido, o primeiro erro é levantado.  O fim do
+        ``deadline`` sempre interrompe a consulta inteira.
 
     Returns
     -------
     Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]
-        Série(s) temporal(is) conforme especificado
+        Série(s) temporal(is) conforme especificado.  Com
+        ``errors='collect'``, uma tupla ``(séries, erros)``.
     """
     _validate_sgs_output(output)
+    _validate_errors(errors)
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency!r}")
     code_list = list(_codes(codes))
 
-    # Concurrent HTTP requests via asyncio.gather()
-    texts = await asyncio.gather(
-        *[async_get_json(c.value, start, end, last, timeout=timeout) for c in code_list]
+    with budget(deadline):
+        results = await _async_fetch_all(
+            code_list,
+            start,
+            end,
+            last,
+            timeout,
+            max_concurrency,
+            collect=errors != "raise",
+        )
+
+    if errors == "raise":
+        bodies = cast(List[SpooledBody], results)
+        return _build_result(code_list, bodies, multi, freq, output, tidy)
+
+    fetched: List[SGSCode] = []
+    bodies = []
+    failed: Dict[int, BCBError] = {}
+    for code, result in zip(code_list, results, strict=True):
+        if isinstance(result, BCBError):
+            logger.debug(f"SGS code={code.value} skipped: {result}")
+            failed[code.value] = result
+        else:
+            fetched.append(code)
+            bodies.append(result)
+    if not fetched:
+        raise next(iter(failed.values()))
+    series = _build_result(
+        fetched, bodies, multi, freq, output, tidy, many=len(code_list) > 1
     )
+    if errors == "collect":
+        return series, failed
+    return series
 
-    if output == "text":
-        results: Dict[int, str] = {
-            c.value: t for c, t in zip(code_list, texts, strict=True)
-        }
-        values = list(results.values())
-        if len(values) == 1:
-            return values[0]
-        return results
 
-    dfs = [
-        _format_df(pd.read_json(StringIO(t)), c, freq)
-        for c, t in zip(code_list, texts, strict=True)
-    ]
-    if tidy:
-        return _tidy_df(pd.concat(dfs, axis=1))
-    if len(dfs) == 1:
-        return dfs[0]
-    else:
-        if multi:
-            return pd.concat(dfs, axis=1)
-        else:
-            return dfs
+def submit(
+    codes: SGSCodeInput,
+    start: Optional[DateInput] = None,
+    end: Optional[DateInput] = None,
+    last: int = 0,
+    multi: bool = True,
+    freq: Optional[str] = None,
+    output: Literal["dataframe", "text"] = "dataframe",
+    tidy: bool = False,
+    *,
+    timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> concurrent.futures.Future[
+    Union[pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]]
+]:
+    """
+    Inicia :func:`get` em segundo plano e retorna um ``Future`` imediatamente.
+
+    Aceita os mesmos argumentos de :func:`get`.  As séries são baixadas na
+    event loop de segundo plano de :mod:`bcb.runner`, que compartilha o
+    cliente assíncrono e os limites de concorrência, e processadas nas
+    threads de trabalho dela.  Use :func:`bcb.as_completed` para coletar
+    vários resultados à medida que terminam.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Resolvido com o resultado de :func:`get`.
+    """
+    _validate_sgs_output(output)
+    _validate_max_workers(max_workers)
+    code_list = list(_codes(codes))
+
+    async def fetch_and_parse() -> Union[
+        pd.DataFrame, List[pd.DataFrame], str, Dict[int, str]
+    ]:
+        with budget(deadline):
+            bodies = await _async_fetch_all(
+                code_list, start, end, last, timeout, max_workers
+            )
+        # Parsing holds the GIL, so it is kept off the loop
+        return await asyncio.to_thread(
+            _build_result,
+            code_list,
+            cast(List[SpooledBody], bodies),
+            multi,
+            freq,
+            output,
+            tidy,
+        )
+
+    return runner.submit(fetch_and_parse())
+
+
+def sync(
+    codes: SGSCodeInput,
+    store: Optional[SeriesStore] = None,
+    *,
+    start: Optional[DateInput] = None,
+    overlap: int = 3,
+    timeout: RequestTimeout = None,
+    deadline: Optional[float] = None,
+) -> Dict[int, int]:
+    """
+    Atualiza um :class:`SeriesStore` local com as observações novas do SGS.
+
+    Cada código é baixado a partir da última observação armazenada, de modo
+    que o custo de uma atualização cresce com os dados novos e não com o
+    tamanho da série.  As últimas ``overlap`` observações armazenadas são
+    baixadas novamente e sobrescritas, incorporando revisões.  Os códigos são
+    baixados em paralelo; leia as séries com :meth:`SeriesStore.get`::
+
+        store = sgs.SeriesStore("series.sqlite")
+        sgs.sync([11, 12, 433], store, start="2000-01-01")
+        df = store.get({"Selic": 11, "CDI": 12})
+
+    Parameters
+    ----------
+    codes : {int, List[int], List[str], Dict[str:int]}
+        Códigos das séries temporais, nos formatos aceitos por :func:`get`.
+    store : SeriesStore, optional
+        Armazenamento a atualizar; por padrão ``sgs.sqlite`` no diretório de
+        cache.
+    start : str, date, datetime ou bcb.utils.Date, optional
+        Data de início para códigos ainda sem observações armazenadas.
+        Quando omitida, a série inteira é baixada.
+    overlap : int
+        Número de observações armazenadas baixadas novamente em cada código.
+    timeout : float ou httpx.Timeout, optional
+        Timeout por tentativa HTTP.
+    deadline : float, optional
+        Tempo máximo, em segundos, para a operação inteira.
+
+    Returns
+    -------
+    dict
+        Mapeamento de código → número de datas novas armazenadas.
+
+    Raises
+    ------
+    SGSError
+        Quando algum código falha; os demais já foram armazenados.
+    """
+    if overlap < 0:
+        raise ValueError(f"overlap must be non-negative, got {overlap!r}")
+    store = store if store is not None else SeriesStore()
+    code_list = list(_codes(codes))
+    starts: List[Optional[DateInput]] = []
+    for code in code_list:
+        resume = store.resume_date(code.value, overlap)
+        starts.append(resume if resume is not None else start)
+
+    with budget(deadline):
+        results = _fetch_since(code_list, starts, timeout)
+
+    written: Dict[int, int] = {}
+    failed: Dict[int, BaseException] = {}
+    try:
+        for code, result in zip(code_list, results, strict=True):
+            if isinstance(result, BaseException):
+                failed[code.value] = result
+                continue
+            with result:
+                observations = json.loads(result.read_text())
+            written[code.value] = store.write(code.value, observations)
+            logger.debug(f"SGS sync code={code.value}: {written[code.value]} new dates")
+    finally:
+        for result in results:
+            if isinstance(result, SpooledBody):
+                result.close()
+    if failed:
+        raise SGSError(f"Failed to sync codes {sorted(failed)}") from next(
+            iter(failed.values())
+        )
+    return written
+
+
+def _fetch_since(
+    code_list: List[SGSCode],
+    starts: List[Optional[DateInput]],
+    timeout: RequestTimeout,
+) -> List[Union[SpooledBody, BCBError]]:
+    # Like _fetch_all with a start date per code; failures of single codes
+    # are returned instead of raised
+    if runner.is_enabled() and not runner.in_loop_thread():
+        return runner.run(_async_fetch_since(code_list, starts, timeout))
+    results: List[Union[SpooledBody, BCBError]] = []
+    try:
+        for code, start in zip(code_list, starts, strict=True):
+            try:
+                results.append(_fetch(code.value, start, None, 0, timeout))
+            except DeadlineExceededError:
+                # Running out of time ends the whole sync, not just one code
+                raise
+            except BCBError as ex:
+                results.append(ex)
+    except BaseException:
+        for result in results:
+            if isinstance(result, SpooledBody):
+                result.close()
+        raise
+    return results
+
+
+async def _async_fetch_since(
+    code_list: List[SGSCode],
+    starts: List[Optional[DateInput]],
+    timeout: RequestTimeout,
+) -> List[Union[SpooledBody, BCBError]]:
+    return await _fan_out(
+        [
+            functools.partial(_async_fetch, code.value, start, None, 0, timeout)
+            for code, start in zip(code_list, starts, strict=True)
+        ],
+        collect=True,
+    )
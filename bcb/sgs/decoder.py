@@ -0,0 +1,140 @@
+"""Decoder of SGS payloads into DataFrames.
+
+The SGS API always answers with the same schema,
+``[{"data": "dd/mm/YYYY", "valor": "1.23"}, ...]``, optionally with a
+``datafim`` date.  :func:`decode` parses the raw bytes with ``orjson`` when
+it is installed (``pip install python-bcb[speedups]``), converts the dates
+with integer arithmetic on their fixed-width digits and the values with a
+single numpy cast, and builds the ``DatetimeIndex`` without format
+inference.  Payloads that do not follow the schema are left to
+``pd.read_json``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+def _json_backend() -> Callable[[bytes], Any]:
+    try:
+        return importlib.import_module("orjson").loads  # type: ignore[no-any-return]
+    except ImportError:
+        return json.loads
+
+
+loads = _json_backend()
+
+# Offsets of the digits in "dd/mm/YYYY"
+_DIGITS = [0, 1, 3, 4, 6, 7, 8, 9]
+_SLASH = ord("/")
+_ZERO = ord("0")
+
+
+def parse_dates(values: List[Any]) -> Optional[np.ndarray]:
+    """Convert ``dd/mm/YYYY`` strings to ``datetime64[D]``.
+
+    Returns ``None`` if any value is not a valid date in that format.
+    """
+    import numpy as np
+
+    text = np.asarray(values)
+    if text.dtype.kind != "U" or text.dtype.itemsize != 40:
+        return None
+    chars = text.view(np.uint32).reshape(-1, 10)
+    if not ((chars[:, 2] == _SLASH) & (chars[:, 5] == _SLASH)).all():
+        return None
+    digits = chars[:, _DIGITS].astype(np.int64) - _ZERO
+    if not ((digits >= 0) & (digits <= 9)).all():
+        return None
+    day = digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    if not ((month >= 1) & (month <= 12) & (day >= 1)).all():
+        return None
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    dates: np.ndarray = months.astype("datetime64[D]") + (day - 1)
+    # Days past the end of their month roll over into the next one
+    if not (dates.astype("datetime64[M]") == months).all():
+        return None
+    return dates
+
+
+def parse_values(values: List[Any]) -> Optional[np.ndarray]:
+    """Convert the ``valor`` strings to ``int64`` when they are all whole
+    numbers, as ``pd.read_json`` does, or to ``float64``.
+
+    A decimal comma is accepted.  Returns ``None`` for empty or
+    non-numeric values.
+    """
+    import numpy as np
+
+    text = np.asarray(values)
+    if text.dtype.kind != "U":
+        return None
+    if (np.char.find(text, ",") >= 0).any():
+        text = np.char.replace(text, ",", ".")
+    try:
+        return text.astype(np.int64)
+    except (ValueError, OverflowError):
+        pass
+    try:
+        return text.astype(np.float64)
+    except ValueError:
+        return None
+
+
+def decode(content: bytes, name: str) -> Optional[pd.DataFrame]:
+    """Build the DataFrame of one series from the raw SGS payload.
+
+    The result is indexed by ``Date`` and has the values in column
+    ``name`` and, when present, ``enddate``.  Returns ``None`` when the
+    payload does not follow the usual schema.
+    """
+    import pandas as pd
+
+    try:
+        items = loads(content)
+    except ValueError:
+        return None
+    if not isinstance(items, list) or not items or not isinstance(items[0], dict):
+        return None
+    try:
+        dates = parse_dates([item["data"] for item in items])
+        values = parse_values([item["valor"] for item in items])
+        ends = (
+            parse_dates([item["datafim"] for item in items])
+            if "datafim" in items[0]
+            else None
+        )
+    except (KeyError, TypeError):
+        return None
+    if dates is None or values is None:
+        return None
+    if "datafim" in items[0] and ends is None:
+        return None
+
+    index = pd.DatetimeIndex(dates.astype(_date_dtype()), name="Date")
+    df: pd.DataFrame = pd.DataFrame({name: values}, index=index)
+    if ends is not None:
+        df["enddate"] = ends.astype(_date_dtype())
+    return df
+
+
+# Resolution of the dates built by pd.to_datetime, found on first use
+_DATE_DTYPE: Any = None
+
+
+def _date_dtype() -> Any:
+    # The resolution pd.to_datetime gives these dates in the installed pandas
+    global _DATE_DTYPE
+    if _DATE_DTYPE is None:
+        import pandas as pd
+
+        _DATE_DTYPE = pd.to_datetime(["01/01/2000"], format="%d/%m/%Y").dtype
+    return _DATE_DTYPE
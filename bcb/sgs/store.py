@@ -0,0 +1,210 @@
+"""Local store of SGS series kept up to date by :func:`bcb.sgs.sync`."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from bcb.cache import default_cache_dir
+from bcb.utils import Date, DateInput
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from bcb.sgs import SGSCodeInput
+
+
+def _to_number(value: Any) -> Union[int, float, None]:
+    # Whole numbers are kept as int, so get() can rebuild the int64 series
+    # sgs.get returns for them
+    if isinstance(value, str):
+        value = value.replace(",", ".")
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _iso(value: str) -> str:
+    # "31/12/2024" -> "2024-12-31", which sorts by date
+    return datetime.strptime(value, "%d/%m/%Y").date().isoformat()
+
+
+class SeriesStore:
+    """SGS observations in a SQLite database, one row per code and date.
+
+    :func:`bcb.sgs.sync` adds the observations published since the last
+    sync and overwrites revised ones; nothing is ever dropped.  Reads with
+    :meth:`get` are served from the file without touching the network.
+    The database runs in WAL mode, so several processes can read it while
+    one of them syncs.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Database file. Defaults to ``sgs.sqlite`` under
+        :func:`bcb.cache.default_cache_dir`.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None) -> None:
+        self.path = Path(path) if path else default_cache_dir() / "sgs.sqlite"
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+
+    def __repr__(self) -> str:
+        return f"SeriesStore(path={str(self.path)!r})"
+
+    def _connect(self) -> sqlite3.Connection:
+        # Must be called with the lock held.  A connection inherited through
+        # fork() is not used by the child.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # value has no type affinity, so integers and reals are read
+            # back as they were written
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS observations ("
+                "code INTEGER NOT NULL, date TEXT NOT NULL, value BLOB, "
+                "enddate TEXT, PRIMARY KEY (code, date)) WITHOUT ROWID"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def codes(self) -> List[int]:
+        """Codes with at least one stored observation."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute("SELECT DISTINCT code FROM observations ORDER BY code")
+                .fetchall()
+            )
+        return [row[0] for row in rows]
+
+    def last_date(self, code: int) -> Optional[date]:
+        """Date of the latest stored observation of ``code``."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT MAX(date) FROM observations WHERE code = ?", (code,))
+                .fetchone()
+            )
+        return None if row[0] is None else date.fromisoformat(row[0])
+
+    def resume_date(self, code: int, overlap: int = 0) -> Optional[date]:
+        """Date a sync of ``code`` starts from.
+
+        The last ``overlap`` stored observations are downloaded again, so
+        revisions to them are picked up; with ``0`` only the latest one is.
+        ``None`` when nothing is stored for ``code``.
+        """
+        if overlap < 0:
+            raise ValueError(f"overlap must be non-negative, got {overlap!r}")
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT date FROM observations WHERE code = ? "
+                "ORDER BY date DESC LIMIT 1 OFFSET ?",
+                (code, max(overlap - 1, 0)),
+            ).fetchone()
+            if row is None:
+                row = connection.execute(
+                    "SELECT MIN(date) FROM observations WHERE code = ?", (code,)
+                ).fetchone()
+        return None if row[0] is None else date.fromisoformat(row[0])
+
+    def write(self, code: int, observations: Iterable[Dict[str, Any]]) -> int:
+        """Store observations as returned by the SGS JSON API.
+
+        Observations already stored for the same dates are replaced.
+
+        Returns
+        -------
+        int
+            Number of dates not stored before.
+        """
+        rows = [
+            (
+                code,
+                _iso(item["data"]),
+                _to_number(item.get("valor")),
+                _iso(item["datafim"]) if item.get("datafim") else None,
+            )
+            for item in observations
+        ]
+        with self._lock:
+            connection = self._connect()
+            count = "SELECT COUNT(*) FROM observations WHERE code = ?"
+            before = connection.execute(count, (code,)).fetchone()[0]
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?)", rows
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            after = connection.execute(count, (code,)).fetchone()[0]
+        return int(after - before)
+
+    def get(
+        self,
+        codes: SGSCodeInput,
+        start: Optional[DateInput] = None,
+        end: Optional[DateInput] = None,
+        multi: bool = True,
+        freq: Optional[str] = None,
+        tidy: bool = False,
+    ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
+        """Read stored series, shaped like the output of :func:`bcb.sgs.get`.
+
+        Codes without stored observations give empty series.
+        """
+        import pandas as pd
+
+        from bcb.sgs import _codes, _combine, _format_df
+
+        query = (
+            "SELECT strftime('%d/%m/%Y', date) AS data, value AS valor, "
+            "strftime('%d/%m/%Y', enddate) AS datafim "
+            "FROM observations WHERE code = ? AND date >= ? AND date <= ? "
+            "ORDER BY date"
+        )
+        first = Date(start).date.isoformat() if start is not None else ""
+        final = Date(end).date.isoformat() if end is not None else "9999-12-31"
+        dfs = []
+        for code in _codes(codes):
+            with self._lock:
+                cursor = self._connect().execute(query, (code.value, first, final))
+                rows = cursor.fetchall()
+            df = pd.DataFrame(rows, columns=["data", "valor", "datafim"])
+            integral = bool(rows) and all(type(row[1]) is int for row in rows)
+            df["valor"] = df["valor"].astype("int64" if integral else "float64")
+            if df["datafim"].isna().all():
+                df = df.drop(columns="datafim")
+            dfs.append(_format_df(df, code, freq))
+        return _combine(dfs, multi, tidy)
+
+    def delete(self, code: int) -> None:
+        """Drop every stored observation of ``code``."""
+        with self._lock:
+            self._connect().execute("DELETE FROM observations WHERE code = ?", (code,))
+
+    def close(self) -> None:
+        """Close the database connection; it is reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
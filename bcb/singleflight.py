@@ -0,0 +1,184 @@
+"""Coalescing of identical in-flight requests.
+
+While a ``GET`` for a canonical URL is in flight, further requests for the
+same URL wait for it instead of going to the network; every waiter receives
+its own copy of the buffered response.  Bodies of spooled requests (see
+:mod:`bcb.spool`) are spooled once and every waiter streams its copy from
+the shared spool file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+from bcb import deadline
+from bcb.cache import cache_key, replayable_headers
+from bcb.spool import (
+    SpooledBody,
+    async_spool_response,
+    spool_response,
+    spool_threshold,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Result:
+    status_code: int = 0
+    headers: list[tuple[str, str]] = field(default_factory=list)
+    content: bytes = b""
+    error: Optional[BaseException] = None
+    # Spooled body, released when the last response streaming it is
+    # garbage collected
+    body: Optional[SpooledBody] = None
+
+    def to_response(self) -> httpx.Response:
+        if self.error is not None:
+            raise self.error
+        if self.body is not None:
+            return httpx.Response(
+                self.status_code, headers=self.headers, stream=self.body.stream()
+            )
+        return httpx.Response(
+            self.status_code, headers=self.headers, content=self.content
+        )
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: _Result = field(default_factory=_Result)
+
+
+def _is_coalescable(request: httpx.Request) -> bool:
+    return request.method == "GET"
+
+
+class SingleFlightTransport(httpx.BaseTransport):
+    """Transport wrapper that lets one request per URL be in flight.
+
+    Parameters
+    ----------
+    transport : httpx.BaseTransport
+        Transport that performs the actual requests.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self._transport = transport
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_coalescable(request):
+            return self._transport.handle_request(request)
+        key = cache_key(request.method, request.url)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+        if not leader:
+            logger.debug(f"Joining in-flight request for {request.url}")
+            active = deadline.current()
+            if not call.done.wait(None if active is None else active.remaining()):
+                assert active is not None
+                raise active.exceeded()
+            return call.result.to_response()
+        try:
+            response = self._transport.handle_request(request)
+            threshold = spool_threshold(request)
+            if threshold is not None:
+                body = spool_response(response, threshold)
+                call.result = _Result(
+                    response.status_code,
+                    replayable_headers(response.headers),
+                    body=body,
+                )
+            else:
+                try:
+                    content = response.read()
+                finally:
+                    response.close()
+                call.result = _Result(
+                    response.status_code, replayable_headers(response.headers), content
+                )
+        except BaseException as ex:
+            call.result = _Result(error=ex)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result.to_response()
+
+    def in_flight(self) -> int:
+        """Number of distinct requests currently in flight."""
+        with self._lock:
+            return len(self._calls)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncSingleFlightTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`SingleFlightTransport`.
+
+    Requests are coalesced among tasks of the same event loop.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+        self._calls: dict[tuple[int, str], asyncio.Future[_Result]] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not _is_coalescable(request):
+            return await self._transport.handle_async_request(request)
+        loop = asyncio.get_running_loop()
+        key = (id(loop), cache_key(request.method, request.url))
+        pending = self._calls.get(key)
+        if pending is not None:
+            logger.debug(f"Joining in-flight request for {request.url}")
+            result = await deadline.wait_for(asyncio.shield(pending))
+            if not isinstance(result.error, asyncio.CancelledError):
+                return result.to_response()
+            # The leader was cancelled; fetch on our own behalf.
+            return await self._transport.handle_async_request(request)
+        future: asyncio.Future[_Result] = loop.create_future()
+        self._calls[key] = future
+        try:
+            response = await self._transport.handle_async_request(request)
+            threshold = spool_threshold(request)
+            if threshold is not None:
+                body = await async_spool_response(response, threshold)
+                result = _Result(
+                    response.status_code,
+                    replayable_headers(response.headers),
+                    body=body,
+                )
+            else:
+                try:
+                    content = await response.aread()
+                finally:
+                    await response.aclose()
+                result = _Result(
+                    response.status_code, replayable_headers(response.headers), content
+                )
+        except BaseException as ex:
+            result = _Result(error=ex)
+        finally:
+            del self._calls[key]
+        future.set_result(result)
+        return result.to_response()
+
+    def in_flight(self) -> int:
+        """Number of distinct requests currently in flight."""
+        return len(self._calls)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
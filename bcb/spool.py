@@ -0,0 +1,322 @@
+"""Stream response bodies to a spool file instead of holding them in memory.
+
+Large SGS series and Olinda queries can return hundreds of megabytes.  The
+fetchers send those requests in streaming mode and copy the body, chunk by
+chunk, into a :class:`tempfile.SpooledTemporaryFile`: small bodies stay in
+memory, bodies past ``HTTPConfig.spool_threshold`` roll over to a temporary
+file on disk.  Parsers then read from the file, so a response never exists
+as ``bytes``, decoded ``str`` and ``StringIO`` copies at the same time.
+
+Spooled requests carry the threshold in their extensions, so transports
+that keep a copy of the body -- the HTTP cache and request coalescing --
+stream it to a file as well instead of reading it into memory.
+"""
+
+from __future__ import annotations
+
+import io
+import tempfile
+import threading
+from types import TracebackType
+from typing import IO, Any, Iterable, Iterator, Optional, Union
+
+import httpx
+
+# Key of the spooled body in ``httpx.Response.extensions``
+_EXTENSION = "bcb.spool"
+
+# Key of the spool threshold in ``httpx.Request.extensions``
+_REQUEST_EXTENSION = "bcb.spool_threshold"
+
+# Size of the chunks read by :class:`FileStream`
+_CHUNK_SIZE = 64 * 1024
+
+# Bodies larger than this roll over from memory to a temporary file (bytes)
+DEFAULT_SPOOL_THRESHOLD = 8 * 1024 * 1024
+
+
+class SpooledBody:
+    """Response body held in a spool file.
+
+    Attributes
+    ----------
+    size : int
+        Number of bytes received.
+    encoding : str
+        Text encoding of the body.
+    """
+
+    def __init__(self, file: IO[bytes], size: int, encoding: str) -> None:
+        self._file = file
+        self._lock = threading.Lock()
+        self.size = size
+        self.encoding = encoding
+
+    @classmethod
+    def from_bytes(cls, content: bytes, encoding: str = "utf-8") -> SpooledBody:
+        """Wrap a body that was already read into memory."""
+        return cls(io.BytesIO(content), len(content), encoding)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the body rolled over to a temporary file."""
+        return bool(getattr(self._file, "_rolled", False))
+
+    def binary(self) -> IO[bytes]:
+        """The body as a binary file, rewound to the start."""
+        self._file.seek(0)
+        return self._file
+
+    def text(self) -> IO[str]:
+        """The body as a text file, decoded on the fly."""
+        return io.TextIOWrapper(
+            io.BufferedReader(_Unclosable(self.binary())),
+            encoding=self.encoding,
+            errors="replace",
+        )
+
+    def read_text(self) -> str:
+        """Decode the whole body."""
+        return self.binary().read().decode(self.encoding, errors="replace")
+
+    def stream(self) -> FileStream:
+        """A response stream over the body.
+
+        Streams keep their own read position, so several responses can be
+        served from one body.  Closing a stream leaves the body open.
+        """
+        return FileStream(self._file, lock=self._lock, close_file=False)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> SpooledBody:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        where = "disk" if self.on_disk else "memory"
+        return f"<SpooledBody {self.size} bytes in {where}>"
+
+
+class FileStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response stream reading a body from a file in chunks.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        Binary file holding the body.
+    lock : threading.Lock, optional
+        Lock shared by the streams reading the same file.
+    close_file : bool, default True
+        Whether closing the stream closes ``file``.
+    """
+
+    def __init__(
+        self,
+        file: IO[bytes],
+        *,
+        lock: Optional[threading.Lock] = None,
+        close_file: bool = True,
+    ) -> None:
+        self._file = file
+        self._lock = lock or threading.Lock()
+        self._close_file = close_file
+        self._position = 0
+
+    def _chunks(self) -> Iterator[bytes]:
+        while True:
+            with self._lock:
+                self._file.seek(self._position)
+                chunk = self._file.read(_CHUNK_SIZE)
+            if not chunk:
+                return
+            self._position += len(chunk)
+            yield chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks()
+
+    async def __aiter__(self) -> Any:
+        for chunk in self._chunks():
+            yield chunk
+
+    def close(self) -> None:
+        if self._close_file:
+            self._file.close()
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class _Unclosable(io.RawIOBase):
+    # Lets a TextIOWrapper be garbage collected without closing the spool
+    def __init__(self, file: IO[bytes]) -> None:
+        self._file = file
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._file.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _new_spool(threshold: int) -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(max_size=threshold, prefix="bcb-")
+
+
+def _encoding(response: httpx.Response) -> str:
+    return response.charset_encoding or "utf-8"
+
+
+def spool_response(response: httpx.Response, threshold: int) -> SpooledBody:
+    """Copy the body of a streaming response into a spool file."""
+    file = _new_spool(threshold)
+    size = 0
+    try:
+        for chunk in response.iter_bytes():
+            file.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        file.close()
+        raise
+    finally:
+        response.close()
+    return SpooledBody(file, size, _encoding(response))
+
+
+async def async_spool_response(response: httpx.Response, threshold: int) -> SpooledBody:
+    """Async version of :func:`spool_response`."""
+    file = _new_spool(threshold)
+    size = 0
+    try:
+        async for chunk in response.aiter_bytes():
+            file.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        file.close()
+        raise
+    finally:
+        await response.aclose()
+    return SpooledBody(file, size, _encoding(response))
+
+
+def spool_chunks(
+    chunks: Iterable[bytes], threshold: int, encoding: str = "utf-8"
+) -> SpooledBody:
+    """Write a body produced in chunks to a spool file."""
+    file = _new_spool(threshold)
+    size = 0
+    try:
+        for chunk in chunks:
+            file.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        file.close()
+        raise
+    return SpooledBody(file, size, encoding)
+
+
+def spool_threshold(request: httpx.Request) -> Optional[int]:
+    """Spool threshold of a request sent by :func:`stream_get`, else ``None``."""
+    threshold = request.extensions.get(_REQUEST_EXTENSION)
+    return threshold if isinstance(threshold, int) else None
+
+
+def _build_request(
+    client: Union[httpx.Client, httpx.AsyncClient],
+    url: str,
+    threshold: int,
+    kwargs: dict[str, Any],
+) -> httpx.Request:
+    extensions = {
+        **(kwargs.pop("extensions", None) or {}),
+        _REQUEST_EXTENSION: threshold,
+    }
+    return client.build_request("GET", url, extensions=extensions, **kwargs)
+
+
+def stream_get(
+    client: httpx.Client,
+    url: str,
+    *,
+    threshold: int,
+    spool_status: int = 200,
+    **kwargs: Any,
+) -> httpx.Response:
+    """``GET`` a URL, spooling the body of ``spool_status`` responses.
+
+    Other responses -- errors, typically small -- are read into memory as
+    usual.  The response is closed on return; use :func:`body_of` to get
+    its body.
+    """
+    request = _build_request(client, url, threshold, kwargs)
+    response = client.send(request, stream=True)
+    if response.status_code == spool_status:
+        body = spool_response(response, threshold)
+        # Transports may share the extensions dict between responses
+        response.extensions = {**response.extensions, _EXTENSION: body}
+    else:
+        try:
+            response.read()
+        finally:
+            response.close()
+    return response
+
+
+async def async_stream_get(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    threshold: int,
+    spool_status: int = 200,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Async version of :func:`stream_get`."""
+    request = _build_request(client, url, threshold, kwargs)
+    response = await client.send(request, stream=True)
+    if response.status_code == spool_status:
+        body = await async_spool_response(response, threshold)
+        response.extensions = {**response.extensions, _EXTENSION: body}
+    else:
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+    return response
+
+
+def body_of(response: httpx.Response) -> SpooledBody:
+    """Return the spooled body of a response, or wrap its in-memory body."""
+    body = response.extensions.get(_EXTENSION)
+    if isinstance(body, SpooledBody):
+        return body
+    return SpooledBody.from_bytes(response.content, _encoding(response))
+
+
+def body_length(response: httpx.Response) -> str:
+    """Body size for log messages, without decoding the body.
+
+    The streamed byte count when the body was spooled, otherwise the
+    ``Content-Length`` header or the size of the body already read, or
+    ``"?"`` when none is known.
+    """
+    body = response.extensions.get(_EXTENSION)
+    if isinstance(body, SpooledBody):
+        return str(body.size)
+    length: Optional[str] = response.headers.get("Content-Length")
+    if length is not None:
+        return length
+    try:
+        return str(len(response.content))
+    except httpx.ResponseNotRead:
+        return "?"
@@ -0,0 +1,739 @@
+"""Local stand-in for the BCB APIs and a load-test harness.
+
+:class:`StandInServer` answers the requests made by the library -- SGS
+series, the PTAX bulletins and currency list, and Olinda OData services
+with their ``$metadata`` -- with synthetic data, from a thread serving
+``127.0.0.1``.  A :class:`Scenario` sets the payload size, the latency and
+the share of ``5xx`` and ``429`` answers, so changes to the library can be
+measured offline under repeatable load::
+
+    from bcb import sgs
+    from bcb.testing import Scenario, StandInServer, run_load
+
+    with StandInServer(Scenario(rows=5000, latency=0.05)) as server:
+        with server.activate():
+            report = run_load(lambda: sgs.get(433, last=100), concurrency=16)
+    print(report)
+
+Requests reach the server through the ``upstream`` setting of
+:func:`bcb.http.configure`, so every other layer (caches, rate limits,
+retries, metrics) behaves as it does against the real hosts.  Run
+``python -m bcb.testing --help`` for a sweep over concurrency levels from
+the command line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+from urllib.parse import parse_qs, unquote, urlsplit
+
+if TYPE_CHECKING:
+    from bcb.client import Client
+
+_SGS_PATH = re.compile(r"^/dados/serie/bcdata\.sgs\.(\d+)/dados(?:/ultimos/(\d+))?$")
+_PTAX_PATH = "/ptax_internet/consultaBoletim.do"
+_CURRENCY_LIST_PATH = re.compile(r"^/Download/fechamento/M\d{8}\.csv$")
+_ODATA_PATH = re.compile(r"^/olinda/servico/([^/]+)/versao/v1/odata/(.*)$")
+
+_SGS_WINDOW_ERROR = json.dumps(
+    {
+        "erro": {
+            "detail": "O sistema aceita uma janela de consulta de, no máximo, "
+            "10 anos em séries de periodicidade diária"
+        }
+    }
+).encode()
+
+_CURRENCY_LIST_HEADER = "Codigo;Nome;Simbolo;CodPais;NomePais;Tipo;DataExclusao\n"
+
+_ODATA_PROPERTIES = (
+    ("Indicador", "Edm.String"),
+    ("Data", "Edm.Date"),
+    ("Valor", "Edm.Decimal"),
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Behaviour of a :class:`StandInServer`.
+
+    Attributes
+    ----------
+    rows : int
+        Observations in an SGS series without dates, and records in an
+        OData query without ``$top``.  SGS queries with ``dataInicial``
+        get one observation per weekday of the period instead.
+    latency : float
+        Seconds each request waits before it is answered.
+    jitter : float
+        Extra random wait, uniform between ``0`` and ``jitter`` seconds.
+    error_rate : float
+        Share of requests answered with ``503 Service Unavailable``.
+    throttle_rate : float
+        Share of requests answered with ``429 Too Many Requests``.
+    retry_after : float
+        ``Retry-After`` seconds sent with the ``429`` answers.
+    currencies : Mapping[str, int]
+        Symbols served by the PTAX endpoints and their currency ids.
+    entity_sets : tuple[str, ...]
+        Entity sets listed by every OData service.
+    max_window_years : int, optional
+        SGS date ranges longer than this are refused with ``406``, as the
+        BCB does for daily series.
+    seed : int, optional
+        Seed of the random draws, for repeatable runs.
+    """
+
+    rows: int = 1000
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    currencies: Mapping[str, int] = field(
+        default_factory=lambda: {"USD": 61, "EUR": 978}
+    )
+    entity_sets: tuple[str, ...] = ("ExpectativasMercadoAnuais",)
+    max_window_years: Optional[int] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.rows < 0:
+            raise ValueError(f"rows must be >= 0, got {self.rows}")
+        if self.latency < 0 or self.jitter < 0 or self.retry_after < 0:
+            raise ValueError("latency, jitter and retry_after must be >= 0")
+        for name in ("error_rate", "throttle_rate"):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if self.error_rate + self.throttle_rate > 1:
+            raise ValueError("error_rate + throttle_rate must not exceed 1")
+
+
+def _weekdays(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def _last_weekdays(count: int, end: date) -> list[date]:
+    days: list[date] = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def _add_years(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+def _parse_date(value: str, fmt: str = "%d/%m/%Y") -> date:
+    return datetime.strptime(value, fmt).date()
+
+
+def sgs_payload(code: int, days: Sequence[date]) -> bytes:
+    """Return the JSON answer of an SGS series with one value per day."""
+    base = code % 1000
+    items = (
+        f'{{"data":"{day:%d/%m/%Y}","valor":"{base + n * 0.01:.2f}"}}'
+        for n, day in enumerate(days)
+    )
+    return ("[" + ",".join(items) + "]").encode()
+
+
+def _currency_name(symbol: str) -> str:
+    return f"MOEDA {symbol}"
+
+
+def _currency_list_csv(currencies: Mapping[str, int]) -> bytes:
+    rows = (
+        f"{cid};{_currency_name(symbol)};{symbol};{100 + n};PAIS {symbol};A;\n"
+        for n, (symbol, cid) in enumerate(currencies.items())
+    )
+    return (_CURRENCY_LIST_HEADER + "".join(rows)).encode()
+
+
+def _currency_id_html(currencies: Mapping[str, int]) -> bytes:
+    options = "".join(
+        f'<option value="{cid}">{_currency_name(symbol)}</option>'
+        for symbol, cid in currencies.items()
+    )
+    return (
+        '<html><body><form><select name="ChkMoeda">'
+        f"{options}</select></form></body></html>"
+    ).encode()
+
+
+def _currency_rates_csv(symbol: str, cid: int, days: Sequence[date]) -> bytes:
+    def decimal(value: float) -> str:
+        return f"{value:.4f}".replace(".", ",")
+
+    rows = (
+        f"{day:%d%m%Y};{cid};A;{symbol};"
+        f"{decimal(5 + n * 0.001)};{decimal(5.0006 + n * 0.001)};1,0000;1,0000\n"
+        for n, day in enumerate(days)
+    )
+    return "".join(rows).encode()
+
+
+def _odata_metadata(service: str, entity_sets: Sequence[str]) -> bytes:
+    properties = "".join(
+        f'<Property Name="{name}" Type="{edm}"/>' for name, edm in _ODATA_PROPERTIES
+    )
+    sets = "".join(
+        f'<EntitySet Name="{name}" EntityType="{service}.Registro"/>'
+        for name in entity_sets
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<edmx:Edmx Version="4.0" xmlns:edmx="http://docs.oasis-open.org/odata/ns/edmx">'
+        "<edmx:DataServices>"
+        f'<Schema Namespace="{service}" xmlns="http://docs.oasis-open.org/odata/ns/edm">'
+        f'<EntityType Name="Registro">{properties}</EntityType>'
+        f'<EntityContainer Name="{service}">{sets}</EntityContainer>'
+        "</Schema></edmx:DataServices></edmx:Edmx>"
+    ).encode()
+
+
+def _odata_rows(count: int) -> bytes:
+    start = date(2000, 1, 3)
+    records = [
+        {
+            "Indicador": "IPCA",
+            "Data": (start + timedelta(days=n)).isoformat(),
+            "Valor": round(4 + n * 0.001, 4),
+        }
+        for n in range(count)
+    ]
+    return json.dumps({"value": records}).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        stand_in = self.server.stand_in
+        scenario = stand_in.scenario
+        stand_in._enter()
+        try:
+            draw, wait = stand_in._draw()
+            if wait:
+                time.sleep(wait)
+            if draw < scenario.throttle_rate:
+                self._send(
+                    429,
+                    b'{"erro": "Too Many Requests"}',
+                    "application/json",
+                    {"Retry-After": f"{scenario.retry_after:g}"},
+                )
+            elif draw < scenario.throttle_rate + scenario.error_rate:
+                self._send(503, b"Service Unavailable", "text/plain")
+            else:
+                self._route(scenario)
+        finally:
+            stand_in._leave()
+
+    def _route(self, scenario: Scenario) -> None:
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if match := _SGS_PATH.match(path):
+            code, last = int(match[1]), match[2]
+            if last is not None:
+                days = _last_weekdays(int(last), date.today())
+            elif "dataInicial" in query:
+                start = _parse_date(query["dataInicial"])
+                end = _parse_date(query.get("dataFinal", f"{date.today():%d/%m/%Y}"))
+                limit = scenario.max_window_years
+                if limit is not None and end >= _add_years(start, limit):
+                    self._send(406, _SGS_WINDOW_ERROR)
+                    return
+                days = list(_weekdays(start, end))
+            else:
+                days = _last_weekdays(scenario.rows, date.today())
+            self._send(200, sgs_payload(code, days), "application/json")
+        elif path == _PTAX_PATH:
+            self._ptax(scenario, query)
+        elif _CURRENCY_LIST_PATH.match(path):
+            body = _currency_list_csv(scenario.currencies)
+            self._send(200, body, "text/csv")
+        elif match := _ODATA_PATH.match(path):
+            self._odata(scenario, match[1], match[2], query)
+        else:
+            self._send(404, b"Not Found", "text/plain")
+
+    def _ptax(self, scenario: Scenario, query: dict[str, str]) -> None:
+        method = query.get("method")
+        if method == "exibeFormularioConsultaBoletim":
+            self._send(200, _currency_id_html(scenario.currencies), "text/html")
+            return
+        symbols = {cid: symbol for symbol, cid in scenario.currencies.items()}
+        try:
+            cid = int(query["ChkMoeda"])
+            symbol = symbols[cid]
+            start = _parse_date(query["DATAINI"])
+            end = _parse_date(query["DATAFIM"])
+        except (KeyError, ValueError):
+            self._send(404, b"Not Found", "text/plain")
+            return
+        days = list(_weekdays(start, end))
+        self._send(200, _currency_rates_csv(symbol, cid, days), "text/csv")
+
+    def _odata(
+        self, scenario: Scenario, service: str, resource: str, query: dict[str, str]
+    ) -> None:
+        host = self.headers.get("Host", "olinda.bcb.gov.br")
+        base = f"https://{host}{urlsplit(self.path).path}"
+        if resource == "":
+            body = json.dumps(
+                {
+                    "@odata.context": base + "$metadata",
+                    "value": [
+                        {"name": name, "kind": "EntitySet", "url": name}
+                        for name in scenario.entity_sets
+                    ],
+                }
+            ).encode()
+            self._send(200, body, "application/json")
+        elif resource == "$metadata":
+            body = _odata_metadata(service, scenario.entity_sets)
+            self._send(200, body, "application/xml")
+        elif resource in scenario.entity_sets:
+            count = int(query.get("$top", scenario.rows))
+            skip = int(query.get("$skip", 0))
+            self._send(200, _odata_rows(max(0, min(count, scenario.rows - skip))))
+        else:
+            self._send(404, b"Not Found", "text/plain")
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str = "application/json",
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stand_in._count(status)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once
+    request_queue_size = 1024
+
+    def __init__(self, address: tuple[str, int], stand_in: StandInServer) -> None:
+        self.stand_in = stand_in
+        super().__init__(address, _Handler)
+
+
+class StandInServer:
+    """HTTP server imitating the BCB APIs on the local machine.
+
+    The server starts with the ``with`` block (or :meth:`start`) and serves
+    every request in its own thread.  :meth:`activate` points the shared
+    clients at it; :meth:`client` returns a :class:`bcb.Client` session
+    bound to it instead.
+
+    Parameters
+    ----------
+    scenario : Scenario, optional
+        Payload size, latency and failure rates.  It can be swapped while
+        the server runs by assigning :attr:`scenario`.
+    host : str
+        Interface to listen on.
+    port : int
+        Port to listen on; ``0`` picks a free one.
+    """
+
+    def __init__(
+        self,
+        scenario: Optional[Scenario] = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.scenario = scenario or Scenario()
+        self._address = (host, port)
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._random = random.Random(self.scenario.seed)
+        self._statuses: Counter[int] = Counter()
+        self._active = 0
+        self._peak = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server, e.g. ``http://127.0.0.1:50123``."""
+        if self._server is None:
+            raise RuntimeError("the stand-in server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> StandInServer:
+        """Start serving in a daemon thread."""
+        if self._server is None:
+            self._server = _Server(self._address, self)
+            self._thread = threading.Thread(
+                target=self._server.serve_forever,
+                name="bcb-stand-in",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        server, thread = self._server, self._thread
+        self._server = self._thread = None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> StandInServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[StandInServer]:
+        """Send the requests of the shared clients to this server.
+
+        The previous ``upstream`` setting is restored on exit.
+        """
+        from bcb import http
+
+        previous = http.get_config().upstream
+        http.configure(upstream=self.url)
+        try:
+            yield self
+        finally:
+            http.configure(upstream=previous)
+
+    def client(self, **kwargs: Any) -> Client:
+        """Return a :class:`bcb.Client` whose requests go to this server.
+
+        Keyword arguments are passed on to :class:`bcb.Client`.
+        """
+        from bcb import http
+        from bcb.client import Client
+
+        config = kwargs.pop("config", None) or http.HTTPConfig.from_env()
+        return Client(config=replace(config, upstream=self.url), **kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        """Requests answered per status, and the peak of concurrent ones."""
+        with self._lock:
+            return {
+                "requests": sum(self._statuses.values()),
+                "statuses": dict(self._statuses),
+                "peak_concurrency": self._peak,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._statuses.clear()
+            self._peak = self._active
+
+    def _draw(self) -> tuple[float, float]:
+        scenario = self.scenario
+        with self._lock:
+            draw = self._random.random()
+            wait = scenario.latency + scenario.jitter * self._random.random()
+        return draw, wait
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._active += 1
+            self._peak = max(self._peak, self._active)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    def _count(self, status: int) -> None:
+        with self._lock:
+            self._statuses[status] += 1
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """Throughput and latency of one :func:`run_load` run.
+
+    Attributes
+    ----------
+    concurrency : int
+        Calls kept in flight at once.
+    calls : int
+        Calls made, including the failed ones.
+    elapsed : float
+        Wall-clock seconds of the whole run.
+    latencies : tuple[float, ...]
+        Seconds taken by each successful call, in completion order.
+    errors : Mapping[str, int]
+        Failed calls per exception type.
+    """
+
+    concurrency: int
+    calls: int
+    elapsed: float
+    latencies: tuple[float, ...] = field(repr=False)
+    errors: Mapping[str, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Calls completed per second."""
+        return self.calls / self.elapsed if self.elapsed > 0 else math.inf
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def percentile(self, q: float) -> float:
+        """Latency below which ``q`` percent of the successful calls fall."""
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        rank = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "calls": self.calls,
+            "errors": self.error_count,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99,
+        }
+
+    def __str__(self) -> str:
+        return format_reports([self])
+
+
+def format_reports(reports: Sequence[LoadReport]) -> str:
+    """Format reports as a table, latencies in milliseconds."""
+    lines = [
+        f"{'concurrency':>11} {'calls':>6} {'errors':>6} {'calls/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for r in reports:
+        lines.append(
+            f"{r.concurrency:>11} {r.calls:>6} {r.error_count:>6} "
+            f"{r.throughput:>9.1f} {r.p50 * 1000:>8.1f} {r.p95 * 1000:>8.1f} "
+            f"{r.p99 * 1000:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+LoadTarget = Union[Callable[[], Any], Callable[[], Awaitable[Any]]]
+
+
+def run_load(fn: LoadTarget, *, calls: int = 100, concurrency: int = 8) -> LoadReport:
+    """Call ``fn`` ``calls`` times, keeping ``concurrency`` calls in flight.
+
+    Plain callables run in a pool of ``concurrency`` threads; coroutine
+    functions run as tasks of the background loop of :mod:`bcb.runner`.
+    Exceptions are counted per type and do not stop the run.
+
+    Parameters
+    ----------
+    fn : callable
+        Called without arguments, e.g. ``lambda: sgs.get(433, last=100)``
+        or ``functools.partial(sgs.async_get, 433, last=100)``.
+    calls : int
+        Total number of calls.
+    concurrency : int
+        Calls kept in flight at once.
+
+    Returns
+    -------
+    LoadReport
+    """
+    if calls < 1 or concurrency < 1:
+        raise ValueError("calls and concurrency must be >= 1")
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    lock = threading.Lock()
+
+    def record(started: float, error: Optional[BaseException]) -> None:
+        with lock:
+            if error is None:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[type(error).__name__] += 1
+
+    started = time.perf_counter()
+    if inspect.iscoroutinefunction(fn):
+        from bcb import runner
+
+        runner.run(_run_async(fn, calls, concurrency, record))
+    else:
+        _run_threads(fn, calls, concurrency, record)
+    elapsed = time.perf_counter() - started
+    return LoadReport(
+        concurrency=concurrency,
+        calls=calls,
+        elapsed=elapsed,
+        latencies=tuple(latencies),
+        errors=dict(errors),
+    )
+
+
+def _run_threads(
+    fn: LoadTarget,
+    calls: int,
+    concurrency: int,
+    record: Callable[[float, Optional[BaseException]], None],
+) -> None:
+    remaining = iter(range(calls))
+    take = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with take:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                fn()
+            except Exception as ex:
+                record(started, ex)
+            else:
+                record(started, None)
+
+    threads = [
+        threading.Thread(target=worker, name=f"bcb-load-{n}")
+        for n in range(min(concurrency, calls))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+async def _run_async(
+    fn: LoadTarget,
+    calls: int,
+    concurrency: int,
+    record: Callable[[float, Optional[BaseException]], None],
+) -> None:
+    remaining = iter(range(calls))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await fn()
+            except Exception as ex:
+                record(started, ex)
+            else:
+                record(started, None)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, calls))))
+
+
+def sweep(
+    fn: LoadTarget, levels: Sequence[int] = (1, 4, 16, 64), *, calls: int = 100
+) -> list[LoadReport]:
+    """Run :func:`run_load` once per concurrency level."""
+    return [run_load(fn, calls=calls, concurrency=level) for level in levels]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Sweep ``sgs.get`` against a stand-in server and print the reports."""
+    parser = argparse.ArgumentParser(
+        prog="python -m bcb.testing",
+        description="Load-test sgs.get against a local stand-in of the BCB APIs.",
+    )
+    parser.add_argument("--codes", type=int, nargs="+", default=[433])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    args = parser.parse_args(argv)
+
+    from bcb import sgs
+
+    scenario = Scenario(
+        rows=args.rows,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=0,
+    )
+    codes = args.codes if len(args.codes) > 1 else args.codes[0]
+    fetch = sgs.async_get if args.mode == "async" else sgs.get
+    target = functools.partial(fetch, codes)
+
+    with StandInServer(scenario) as server, server.activate():
+        print(format_reports(sweep(target, args.concurrency, calls=args.calls)))
+        print(server.stats())
+
+
+if __name__ == "__main__":
+    main()
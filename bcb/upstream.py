@@ -0,0 +1,63 @@
+"""Send requests for the BCB hosts to another server.
+
+With ``http.configure(upstream="http://127.0.0.1:8080")`` every request
+keeps its path and query but goes to the given server, e.g. a local
+stand-in started by :mod:`bcb.testing` or an internal mirror.  The
+rewrite happens below every other layer, so caches, rate limits and
+metrics still see the original ``*.bcb.gov.br`` URLs, and the ``Host``
+header keeps naming the original host.
+"""
+
+from __future__ import annotations
+
+import httpx
+
+
+def _redirect(request: httpx.Request, upstream: httpx.URL) -> httpx.Request:
+    url = request.url.copy_with(
+        scheme=upstream.scheme,
+        host=upstream.host,
+        port=upstream.port,
+        raw_path=upstream.raw_path.rstrip(b"/") + request.url.raw_path,
+    )
+    return httpx.Request(
+        request.method,
+        url,
+        headers=request.headers,
+        stream=request.stream,
+        extensions=request.extensions,
+    )
+
+
+class UpstreamTransport(httpx.BaseTransport):
+    """Transport wrapper that sends every request to ``upstream``."""
+
+    def __init__(self, transport: httpx.BaseTransport, upstream: str) -> None:
+        self._transport = transport
+        self.upstream = httpx.URL(upstream)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(_redirect(request, self.upstream))
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncUpstreamTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`UpstreamTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str) -> None:
+        self._transport = transport
+        self.upstream = httpx.URL(upstream)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(
+            _redirect(request, self.upstream)
+        )
+        response.request = request
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
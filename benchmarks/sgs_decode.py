@@ -0,0 +1,54 @@
+"""Compare the SGS decoder with the ``pd.read_json`` path it replaces.
+
+Run with ``python benchmarks/sgs_decode.py [rows ...]``.  Install
+``orjson`` (``pip install python-bcb[speedups]``) to include the fast JSON
+backend.
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import timeit
+from datetime import date, timedelta
+
+import pandas as pd
+
+from bcb.sgs import SGSCode, _format_df, decoder
+from bcb.testing import sgs_payload
+
+CODE = SGSCode.from_code(12)
+
+
+def read_json_path(content: bytes) -> pd.DataFrame:
+    df = pd.read_json(io.StringIO(content.decode()))
+    return _format_df(df, CODE, None)
+
+
+def decoder_path(content: bytes) -> pd.DataFrame:
+    df = decoder.decode(content, CODE.name)
+    assert df is not None
+    return df
+
+
+def best_of(fn, content: bytes, repeat: int = 5) -> float:
+    number = max(1, 200_000 // max(len(content) // 30, 1))
+    times = timeit.repeat(lambda: fn(content), number=number, repeat=repeat)
+    return min(times) / number
+
+
+def main(sizes: list[int]) -> None:
+    backend = decoder.loads.__module__
+    print(f"JSON backend: {backend}")
+    print(f"{'rows':>9} {'read_json ms':>13} {'decoder ms':>11} {'speed-up':>9}")
+    for rows in sizes:
+        days = [date(1990, 1, 1) + timedelta(days=n) for n in range(rows)]
+        content = sgs_payload(CODE.value, days)
+        pd.testing.assert_frame_equal(read_json_path(content), decoder_path(content))
+        old = best_of(read_json_path, content)
+        new = best_of(decoder_path, content)
+        print(f"{rows:>9} {old * 1000:>13.2f} {new * 1000:>11.2f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 2_500, 10_000, 100_000])
@@ -273,3 +273,27 @@ def clear_odata_cache():
     odata_framework._METADATA_CACHE.clear()
     yield
     odata_framework._METADATA_CACHE.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_retry_budget():
+    """Give every test a fresh shared retry budget."""
+    from bcb.retry import DEFAULT_RETRY_BUDGET
+
+    DEFAULT_RETRY_BUDGET.reset()
+    yield
+    DEFAULT_RETRY_BUDGET.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_adaptive_concurrency():
+    """Give every test fresh adaptive concurrency limits."""
+    from bcb import http
+
+    controller = http.get_adaptive_concurrency()
+    if controller is not None:
+        controller.reset()
+    yield
+    controller = http.get_adaptive_concurrency()
+    if controller is not None:
+        controller.reset()
@@ -0,0 +1,76 @@
+"""Tests for the SGS payload decoder."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bcb import sgs
+from bcb.sgs import SGSCode, _format_df, decoder
+from tests.conftest import SGS_JSON_5, make_sgs_response
+
+
+def reference(payload: str, name: str = "1") -> pd.DataFrame:
+    # The pd.read_json path the decoder replaces
+    df = pd.read_json(io.StringIO(payload))
+    return _format_df(df, SGSCode.from_named(1, name), None)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        SGS_JSON_5,
+        make_sgs_response(num_rows=400, start_date="28/02/1964"),
+        '[{"data":"01/01/2000","valor":"5"},{"data":"03/01/2000","valor":"7"}]',
+        '[{"data":"01/01/2020","valor":"0.5","datafim":"31/01/2020"},'
+        '{"data":"01/02/2020","valor":"0.25","datafim":"29/02/2020"}]',
+    ],
+)
+def test_matches_read_json(payload) -> None:
+    df = decoder.decode(payload.encode(), "1")
+
+    pd.testing.assert_frame_equal(df, reference(payload))
+
+
+def test_decimal_comma() -> None:
+    df = decoder.decode(b'[{"data":"02/01/2024","valor":"1,23"}]', "x")
+
+    assert df["x"].tolist() == [1.23]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"[]",
+        b'{"erro": "x"}',
+        b'[{"data":"02/01/2024","valor":""}]',
+        b'[{"data":"31/02/2024","valor":"1"}]',
+        b'[{"data":"2024-01-02","valor":"1"}]',
+        b'[{"data":"02/01/2024"}]',
+        b"not json",
+    ],
+)
+def test_unusual_payloads_are_left_to_read_json(payload) -> None:
+    assert decoder.decode(payload, "x") is None
+
+
+def test_parse_dates() -> None:
+    dates = decoder.parse_dates(["29/02/2024", "31/12/1899", "01/01/1970"])
+
+    assert dates.tolist() == list(
+        np.array(["2024-02-29", "1899-12-31", "1970-01-01"], dtype="datetime64[D]")
+    )
+
+
+def test_get_falls_back_for_empty_values(httpx_mock) -> None:
+    items = [
+        {"data": "02/01/2024", "valor": "1.5"},
+        {"data": "03/01/2024", "valor": ""},
+    ]
+    httpx_mock.add_response(json=items)
+
+    df = sgs.get(1, last=2)
+
+    assert list(df.index) == [pd.Timestamp(2024, 1, 2), pd.Timestamp(2024, 1, 3)]
+    assert df["1"].tolist() == ["1.5", ""]
@@ -0,0 +1,153 @@
+"""Tests for the incremental SGS sync into a local store."""
+
+import re
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+
+from bcb import runner, sgs
+from bcb.exceptions import DeadlineExceededError, SGSError
+from bcb.sgs import SeriesStore
+from bcb.spool import SpooledBody
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/dados.*")
+
+
+class Backend:
+    """Mock SGS serving one observation per day up to ``today``."""
+
+    def __init__(self, today: date) -> None:
+        self.today = today
+        self.revision = 0.0
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        first = datetime.strptime(request.url.params["dataInicial"], "%d/%m/%Y").date()
+        items = []
+        day = first
+        while day <= self.today:
+            value = day.day + self.revision
+            items.append({"data": f"{day:%d/%m/%Y}", "valor": f"{value}"})
+            day += timedelta(days=1)
+        return httpx.Response(200, json=items)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SeriesStore(tmp_path / "sgs.sqlite")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def backend(httpx_mock):
+    backend = Backend(today=date(2024, 1, 10))
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+    return backend
+
+
+def test_first_sync_downloads_from_start(store, backend) -> None:
+    written = sgs.sync([1, 2], store, start="2024-01-01")
+
+    assert written == {1: 10, 2: 10}
+    assert store.codes() == [1, 2]
+    assert store.last_date(1) == date(2024, 1, 10)
+    assert {r.url.params["dataInicial"] for r in backend.requests} == {"01/01/2024"}
+
+
+def test_resync_downloads_only_new_and_overlapping_dates(store, backend) -> None:
+    sgs.sync(1, store, start="2024-01-01")
+    backend.today = date(2024, 1, 12)
+    backend.revision = 0.5
+
+    written = sgs.sync(1, store, overlap=2)
+
+    assert backend.requests[-1].url.params["dataInicial"] == "09/01/2024"
+    assert written == {1: 2}
+    df = store.get({"x": 1})
+    assert len(df) == 12
+    assert df.loc["2024-01-08", "x"] == 8
+    assert df.loc["2024-01-09", "x"] == 9.5
+
+
+def test_resume_date(store) -> None:
+    store.write(7, [{"data": f"0{d}/01/2024", "valor": "1"} for d in range(1, 6)])
+
+    assert store.resume_date(7) == date(2024, 1, 5)
+    assert store.resume_date(7, overlap=3) == date(2024, 1, 3)
+    assert store.resume_date(7, overlap=50) == date(2024, 1, 1)
+    assert store.resume_date(8) is None
+
+
+def test_reads_are_shaped_like_get(store, backend) -> None:
+    sgs.sync({"a": 1, "b": 2}, store, start="2024-01-01")
+
+    online = sgs.get({"a": 1, "b": 2}, start="2024-01-01", end="2024-01-10")
+    local = store.get({"a": 1, "b": 2})
+
+    assert local.equals(online)
+    assert len(store.get(1, start="2024-01-03", end="2024-01-04")) == 2
+    assert list(store.get([1, 2], tidy=True).columns) == ["Date", "series", "value"]
+    assert store.get(99).empty
+
+
+def test_failed_code_does_not_lose_the_others(store, httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.1/.*"),
+        json=[{"data": "02/01/2024", "valor": "1"}],
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.2/.*"),
+        status_code=404,
+        json={"erro": {"detail": "Série não encontrada"}},
+    )
+
+    with pytest.raises(SGSError, match=r"\[2\]"):
+        sgs.sync([1, 2], store, start="2024-01-01")
+
+    assert store.codes() == [1]
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [(["1", "2"], "int64"), (["1", "2.5"], "float64"), (["1,5", "2"], "float64")],
+)
+def test_reads_keep_the_dtype_of_get(store, httpx_mock, values, dtype) -> None:
+    items = [{"data": f"0{i + 1}/01/2024", "valor": v} for i, v in enumerate(values)]
+    httpx_mock.add_response(url=SGS_URL, json=items, is_reusable=True)
+
+    sgs.sync(1, store, start="2024-01-01")
+    online = sgs.get({"x": 1}, start="2024-01-01")
+    local = store.get({"x": 1})
+
+    assert online["x"].dtype == dtype
+    assert local.equals(online)
+
+
+def test_deadline_releases_bodies_already_fetched(store, httpx_mock, monkeypatch):
+    def respond(request: httpx.Request) -> httpx.Response:
+        if "sgs.2/" in str(request.url):
+            time.sleep(0.3)
+        return httpx.Response(200, json=[{"data": "02/01/2024", "valor": "1"}])
+
+    httpx_mock.add_callback(respond, url=SGS_URL, is_reusable=True)
+    closed: list[SpooledBody] = []
+    original = SpooledBody.close
+
+    def close(self: SpooledBody) -> None:
+        closed.append(self)
+        original(self)
+
+    monkeypatch.setattr(SpooledBody, "close", close)
+    runner.set_enabled(False)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            sgs.sync([1, 2, 3], store, start="2024-01-01", deadline=0.1)
+    finally:
+        runner.set_enabled()
+
+    assert len(closed) == 2
+    assert store.codes() == []
@@ -0,0 +1,218 @@
+"""Tests for splitting long SGS date ranges into windows."""
+
+import json
+import re
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+
+import bcb
+from bcb import http as http_module
+from bcb import sgs
+from bcb.exceptions import SGSError
+from bcb.testing import Scenario, StandInServer
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/dados.*")
+
+
+@pytest.fixture(autouse=True)
+def forget_frequencies():
+    sgs._frequencies().clear()
+    yield
+    sgs._frequencies().clear()
+
+
+def parse(value: str) -> date:
+    return datetime.strptime(value, "%d/%m/%Y").date()
+
+
+class DailyBackend:
+    """Mock SGS that refuses ranges over 10 years and repeats the first date
+    of the next window, like an inclusive bound would.  The series starts
+    on ``since``; requests without dates ask for all of it."""
+
+    def __init__(self, step: int = 1, since: date = date(1900, 1, 1)) -> None:
+        self.step = step
+        self.since = since
+        self.ranges: list[tuple[date | None, date | None]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if "dataInicial" not in params:
+            self.ranges.append((None, None))
+            if self.step == 1:
+                return self.refuse()
+            first, final = self.since, date(2024, 12, 31)
+        else:
+            first = parse(params["dataInicial"])
+            final = parse(params["dataFinal"])
+            self.ranges.append((first, final))
+            if self.step == 1 and final >= first.replace(year=first.year + 10):
+                return self.refuse()
+        days = []
+        day = max(first, self.since)
+        while day <= final + timedelta(days=1):
+            days.append({"data": f"{day:%d/%m/%Y}", "valor": f"{day.year}"})
+            day += timedelta(days=self.step)
+        if not days:
+            return httpx.Response(404, json={"erro": {"detail": "Value(s) not found"}})
+        return httpx.Response(200, json=days)
+
+    @staticmethod
+    def refuse() -> httpx.Response:
+        return httpx.Response(406, json={"erro": {"detail": "janela de 10 anos"}})
+
+
+def test_windows_split_long_ranges() -> None:
+    windows = sgs._windows(12, "1995-01-01", "2024-12-31", 0)
+
+    assert windows == [
+        (date(1995, 1, 1), date(2004, 12, 31)),
+        (date(2005, 1, 1), date(2014, 12, 31)),
+        (date(2015, 1, 1), date(2024, 12, 31)),
+    ]
+    assert sgs._windows(12, "2015-01-01", "2024-12-31", 0) == [
+        (date(2015, 1, 1), date(2024, 12, 31))
+    ]
+    assert sgs._windows(12, "1995-01-01", None, 5) == [("1995-01-01", None)]
+    assert sgs._windows(12, None, None, 0) == [(None, None)]
+
+
+def test_long_daily_range_is_stitched(httpx_mock) -> None:
+    backend = DailyBackend()
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    df = sgs.get({"CDI": 12}, start="1995-01-01", end="2024-12-31")
+
+    assert len(backend.ranges) == 3
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert df.index[0] == datetime(1995, 1, 1)
+    assert df.index[-1] == datetime(2025, 1, 1)
+    assert len(df) == (date(2025, 1, 1) - date(1995, 1, 1)).days + 1
+
+
+@pytest.mark.anyio
+async def test_async_get_fetches_windows_concurrently(httpx_mock) -> None:
+    backend = DailyBackend()
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    text = await sgs.async_get(11, start="2000-01-01", end="2024-12-31", output="text")
+
+    observations = json.loads(text)
+    assert len(backend.ranges) == 3
+    assert observations[0]["data"] == "01/01/2000"
+    assert len({item["data"] for item in observations}) == len(observations)
+
+
+def test_full_history_of_daily_series_is_walked_back(httpx_mock) -> None:
+    backend = DailyBackend(since=date(1990, 3, 1))
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    df = sgs.get({"CDI": 12})
+
+    windows = list(sgs._windows_back(None))
+    # Refused, then back to the first window without data
+    assert backend.ranges[0] == (None, None)
+    assert backend.ranges[1:] == windows[: len(backend.ranges) - 1]
+    assert backend.ranges[-1][1] < date(1990, 3, 1)
+    assert backend.ranges[-2][0] <= date(1990, 3, 1)
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert df.index[0] == datetime(1990, 3, 1)
+    assert df.index[-1] >= datetime.combine(windows[0][1], datetime.min.time())
+
+
+@pytest.mark.anyio
+async def test_async_full_history_of_daily_series_is_walked_back(httpx_mock) -> None:
+    backend = DailyBackend(since=date(2010, 1, 1))
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    text = await sgs.async_get_json(12)
+
+    observations = json.loads(text)
+    assert backend.ranges[-1][1] < date(2010, 1, 1)
+    assert observations[0]["data"] == "01/01/2010"
+    assert len({item["data"] for item in observations}) == len(observations)
+
+
+def test_full_history_of_other_series_is_one_request(httpx_mock) -> None:
+    backend = DailyBackend(step=30, since=date(1980, 1, 1))
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    df = sgs.get(433)
+
+    assert backend.ranges == [(None, None)]
+    assert df.index[0] == datetime(1980, 1, 1)
+
+
+def test_windows_without_data_are_skipped(httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=re.compile(r".*dataInicial=01%2F01%2F1990.*"),
+        status_code=404,
+        json={"erro": {"detail": "Value(s) not found"}},
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*dataInicial=01%2F01%2F2000.*"),
+        json=[{"data": "03/01/2000", "valor": "1"}],
+    )
+
+    df = sgs.get(12, start="1990-01-01", end="2009-12-31")
+
+    assert list(df["12"]) == [1]
+
+
+def test_all_windows_without_data(httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=SGS_URL,
+        status_code=404,
+        json={"erro": {"detail": "Value(s) not found"}},
+        is_reusable=True,
+    )
+
+    with pytest.raises(SGSError, match="no data"):
+        sgs.get_json(12, start="1990-01-01", end="2009-12-31")
+
+
+def test_monthly_series_uses_one_request_once_known(httpx_mock) -> None:
+    backend = DailyBackend(step=30)
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+
+    first = sgs.get(433, start="1995-01-01", end="2024-12-31")
+    second = sgs.get(433, start="1995-01-01", end="2024-12-31")
+
+    assert len(backend.ranges) == 4
+    assert backend.ranges[-1] == (date(1995, 1, 1), date(2024, 12, 31))
+    assert sgs._frequencies().get("433") is False
+    assert len(second) >= len(first)
+
+
+def test_frequencies_are_kept_per_session(httpx_mock) -> None:
+    backend = DailyBackend(step=30)
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+    session = bcb.Client()
+
+    with session.activate():
+        sgs.get(433, start="1995-01-01", end="2024-12-31")
+        sgs.get(433, start="1995-01-01", end="2024-12-31")
+        assert sgs._frequencies().get("433") is False
+    assert len(backend.ranges) == 4
+    assert sgs._frequencies().get("433") is None
+
+    session.clear_caches()
+    with session.activate():
+        sgs.get(433, start="1995-01-01", end="2024-12-31")
+    assert len(backend.ranges) == 7
+    session.close()
+
+
+def test_stand_in_server_window_limit() -> None:
+    with StandInServer(Scenario(max_window_years=10)) as server, server.activate():
+        df = sgs.get(12, start="1995-01-01", end="2024-12-31")
+        refused = http_module.get_client().get(
+            "https://api.bcb.gov.br/dados/serie/bcdata.sgs.12/dados",
+            params={"dataInicial": "01/01/1995", "dataFinal": "31/12/2024"},
+        )
+
+    assert df.index[0] == datetime(1995, 1, 2)
+    assert server.stats()["statuses"] == {200: 3, 406: 1}
+    assert refused.status_code == 406
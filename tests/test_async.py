@@ -3,6 +3,7 @@
 Tests for async_get() functions in sgs, currency, and odata modules.
 """
 
+import asyncio
 import re
 from datetime import datetime
 
@@ -16,6 +17,7 @@ from bcb.exceptions import (
     BCBRateLimitError,
     CurrencyNotFoundError,
     ODataError,
+    SGSError,
 )
 from tests.conftest import (
     CURRENCY_ID_LIST_HTML,
@@ -153,15 +155,19 @@ async def test_async_get_text_output(httpx_mock):
     assert "data" in result
 
 
-async def test_async_get_json_rate_limit_raises(httpx_mock):
+async def test_async_get_json_rate_limit_raises(httpx_mock, monkeypatch):
+    _disable_async_sgs_retry_sleep(monkeypatch)
     httpx_mock.add_response(
         url=SGS_CODE_URL,
         status_code=429,
+        is_reusable=True,
     )
 
     with pytest.raises(BCBRateLimitError):
         await sgs.async_get_json(1)
 
+    assert len(httpx_mock.get_requests()) == 4
+
 
 async def test_async_get_json_retries_timeout_then_succeeds(httpx_mock, monkeypatch):
     _disable_async_sgs_retry_sleep(monkeypatch)
@@ -190,6 +196,87 @@ async def test_async_get_invalid_sgs_output_raises():
         await sgs.async_get(1, output="xml")  # type: ignore[arg-type]
 
 
+def add_sgs_not_found_mock(httpx_mock, code):
+    httpx_mock.add_response(
+        url=re.compile(rf".*bcdata\.sgs\.{code}/.*"),
+        status_code=404,
+        json={"erro": {"detail": "Série não encontrada"}},
+    )
+
+
+async def test_async_get_max_concurrency_bounds_codes_in_flight(httpx_mock):
+    active = peak = 0
+
+    async def slow(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return httpx.Response(200, text=SGS_JSON_5)
+
+    httpx_mock.add_callback(slow, url=SGS_CODE_URL, is_reusable=True)
+
+    df = await sgs.async_get([4, 3, 2, 1], max_concurrency=2)
+
+    assert list(df.columns) == ["4", "3", "2", "1"]
+    assert peak == 2
+
+
+async def test_async_get_error_cancels_other_codes(httpx_mock):
+    cancelled = asyncio.Event()
+
+    async def hang(request):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    httpx_mock.add_callback(hang, url=re.compile(r".*bcdata\.sgs\.1/.*"))
+    add_sgs_not_found_mock(httpx_mock, 2)
+
+    with pytest.raises(SGSError):
+        await asyncio.wait_for(sgs.async_get([1, 2]), 5)
+
+    assert cancelled.is_set()
+
+
+async def test_async_get_errors_skip(httpx_mock):
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.[13]/.*"), text=SGS_JSON_5, is_reusable=True
+    )
+    add_sgs_not_found_mock(httpx_mock, 2)
+
+    df = await sgs.async_get({"a": 1, "b": 2, "c": 3}, errors="skip")
+
+    assert list(df.columns) == ["a", "c"]
+
+
+async def test_async_get_errors_collect(httpx_mock):
+    httpx_mock.add_response(url=re.compile(r".*bcdata\.sgs\.1/.*"), text=SGS_JSON_5)
+    add_sgs_not_found_mock(httpx_mock, 2)
+
+    texts, errors = await sgs.async_get([1, 2], output="text", errors="collect")
+
+    assert texts == {1: SGS_JSON_5}
+    assert list(errors) == [2]
+    assert isinstance(errors[2], SGSError)
+
+
+async def test_async_get_errors_collect_raises_when_all_codes_fail(httpx_mock):
+    add_sgs_not_found_mock(httpx_mock, 1)
+    add_sgs_not_found_mock(httpx_mock, 2)
+
+    with pytest.raises(SGSError):
+        await sgs.async_get([1, 2], errors="collect")
+
+
+async def test_async_get_invalid_errors_raises():
+    with pytest.raises(ValueError, match="errors"):
+        await sgs.async_get(1, errors="ignore")  # type: ignore[call-overload]
+
+
 # ---------------------------------------------------------------------------
 # Currency async tests
 # ---------------------------------------------------------------------------
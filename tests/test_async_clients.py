@@ -0,0 +1,131 @@
+"""Tests for the per-event-loop async client registry."""
+
+import asyncio
+import threading
+
+import httpx
+
+from bcb import http as http_module
+from bcb import runner
+
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+
+
+async def current_client() -> httpx.AsyncClient:
+    return http_module.get_async_client()
+
+
+def test_same_loop_reuses_its_client() -> None:
+    async def main() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        return http_module.get_async_client(), http_module.get_async_client()
+
+    first, second = asyncio.run(main())
+
+    assert first is second
+
+
+def test_each_loop_gets_its_own_client() -> None:
+    first = asyncio.run(current_client())
+    second = asyncio.run(current_client())
+
+    assert first is not second
+    assert first is not http_module.get_async_client()
+
+
+def test_client_is_closed_when_asyncio_run_returns() -> None:
+    client = asyncio.run(current_client())
+
+    assert client.is_closed
+
+
+def test_closed_loops_are_forgotten() -> None:
+    asyncio.run(current_client())
+    asyncio.run(current_client())
+
+    assert not any(loop.is_closed() for loop in http_module._LOOP_CLIENTS)
+
+
+def test_loops_closed_without_shutdown_are_forgotten() -> None:
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(current_client())
+    loop.close()
+
+    asyncio.run(current_client())
+
+    assert loop not in http_module._LOOP_CLIENTS
+
+
+def test_loop_per_thread_workers_keep_separate_pools(httpx_mock) -> None:
+    httpx_mock.add_response(url=URL, is_reusable=True)
+    clients: list[httpx.AsyncClient] = []
+    errors: list[BaseException] = []
+
+    async def work() -> None:
+        client = http_module.get_async_client()
+        for _ in range(3):
+            await http_module.get_async_client().get(URL)
+        clients.append(client)
+
+    def worker() -> None:
+        try:
+            asyncio.run(work())
+        except BaseException as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len({id(client) for client in clients}) == 4
+    assert len(httpx_mock.get_requests()) == 12
+
+
+def test_closed_client_is_replaced_within_the_loop() -> None:
+    async def main() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        first = http_module.get_async_client()
+        await http_module.aclose_async_client()
+        return first, http_module.get_async_client()
+
+    first, second = asyncio.run(main())
+
+    assert first.is_closed
+    assert second is not first
+
+
+def test_rebuilding_clients_replaces_loop_clients() -> None:
+    async def main() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        first = http_module.get_async_client()
+        http_module._rebuild_clients()
+        await asyncio.sleep(0)
+        return first, http_module.get_async_client()
+
+    first, second = asyncio.run(main())
+
+    assert first is not second
+    assert first.is_closed
+
+
+def test_reconfiguring_closes_clients_of_running_loops() -> None:
+    # The runner loop keeps running, so nothing else would close them
+    clients = []
+    for _ in range(3):
+        clients.append(runner.run(current_client()))
+        http_module.set_rate_limit(None)
+    runner.run(asyncio.sleep(0.01))
+
+    assert len({id(client) for client in clients}) == 3
+    assert all(client.is_closed for client in clients)
+
+
+def test_reconfiguring_closes_clients_of_idle_loops() -> None:
+    loop = asyncio.new_event_loop()
+    try:
+        client = loop.run_until_complete(current_client())
+        http_module.set_rate_limit(None)
+
+        assert client.is_closed
+    finally:
+        loop.close()
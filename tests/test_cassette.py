@@ -0,0 +1,133 @@
+"""Tests for the record/replay cassette transport."""
+
+import asyncio
+import re
+import time
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.cassette import Cassette, CassetteTransport, Recording
+from bcb.exceptions import CassetteMissError
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/dados.*")
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?formato=json&a=1"
+SERIES = [
+    {"data": "01/01/2024", "valor": "1.5"},
+    {"data": "02/01/2024", "valor": "1.6"},
+]
+
+
+@pytest.fixture
+def cassette_dir(tmp_path):
+    yield tmp_path / "cassette"
+    http_module.set_cassette(None)
+
+
+class FixedTransport(httpx.BaseTransport):
+    def __init__(self, response: httpx.Response) -> None:
+        self.response = response
+        self.requests: list[httpx.Request] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.response
+
+
+def recording(content: bytes, elapsed: float = 0.0, transfer: float = 0.0):
+    return Recording("GET", URL, 200, [], content, elapsed, transfer)
+
+
+def test_recorded_series_is_replayed_offline(httpx_mock, cassette_dir) -> None:
+    httpx_mock.add_response(url=SGS_URL, json=SERIES)
+
+    http_module.set_cassette(cassette_dir, mode="record")
+    recorded = sgs.get(1, start="2024-01-01", end="2024-01-02")
+    http_module.set_cassette(cassette_dir, mode="replay", latency=None)
+    replayed = sgs.get(1, start="2024-01-01", end="2024-01-02")
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert replayed.equals(recorded)
+    assert len(http_module.get_cassette()) == 1
+
+
+def test_async_replay(httpx_mock, cassette_dir) -> None:
+    httpx_mock.add_response(url=SGS_URL, json=SERIES, is_reusable=True)
+    http_module.set_cassette(cassette_dir, mode="record")
+    sgs.get([1, 2], last=2)
+    http_module.set_cassette(cassette_dir, mode="replay", latency=None)
+
+    df = asyncio.run(sgs.async_get([1, 2], last=2))
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert list(df.columns) == ["1", "2"]
+
+
+def test_query_parameter_order_does_not_matter(tmp_path) -> None:
+    cassette = Cassette(tmp_path, mode="replay", latency=None)
+    request = httpx.Request("GET", URL)
+    cassette.save(request, recording(b"[]"))
+
+    reordered = httpx.Request(
+        "GET", "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?a=1&formato=json"
+    )
+
+    assert cassette.lookup(reordered) is not None
+
+
+def test_replay_miss_raises(tmp_path) -> None:
+    transport = CassetteTransport(
+        FixedTransport(httpx.Response(200)), Cassette(tmp_path, mode="replay")
+    )
+
+    with pytest.raises(CassetteMissError) as excinfo:
+        transport.handle_request(httpx.Request("GET", URL))
+
+    assert excinfo.value.url == URL
+
+
+def test_auto_mode_records_only_unknown_requests(tmp_path) -> None:
+    inner = FixedTransport(httpx.Response(404, content=b"missing"))
+    transport = CassetteTransport(inner, Cassette(tmp_path, latency=None))
+
+    first = transport.handle_request(httpx.Request("GET", URL))
+    second = transport.handle_request(httpx.Request("GET", URL))
+
+    assert len(inner.requests) == 1
+    assert first.status_code == second.status_code == 404
+    assert second.read() == b"missing"
+
+
+def test_recorded_latency_is_simulated(tmp_path) -> None:
+    cassette = Cassette(tmp_path, mode="replay", bandwidth=None)
+    request = httpx.Request("GET", URL)
+    cassette.save(request, recording(b"[]", elapsed=0.2))
+    transport = CassetteTransport(FixedTransport(httpx.Response(200)), cassette)
+
+    started = time.perf_counter()
+    transport.handle_request(request)
+
+    assert time.perf_counter() - started >= 0.2
+
+
+def test_bandwidth_is_simulated(tmp_path) -> None:
+    cassette = Cassette(tmp_path, mode="replay", latency=None, bandwidth=1_000_000)
+    request = httpx.Request("GET", URL)
+    cassette.save(request, recording(b"x" * 200_000))
+    transport = CassetteTransport(FixedTransport(httpx.Response(200)), cassette)
+
+    started = time.perf_counter()
+    response = transport.handle_request(request)
+    assert response.headers["Content-Length"] == "200000"
+    assert len(response.read()) == 200_000
+
+    assert time.perf_counter() - started >= 0.2
+
+
+def test_invalid_settings_are_rejected(tmp_path) -> None:
+    with pytest.raises(ValueError, match="mode"):
+        Cassette(tmp_path, mode="rewind")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="bandwidth"):
+        Cassette(tmp_path, bandwidth=0)
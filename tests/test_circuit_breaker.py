@@ -0,0 +1,173 @@
+"""Tests for the per-host circuit breaker."""
+
+import asyncio
+import re
+import time
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.circuitbreaker import CircuitBreaker, CircuitBreakerTransport
+from bcb.exceptions import BCBAPIError, BCBCircuitOpenError
+from bcb.metrics import MetricsRegistry
+
+HOST = "api.bcb.gov.br"
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/dados.*")
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?formato=json"
+
+
+class StatusTransport(httpx.BaseTransport):
+    def __init__(self, status_code: int = 500) -> None:
+        self.status_code = status_code
+        self.requests: list[httpx.Request] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(self.status_code, json=[])
+
+
+@pytest.fixture
+def reset_breaker():
+    yield
+    http_module.set_circuit_breaker(False)
+    http_module.disable_cache()
+
+
+def breaker(**kwargs: float) -> CircuitBreaker:
+    kwargs.setdefault("min_requests", 2)
+    kwargs.setdefault("recovery_time", 0.1)
+    return CircuitBreaker(registry=MetricsRegistry(), **kwargs)  # type: ignore[arg-type]
+
+
+def test_circuit_opens_after_failure_rate() -> None:
+    circuit = breaker(failure_rate=0.5, min_requests=4)
+    for failed in (False, False, True):
+        assert circuit.allow(HOST)
+        circuit.record(HOST, failed=failed)
+    assert circuit.state(HOST) == "closed"
+
+    circuit.allow(HOST)
+    circuit.record(HOST, failed=True)
+
+    assert circuit.state(HOST) == "open"
+    assert not circuit.allow(HOST)
+    assert circuit.allow("olinda.bcb.gov.br")
+    assert circuit.registry.counter("circuit_opens") == 1
+
+
+def test_half_open_probe_closes_circuit_on_success() -> None:
+    circuit = breaker()
+    for _ in range(2):
+        circuit.allow(HOST)
+        circuit.record(HOST, failed=True)
+    time.sleep(0.15)
+
+    assert circuit.state(HOST) == "half_open"
+    assert circuit.allow(HOST)
+    assert not circuit.allow(HOST)  # one probe at a time
+    circuit.record(HOST, failed=False)
+
+    assert circuit.state(HOST) == "closed"
+    assert circuit.allow(HOST)
+
+
+def test_failed_probe_reopens_circuit() -> None:
+    circuit = breaker()
+    for _ in range(2):
+        circuit.allow(HOST)
+        circuit.record(HOST, failed=True)
+    time.sleep(0.15)
+
+    circuit.allow(HOST)
+    circuit.record(HOST, failed=True)
+
+    assert circuit.state(HOST) == "open"
+    assert circuit.retry_after(HOST) > 0
+
+
+def test_released_probe_frees_its_slot() -> None:
+    circuit = breaker(recovery_time=0)
+    for _ in range(2):
+        circuit.allow(HOST)
+        circuit.record(HOST, failed=True)
+
+    assert circuit.allow(HOST)
+    circuit.release(HOST)
+
+    assert circuit.allow(HOST)
+
+
+def test_transport_fails_fast_once_open() -> None:
+    inner = StatusTransport(503)
+    circuit = breaker(recovery_time=30)
+    transport = CircuitBreakerTransport(inner, circuit)
+    for _ in range(2):
+        transport.handle_request(httpx.Request("GET", URL))
+
+    with pytest.raises(BCBCircuitOpenError) as excinfo:
+        transport.handle_request(httpx.Request("GET", URL))
+
+    assert isinstance(excinfo.value, BCBAPIError)
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.host == HOST
+    assert excinfo.value.retry_after > 0
+    assert len(inner.requests) == 2
+    assert circuit.registry.counter("circuit_rejections") == 1
+
+
+def test_client_errors_do_not_count_as_failures() -> None:
+    circuit = breaker()
+    transport = CircuitBreakerTransport(StatusTransport(404), circuit)
+    for _ in range(5):
+        transport.handle_request(httpx.Request("GET", URL))
+
+    assert circuit.state(HOST) == "closed"
+
+
+def test_open_circuit_is_not_retried(httpx_mock, reset_breaker) -> None:
+    httpx_mock.add_response(url=SGS_URL, status_code=500, is_reusable=True)
+    http_module.set_circuit_breaker(min_requests=2, recovery_time=30)
+
+    with pytest.raises(BCBCircuitOpenError):
+        sgs.get_json(1, last=1)
+    with pytest.raises(BCBCircuitOpenError):
+        sgs.get_json(1, last=1)
+
+    assert len(httpx_mock.get_requests()) == 2
+    snapshot = http_module.metrics_snapshot()
+    assert snapshot["circuits"][HOST]["state"] == "open"
+
+
+def test_open_circuit_serves_cached_response(
+    httpx_mock, reset_breaker, tmp_path
+) -> None:
+    httpx_mock.add_response(url=URL, json=[{"data": "01/01/2024", "valor": "1"}])
+    http_module.enable_cache(tmp_path)
+    circuit = http_module.set_circuit_breaker(min_requests=1, recovery_time=30)
+    assert circuit is not None
+    http_module.get_client().get(URL)
+    circuit.record(HOST, failed=True)
+
+    response = http_module.get_client().get(URL)
+
+    assert response.headers["X-BCB-Cache"] == "STALE"
+    assert response.json() == [{"data": "01/01/2024", "valor": "1"}]
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_async_transport_fails_fast(httpx_mock, reset_breaker) -> None:
+    httpx_mock.add_response(url=URL, status_code=502, is_reusable=True)
+    http_module.set_circuit_breaker(min_requests=2, recovery_time=30)
+
+    async def main() -> None:
+        client = http_module.get_async_client()
+        for _ in range(2):
+            await client.get(URL)
+        await client.get(URL)
+
+    with pytest.raises(BCBCircuitOpenError):
+        asyncio.run(main())
+
+    assert len(httpx_mock.get_requests()) == 2
@@ -0,0 +1,137 @@
+"""Tests for bcb.Client sessions."""
+
+import asyncio
+import re
+
+import pytest
+
+import bcb
+from bcb import currency
+from bcb import http as http_module
+from bcb.odata import framework
+from bcb.ratelimit import RateLimiter
+from tests.conftest import (
+    ODATA_METADATA_XML,
+    ODATA_QUERY_RESPONSE_JSON,
+    ODATA_SERVICE_ROOT_JSON,
+    SGS_JSON_5,
+)
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.1/.*")
+EXPECTATIVAS_BASE_URL = (
+    "https://olinda.bcb.gov.br/olinda/servico/Expectativas/versao/v1/odata/"
+)
+
+
+@pytest.fixture
+def shared_metrics():
+    http_module.reset_metrics()
+    yield http_module.get_metrics()
+    http_module.reset_metrics()
+
+
+def requests(snapshot: dict) -> int:
+    return snapshot["counters"].get("requests", 0)
+
+
+def add_expectativas_mocks(httpx_mock) -> None:
+    httpx_mock.add_response(url=EXPECTATIVAS_BASE_URL, text=ODATA_SERVICE_ROOT_JSON)
+    httpx_mock.add_response(
+        url=EXPECTATIVAS_BASE_URL + "$metadata", content=ODATA_METADATA_XML
+    )
+
+
+def test_session_uses_its_own_client_and_metrics(httpx_mock, shared_metrics) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5)
+
+    with bcb.Client(timeout=5) as client:
+        df = client.sgs.get(1, last=5)
+        session_client = client.get_client()
+
+    assert len(df) == 5
+    assert requests(client.metrics_snapshot()) == 1
+    assert requests(shared_metrics.snapshot()) == 0
+    assert session_client is not http_module.get_client()
+    assert session_client.timeout.read == 5
+    assert session_client.is_closed
+
+
+def test_activate_routes_module_functions() -> None:
+    client = bcb.Client()
+    shared = http_module.get_client()
+
+    with client.activate():
+        assert http_module.get_client() is client.get_client()
+        assert http_module.current_session() is client
+
+    assert http_module.get_client() is shared
+    assert http_module.current_session() is None
+    client.close()
+
+
+def test_sessions_keep_separate_caches() -> None:
+    first, second = bcb.Client(), bcb.Client()
+
+    with first.activate():
+        first_cache = currency._default_cache()
+        first_metadata = framework._metadata_cache()
+    with second.activate():
+        second_cache = currency._default_cache()
+
+    assert first_cache is not second_cache
+    assert first_cache is not currency._DEFAULT_CACHE
+    assert first_metadata is not framework._METADATA_CACHE
+    with first.activate():
+        assert currency._default_cache() is first_cache
+
+
+def test_odata_objects_stay_bound(httpx_mock) -> None:
+    add_expectativas_mocks(httpx_mock)
+    httpx_mock.add_response(
+        url=re.compile(r".*ExpectativasMercadoAnuais.*"),
+        text=ODATA_QUERY_RESPONSE_JSON,
+    )
+    client = bcb.Client()
+
+    api = client.Expectativas()
+    endpoint = api.get_endpoint("ExpectativasMercadoAnuais")
+    df = endpoint.query().filter(endpoint.Indicador == "IPCA").limit(1).collect()
+
+    assert list(df["Indicador"]) == ["IPCA"]
+    assert requests(client.metrics_snapshot()) == 3
+    assert EXPECTATIVAS_BASE_URL + "$metadata" not in framework._METADATA_CACHE
+    assert client.data_cache.get("odata_metadata", EXPECTATIVAS_BASE_URL + "$metadata")
+    client.close()
+
+
+def test_session_rate_limiter_is_not_shared() -> None:
+    limiter = RateLimiter(5)
+    client = bcb.Client(rate_limiter=limiter)
+
+    assert client.rate_limiter is limiter
+    assert http_module.get_rate_limiter() is None
+
+
+def test_async_session(httpx_mock, shared_metrics) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5)
+
+    async def main():
+        async with bcb.AsyncClient() as client:
+            df = await client.sgs.async_get(1, last=5)
+            async_client = client.get_async_client()
+        return client, df, async_client
+
+    client, df, async_client = asyncio.run(main())
+
+    assert len(df) == 5
+    assert requests(client.metrics_snapshot()) == 1
+    assert requests(shared_metrics.snapshot()) == 0
+    assert async_client.is_closed
+
+
+def test_unknown_attribute_raises() -> None:
+    client = bcb.Client()
+
+    with pytest.raises(AttributeError):
+        client.missing
+    assert "PTAX" in dir(client)
@@ -0,0 +1,201 @@
+"""Tests for the adaptive concurrency limits of the async clients."""
+
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.concurrency import AdaptiveConcurrency, AsyncAdaptiveConcurrencyTransport
+from tests.conftest import SGS_JSON_5
+
+HOST = "api.bcb.gov.br"
+URL = f"https://{HOST}/dados/serie/bcdata.sgs.1/dados?formato=json"
+
+
+class Backend:
+    """Mock server that records how many requests it handles at once."""
+
+    def __init__(self, status_code: int = 200, delay: float = 0.01) -> None:
+        self.status_code = status_code
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return httpx.Response(self.status_code)
+
+
+class SlowBody(httpx.AsyncByteStream):
+    """Body sent in chunks over ``delay`` seconds, counted while open."""
+
+    def __init__(self, backend: "StreamingBackend") -> None:
+        self.backend = backend
+
+    async def __aiter__(self):
+        for _ in range(5):
+            await asyncio.sleep(self.backend.delay / 5)
+            yield b"x"
+
+    async def aclose(self) -> None:
+        self.backend.active -= 1
+
+
+class StreamingBackend(Backend):
+    """Answers at once and keeps the request active while the body streams."""
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        return httpx.Response(self.status_code, stream=SlowBody(self))
+
+
+async def fan_out(controller: AdaptiveConcurrency, backend: Backend, n: int) -> None:
+    transport = AsyncAdaptiveConcurrencyTransport(
+        httpx.MockTransport(backend), controller
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        await asyncio.gather(*[client.get(URL) for _ in range(n)])
+
+
+def test_limit_caps_requests_in_flight() -> None:
+    controller = AdaptiveConcurrency(initial=2, max_limit=2)
+    backend = Backend()
+
+    asyncio.run(fan_out(controller, backend, 10))
+
+    assert backend.peak == 2
+    assert controller.snapshot()[HOST]["in_flight"] == 0
+
+
+def test_slot_is_held_until_the_body_is_read() -> None:
+    controller = AdaptiveConcurrency(initial=2, max_limit=2)
+    backend = StreamingBackend(delay=0.05)
+
+    asyncio.run(fan_out(controller, backend, 6))
+
+    assert backend.peak == 2
+    snapshot = controller.snapshot()[HOST]
+    assert snapshot["in_flight"] == 0
+    assert snapshot["latency_baseline"] >= 0.05
+
+
+def test_limit_grows_while_saturated() -> None:
+    controller = AdaptiveConcurrency(initial=2, max_limit=8)
+
+    asyncio.run(fan_out(controller, Backend(), 40))
+
+    assert controller.limit(HOST) > 2
+    assert controller.snapshot()[HOST]["increases"] > 0
+
+
+def test_overload_cuts_limit() -> None:
+    controller = AdaptiveConcurrency(initial=8)
+
+    asyncio.run(fan_out(controller, Backend(status_code=429), 1))
+
+    assert controller.limit(HOST) == 4
+    assert controller.snapshot()[HOST]["decreases"] == 1
+
+
+def test_overload_cuts_once_per_round_trip() -> None:
+    controller = AdaptiveConcurrency(initial=16)
+    for _ in range(10):
+        asyncio.run(controller.acquire(HOST))
+        controller.release(HOST, 1.0)
+    for _ in range(10):
+        asyncio.run(controller.acquire(HOST))
+    for _ in range(10):
+        controller.release(HOST, 1.0, overloaded=True)
+
+    assert controller.snapshot()[HOST]["decreases"] == 1
+
+
+def test_latency_spike_cuts_limit() -> None:
+    controller = AdaptiveConcurrency(initial=8, latency_tolerance=3.0)
+    for _ in range(10):
+        asyncio.run(controller.acquire(HOST))
+        controller.release(HOST, 0.01)
+    limit = controller.limit(HOST)
+
+    asyncio.run(controller.acquire(HOST))
+    controller.release(HOST, 0.5)
+
+    assert controller.limit(HOST) < limit
+
+
+def test_cancelled_waiter_gives_up_its_place() -> None:
+    controller = AdaptiveConcurrency(initial=1, max_limit=1)
+
+    async def main() -> None:
+        await controller.acquire(HOST)
+        waiter = asyncio.create_task(controller.acquire(HOST))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release(HOST)
+
+    asyncio.run(main())
+
+    assert controller.snapshot()[HOST]["in_flight"] == 0
+    assert controller.snapshot()[HOST]["queued"] == 0
+
+
+def test_waiters_on_other_loops_are_woken() -> None:
+    controller = AdaptiveConcurrency(initial=1, max_limit=1)
+    backend = Backend(delay=0.005)
+
+    async def main() -> None:
+        await asyncio.gather(
+            fan_out(controller, backend, 3),
+            asyncio.to_thread(asyncio.run, fan_out(controller, backend, 3)),
+        )
+
+    asyncio.run(main())
+
+    assert controller.snapshot()[HOST]["in_flight"] == 0
+
+
+def test_async_get_reports_concurrency(httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.\d+.*"), text=SGS_JSON_5, is_reusable=True
+    )
+
+    asyncio.run(sgs.async_get([1, 2, 3], last=5))
+
+    state = http_module.metrics_snapshot()["concurrency"][HOST]
+    assert state["in_flight"] == 0
+    assert state["limit"] >= 1
+
+
+def test_can_be_disabled() -> None:
+    try:
+        assert http_module.set_adaptive_concurrency(False) is None
+        assert http_module.get_adaptive_concurrency() is None
+    finally:
+        http_module.set_adaptive_concurrency()
+    assert http_module.get_adaptive_concurrency() is not None
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial": 0},
+        {"min_limit": 4, "initial": 2},
+        {"initial": 100, "max_limit": 64},
+        {"backoff": 1.0},
+        {"latency_tolerance": 1.0},
+    ],
+)
+def test_invalid_settings(kwargs) -> None:
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(**kwargs)
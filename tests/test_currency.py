@@ -1,6 +1,8 @@
+import asyncio
 import re
 from datetime import datetime
 
+import httpx
 import pandas as pd
 import pytest
 
@@ -330,3 +332,36 @@ def test_currency_get_output_dataframe_is_default(httpx_mock):
     add_rate_mock(httpx_mock)
     result = currency.get("USD", START, END)
     assert isinstance(result, pd.DataFrame)
+
+
+def test_currency_get_many_symbols_fetch_currency_tables_once(httpx_mock):
+    # The responses yield to the loop like a real server, so concurrent
+    # symbols would each miss the cold cache
+    def slow(**kwargs):
+        async def respond(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, **kwargs)
+
+        return respond
+
+    httpx_mock.add_callback(
+        slow(content=CURRENCY_ID_LIST_HTML),
+        url=PTAX_ID_LIST_URL,
+        is_reusable=True,
+    )
+    httpx_mock.add_callback(
+        slow(text=CURRENCY_LIST_CSV),
+        url=PTAX_CSV_DOWNLOAD_URL,
+        is_reusable=True,
+    )
+    httpx_mock.add_callback(
+        slow(text=CURRENCY_RATE_CSV, headers={"Content-Type": "text/csv"}),
+        url=PTAX_RATE_URL,
+        is_reusable=True,
+    )
+
+    currency.get(["USD"] * 5, START, END)
+
+    assert len(httpx_mock.get_requests(url=PTAX_ID_LIST_URL)) == 1
+    assert len(httpx_mock.get_requests(url=PTAX_CSV_DOWNLOAD_URL)) == 1
+    assert len(httpx_mock.get_requests(url=PTAX_RATE_URL)) == 5
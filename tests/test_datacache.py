@@ -0,0 +1,213 @@
+"""Tests for the parsed-data cache backends."""
+
+import re
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.datacache import (
+    CacheBackend,
+    CacheNamespace,
+    DiskCache,
+    MemoryLRUCache,
+    SQLiteCache,
+    TieredCache,
+    size_of,
+)
+from bcb.odata import framework
+from tests.conftest import ODATA_METADATA_XML, SGS_JSON_5
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.1/.*")
+METADATA_URL = (
+    "https://olinda.bcb.gov.br/olinda/servico/Expectativas/versao/v1/odata/$metadata"
+)
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"value": range(rows), "name": ["x" * 10] * rows})
+
+
+@pytest.fixture
+def data_cache():
+    previous = http_module.get_data_cache()
+    backend = http_module.set_data_cache(MemoryLRUCache())
+    yield backend
+    http_module.set_data_cache(previous)
+
+
+@pytest.fixture(params=["memory", "disk", "sqlite"])
+def backend(request, tmp_path) -> CacheBackend:
+    if request.param == "memory":
+        return MemoryLRUCache()
+    if request.param == "disk":
+        return DiskCache(tmp_path / "cache")
+    return SQLiteCache(tmp_path / "cache.sqlite")
+
+
+def test_backends_implement_protocol(backend) -> None:
+    assert isinstance(backend, CacheBackend)
+
+
+def test_round_trip_and_stats(backend) -> None:
+    df = frame(3)
+
+    assert backend.get("currency", "table") is None
+    backend.set("currency", "table", df)
+
+    pd.testing.assert_frame_equal(backend.get("currency", "table"), df)
+    assert backend.stats()["currency"]["hits"] == 1
+    assert backend.stats()["currency"]["misses"] == 1
+    assert backend.stats()["currency"]["sets"] == 1
+
+
+def test_ttl_per_namespace(backend) -> None:
+    backend.set("sgs", "series", "[]", ttl=0)
+    backend.set("currency", "table", "ok")
+
+    assert backend.get("sgs", "series") is None
+    assert backend.get("currency", "table") == "ok"
+    assert backend.stats()["sgs"]["expired"] == 1
+
+
+def test_clear_one_namespace(backend) -> None:
+    backend.set("sgs", "a", "1")
+    backend.set("currency", "b", "2")
+
+    backend.clear("sgs")
+
+    assert backend.get("sgs", "a") is None
+    assert backend.get("currency", "b") == "2"
+    backend.clear()
+    assert backend.get("currency", "b") is None
+
+
+def test_namespace_ttl_mapping() -> None:
+    cache = MemoryLRUCache(ttl={"sgs": 0})
+
+    cache.set("sgs", "a", "1")
+    cache.set("currency", "b", "2")
+
+    assert cache.get("sgs", "a") is None
+    assert cache.get("currency", "b") == "2"
+
+
+def test_lru_evicts_by_dataframe_bytes() -> None:
+    df = frame(100)
+    cache = MemoryLRUCache(max_bytes=int(size_of(df) * 2.5))
+
+    cache.set("ns", "a", df)
+    cache.set("ns", "b", df)
+    cache.get("ns", "a")
+    cache.set("ns", "c", df)
+
+    assert size_of(df) == df.memory_usage(deep=True).sum()
+    assert cache.get("ns", "b") is None
+    assert cache.get("ns", "a") is not None
+    assert cache.size <= cache.max_bytes
+    assert cache.stats()["ns"]["evictions"] == 1
+
+
+def test_lru_max_entries_and_oversized_values() -> None:
+    cache = MemoryLRUCache(max_bytes=100, max_entries=2)
+
+    cache.set("ns", "big", "x" * 101)
+    for key in "abc":
+        cache.set("ns", key, key)
+
+    assert cache.get("ns", "big") is None
+    assert len(cache) == 2
+    assert cache.get("ns", "a") is None
+
+
+def test_disk_cache_skips_unpicklable_values(tmp_path) -> None:
+    cache = DiskCache(tmp_path)
+
+    cache.set("ns", "lock", threading.Lock())
+
+    assert cache.get("ns", "lock") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite"
+    SQLiteCache(path).set("currency", "table", frame(2))
+
+    assert len(SQLiteCache(path).get("currency", "table")) == 2
+
+
+def test_tiered_cache_promotes_l2_hits(tmp_path) -> None:
+    l1, l2 = MemoryLRUCache(), SQLiteCache(tmp_path / "cache.sqlite")
+    l2.set("currency", "table", "stored")
+    cache = TieredCache(l1, l2)
+
+    assert cache.get("currency", "table") == "stored"
+    assert l1.get("currency", "table") == "stored"
+    cache.set("sgs", "a", "1")
+    assert l2.get("sgs", "a") == "1"
+    cache.clear("sgs")
+    assert l1.get("sgs", "a") is None and l2.get("sgs", "a") is None
+
+
+def test_get_with_expiry_reports_remaining_lifetime(backend) -> None:
+    backend.set("sgs", "a", "1", ttl=60)
+    backend.set("sgs", "b", "2")
+
+    value, remaining = backend.get_with_expiry("sgs", "a")
+    assert value == "1"
+    assert 59 < remaining <= 60
+    assert backend.get_with_expiry("sgs", "b") == ("2", None)
+    assert backend.get_with_expiry("sgs", "c") is None
+
+
+def test_tiered_cache_promotion_keeps_l2_expiry(tmp_path) -> None:
+    l1, l2 = MemoryLRUCache(), SQLiteCache(tmp_path / "cache.sqlite")
+    l2.set("currency", "table", "stored", ttl=0.2)
+    cache = TieredCache(l1, l2)
+
+    assert cache.get("currency", "table") == "stored"
+    time.sleep(0.3)
+
+    assert l2.get("currency", "table") is None
+    assert cache.get("currency", "table") is None
+
+
+def test_invalid_settings() -> None:
+    with pytest.raises(ValueError):
+        MemoryLRUCache(max_bytes=0)
+    with pytest.raises(ValueError):
+        MemoryLRUCache(ttl=-1)
+
+
+def test_namespace_uses_active_backend(data_cache) -> None:
+    CacheNamespace("currency").set("k", "v")
+
+    assert data_cache.get("currency", "k") == "v"
+
+
+def test_odata_metadata_in_persistent_backend(httpx_mock, tmp_path) -> None:
+    httpx_mock.add_response(url=METADATA_URL, content=ODATA_METADATA_XML)
+    backend = SQLiteCache(tmp_path / "cache.sqlite")
+
+    metadata = framework.ODataMetadata(METADATA_URL)
+    backend.set("odata_metadata", METADATA_URL, metadata)
+    restored = backend.get("odata_metadata", METADATA_URL)
+
+    assert restored.namespace == metadata.namespace
+    assert [e.name for e in restored.entities] == [e.name for e in metadata.entities]
+
+
+def test_sgs_cache(httpx_mock, data_cache) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5)
+    sgs.enable_cache(ttl=60)
+    try:
+        first = sgs.get(1, last=5)
+        second = sgs.get(1, last=5)
+    finally:
+        sgs.disable_cache()
+
+    pd.testing.assert_frame_equal(first, second)
+    assert data_cache.stats()["sgs"]["hits"] == 1
+    assert len(data_cache) == 0
@@ -0,0 +1,137 @@
+"""Tests for deadline budgets."""
+
+import asyncio
+import re
+import time
+from datetime import date
+
+import httpx
+import pytest
+
+from bcb import currency, deadline, sgs
+from bcb import http as http_module
+from bcb.exceptions import BCBError, DeadlineExceededError
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/dados.*")
+CURRENCY_LIST_URL = re.compile(r".*/Download/fechamento/M\d+\.csv")
+
+
+def test_deadline_error_is_a_timeout() -> None:
+    error = DeadlineExceededError("late", 1.0)
+
+    assert isinstance(error, BCBError)
+    assert isinstance(error, TimeoutError)
+    assert error.deadline == 1.0
+
+
+def test_budgets_nest_without_extending_the_outer_one() -> None:
+    assert deadline.current() is None
+    with deadline.budget(1) as outer:
+        with deadline.budget(60) as inner:
+            assert inner is outer
+        with deadline.budget(0.5) as inner:
+            assert inner is not outer
+            assert deadline.remaining() <= 0.5
+        with deadline.budget(None) as inner:
+            assert inner is outer
+    assert deadline.current() is None
+
+
+def test_negative_budget_is_rejected() -> None:
+    with pytest.raises(ValueError, match="non-negative"):
+        deadline.Deadline(-1)
+
+
+def test_expired_deadline_refuses_requests(httpx_mock) -> None:
+    with pytest.raises(DeadlineExceededError):
+        with deadline.budget(0):
+            http_module.get_client().get("https://api.bcb.gov.br/dados")
+
+    assert httpx_mock.get_requests() == []
+
+
+def test_request_timeouts_are_clamped_to_the_deadline(httpx_mock) -> None:
+    seen: list[dict[str, float]] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(200, json=[])
+
+    httpx_mock.add_callback(record, url=SGS_URL)
+
+    sgs.get_json(1, last=1, timeout=30, deadline=2)
+
+    assert all(0 < value <= 2 for value in seen[0].values())
+
+
+def test_deadline_stops_retries_instead_of_sleeping(httpx_mock) -> None:
+    httpx_mock.add_response(url=SGS_URL, status_code=503, headers={"Retry-After": "5"})
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        sgs.get_json(1, last=1, deadline=1)
+
+    assert time.monotonic() - started < 1
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_deadline_covers_multi_code_get(httpx_mock) -> None:
+    def slow(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.1)
+        return httpx.Response(200, json=[{"data": "01/01/2024", "valor": "1"}])
+
+    httpx_mock.add_callback(slow, url=SGS_URL, is_reusable=True)
+
+    with pytest.raises(DeadlineExceededError):
+        sgs.get([1, 2, 3, 4, 5], last=1, deadline=0.25)
+
+    assert len(httpx_mock.get_requests()) < 5
+
+
+def test_deadline_caps_currency_rollbacks(httpx_mock) -> None:
+    def missing(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.05)
+        return httpx.Response(404)
+
+    httpx_mock.add_callback(missing, url=CURRENCY_LIST_URL, is_reusable=True)
+
+    with pytest.raises(DeadlineExceededError):
+        with deadline.budget(0.2):
+            currency._get_valid_currency_list(date.today())
+
+    assert len(httpx_mock.get_requests()) < 10
+
+
+def test_async_fan_out_is_cancelled_at_the_deadline(httpx_mock) -> None:
+    async def hang(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=[])
+
+    httpx_mock.add_callback(hang, url=SGS_URL, is_reusable=True)
+
+    async def main() -> None:
+        await sgs.async_get([1, 2, 3], last=1, deadline=0.2)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(main())
+
+    assert time.monotonic() - started < 2
+
+
+def test_rate_limit_wait_past_deadline_fails_fast(httpx_mock) -> None:
+    httpx_mock.add_response(url=SGS_URL, json=[], is_reusable=True)
+    http_module.set_rate_limit(rate=1)
+    try:
+        http_module.get_client().get(
+            "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+        )
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            with deadline.budget(0.3):
+                http_module.get_client().get(
+                    "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+                )
+        assert time.monotonic() - started < 0.3
+    finally:
+        http_module.set_rate_limit(None)
@@ -0,0 +1,313 @@
+"""Tests for hedged requests."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb.hedging import (
+    AsyncHedgingTransport,
+    HedgingPolicy,
+    HedgingTransport,
+    LatencyWindow,
+)
+from bcb.metrics import MetricsRegistry
+from bcb.ratelimit import RateLimiter
+
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?formato=json"
+
+
+class ScriptedTransport(httpx.BaseTransport):
+    """Answers the n-th request after ``delays[n]`` seconds."""
+
+    def __init__(self, *delays: float, error: Exception | None = None) -> None:
+        self.delays = list(delays)
+        self.error = error
+        self.requests: list[httpx.Request] = []
+        self.threads: list[threading.Thread] = []
+        self.closed: list[int] = []
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            n = len(self.requests)
+            self.requests.append(request)
+            self.threads.append(threading.current_thread())
+        time.sleep(self.delays[n])
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(200, content=str(n).encode())
+
+
+class AsyncScriptedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, *delays: float) -> None:
+        self.delays = list(delays)
+        self.requests: list[httpx.Request] = []
+        self.cancelled = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        n = len(self.requests)
+        self.requests.append(request)
+        try:
+            await asyncio.sleep(self.delays[n])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(200, content=str(n).encode())
+
+
+class ChunkStream(httpx.AsyncByteStream):
+    """Body read from the transport as it is consumed, like a real socket."""
+
+    def __init__(self, *chunks: bytes) -> None:
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            if self.closed:
+                raise httpx.StreamClosed()
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class AsyncStreamingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, stream=ChunkStream(b"[", b"]"))
+
+
+def policy(**kwargs: float) -> HedgingPolicy:
+    kwargs.setdefault("initial_delay", 0.05)
+    kwargs.setdefault("min_delay", 0.01)
+    kwargs.setdefault("max_ratio", 1.0)
+    return HedgingPolicy(**kwargs)  # type: ignore[arg-type]
+
+
+def test_latency_window_percentile() -> None:
+    window = LatencyWindow(size=100)
+    assert window.percentile(0.95) is None
+    for i in range(1, 101):
+        window.add(i / 100)
+
+    assert window.percentile(0.95) == pytest.approx(0.95)
+    assert window.percentile(0.5) == pytest.approx(0.5)
+
+
+def test_delay_adapts_to_observed_latencies() -> None:
+    hedging = HedgingPolicy(initial_delay=1.0, min_delay=0.01, min_samples=5)
+    assert hedging.delay("h", "/e") == 1.0
+
+    for _ in range(5):
+        hedging.observe("h", "/e", 0.2)
+
+    assert hedging.delay("h", "/e") == pytest.approx(0.2)
+    assert hedging.delay("h", "/other") == 1.0
+
+
+def test_delay_is_clamped() -> None:
+    hedging = HedgingPolicy(min_delay=0.1, max_delay=2.0, min_samples=1)
+    hedging.observe("h", "/fast", 0.001)
+    hedging.observe("h", "/slow", 30)
+
+    assert hedging.delay("h", "/fast") == 0.1
+    assert hedging.delay("h", "/slow") == 2.0
+
+
+def test_invalid_policy_is_rejected() -> None:
+    with pytest.raises(ValueError, match="percentile"):
+        HedgingPolicy(percentile=1.5)
+    with pytest.raises(ValueError, match="delay"):
+        HedgingPolicy(min_delay=2, max_delay=1)
+    with pytest.raises(ValueError, match="max_threads"):
+        HedgingPolicy(max_threads=1)
+
+
+def test_fast_requests_are_not_hedged() -> None:
+    inner = ScriptedTransport(0)
+    registry = MetricsRegistry()
+    transport = HedgingTransport(inner, policy(), registry=registry)
+
+    response = transport.handle_request(httpx.Request("GET", URL))
+
+    assert response.content == b"0"
+    assert len(inner.requests) == 1
+    assert registry.counter("hedges") == 0
+
+
+def test_slow_request_is_hedged_and_hedge_wins() -> None:
+    inner = ScriptedTransport(0.5, 0)
+    registry = MetricsRegistry()
+    transport = HedgingTransport(inner, policy(), registry=registry)
+
+    started = time.monotonic()
+    response = transport.handle_request(httpx.Request("GET", URL))
+
+    assert time.monotonic() - started < 0.4
+    assert response.content == b"1"
+    assert len(inner.requests) == 2
+    assert registry.counter("hedges") == 1
+    assert registry.counter("hedge_wins") == 1
+
+
+def test_primary_still_wins_after_hedging() -> None:
+    inner = ScriptedTransport(0.1, 0.5)
+    registry = MetricsRegistry()
+    transport = HedgingTransport(inner, policy(), registry=registry)
+
+    response = transport.handle_request(httpx.Request("GET", URL))
+
+    assert response.content == b"0"
+    assert registry.counter("hedges") == 1
+    assert registry.counter("hedge_wins") == 0
+
+
+def test_failed_attempt_falls_back_to_the_other() -> None:
+    inner = ScriptedTransport(0.1, 0.1, error=httpx.ConnectError("down"))
+    transport = HedgingTransport(inner, policy(), registry=MetricsRegistry())
+
+    with pytest.raises(httpx.ConnectError):
+        transport.handle_request(httpx.Request("GET", URL))
+
+    assert len(inner.requests) == 2
+
+
+def test_requests_that_cannot_be_hedged_run_in_the_callers_thread() -> None:
+    inner = ScriptedTransport(0.15)
+    transport = HedgingTransport(inner, policy(max_ratio=0), registry=MetricsRegistry())
+
+    transport.handle_request(httpx.Request("GET", URL))
+
+    assert inner.threads == [threading.current_thread()]
+
+
+def test_requests_are_not_hedged_while_the_pool_is_busy() -> None:
+    hedging = policy(max_threads=2)
+    inner = ScriptedTransport(0.15, 0)
+    registry = MetricsRegistry()
+    transport = HedgingTransport(inner, hedging, registry=registry)
+    assert hedging._reserve_threads(1)
+
+    response = transport.handle_request(httpx.Request("GET", URL))
+
+    assert response.content == b"0"
+    assert inner.threads == [threading.current_thread()]
+    assert registry.counter("hedges") == 0
+
+
+def test_losing_request_frees_its_thread() -> None:
+    hedging = policy(max_threads=2)
+    inner = ScriptedTransport(0.3, 0)
+    transport = HedgingTransport(inner, hedging, registry=MetricsRegistry())
+
+    transport.handle_request(httpx.Request("GET", URL))
+    assert not hedging._reserve_threads(2)
+    time.sleep(0.4)
+
+    assert hedging._reserve_threads(2)
+
+
+def test_non_get_requests_are_not_hedged() -> None:
+    inner = ScriptedTransport(0.2)
+    transport = HedgingTransport(inner, policy(), registry=MetricsRegistry())
+
+    transport.handle_request(httpx.Request("POST", URL))
+
+    assert len(inner.requests) == 1
+
+
+def test_hedges_are_capped_by_the_budget() -> None:
+    inner = ScriptedTransport(0.15, 0.15)
+    registry = MetricsRegistry()
+    transport = HedgingTransport(inner, policy(max_ratio=0), registry=registry)
+
+    transport.handle_request(httpx.Request("GET", URL))
+
+    assert len(inner.requests) == 1
+    assert registry.counter("hedges") == 0
+
+
+def test_hedges_are_skipped_without_rate_limit_capacity() -> None:
+    limiter = RateLimiter(rate=0.1)
+    limiter.bucket("api.bcb.gov.br").reserve()  # type: ignore[union-attr]
+    inner = ScriptedTransport(0.15, 0)
+    transport = HedgingTransport(
+        inner, policy(), limiter=limiter, registry=MetricsRegistry()
+    )
+
+    response = transport.handle_request(httpx.Request("GET", URL))
+
+    assert response.content == b"0"
+    assert len(inner.requests) == 1
+
+
+def test_async_hedge_wins_and_loser_is_cancelled() -> None:
+    inner = AsyncScriptedTransport(5, 0)
+    registry = MetricsRegistry()
+    transport = AsyncHedgingTransport(inner, policy(), registry=registry)
+
+    async def main() -> httpx.Response:
+        response = await transport.handle_async_request(httpx.Request("GET", URL))
+        await asyncio.sleep(0)
+        return response
+
+    started = time.monotonic()
+    response = asyncio.run(main())
+
+    assert time.monotonic() - started < 1
+    assert response.content == b"1"
+    assert inner.cancelled == 1
+    assert registry.counter("hedge_wins") == 1
+
+
+@pytest.mark.parametrize("delay, max_ratio", [(0, 1.0), (0.1, 0)])
+def test_async_unhedged_response_stream_is_left_open(delay, max_ratio) -> None:
+    # Fast responses, and slow ones that may not be hedged, are returned
+    # unread and must not be closed on the way out
+    inner = AsyncStreamingTransport(delay)
+    transport = AsyncHedgingTransport(
+        inner, policy(max_ratio=max_ratio), registry=MetricsRegistry()
+    )
+
+    async def main() -> bytes:
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", URL) as response:
+                return await response.aread()
+
+    assert asyncio.run(main()) == b"[]"
+    assert len(inner.requests) == 1
+
+
+def test_set_hedging_reports_hedge_rate(httpx_mock) -> None:
+    calls: list[int] = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return httpx.Response(200, json=[])
+
+    httpx_mock.add_callback(respond, url=URL, is_reusable=True)
+    http_module.reset_metrics()
+    http_module.set_hedging(initial_delay=0.05, min_delay=0.01, max_ratio=1.0)
+    try:
+        assert http_module.get_hedging_policy() is not None
+        http_module.get_client().get(URL)
+    finally:
+        http_module.set_hedging(False)
+
+    assert http_module.get_hedging_policy() is None
+    snapshot = http_module.metrics_snapshot()
+    assert snapshot["counters"]["hedges"] == 1
+    endpoint = snapshot["endpoints"]["api.bcb.gov.br/dados/serie/bcdata.sgs.{n}/dados"]
+    assert endpoint["hedge_rate"] == 1.0
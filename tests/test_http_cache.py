@@ -0,0 +1,240 @@
+"""Tests for the persistent HTTP response cache."""
+
+import asyncio
+import contextvars
+import re
+import threading
+import time
+import tracemalloc
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.cache import CACHE_STATUS_HEADER, HTTPCache, cache_key
+from bcb.spool import body_of, stream_get
+from tests.conftest import SGS_JSON_5
+
+SGS_CODE_URL = re.compile(r".*bcdata\.sgs\..*")
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+
+
+class LargeBody(httpx.SyncByteStream):
+    """Body produced chunk by chunk, like a socket."""
+
+    def __init__(self, size: int, chunk: bytes = b"x" * 65536) -> None:
+        self.size = size
+        self.chunk = chunk
+
+    def __iter__(self):
+        for _ in range(self.size // len(self.chunk)):
+            yield self.chunk
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    cache = http_module.enable_cache(tmp_path, ttl=60)
+    yield cache
+    http_module.disable_cache()
+
+
+def test_cache_key_ignores_parameter_order() -> None:
+    assert cache_key("GET", f"{URL}?a=1&b=2") == cache_key("GET", f"{URL}?b=2&a=1")
+    assert cache_key("GET", f"{URL}?a=1") != cache_key("GET", f"{URL}?a=2")
+
+
+def test_fresh_entry_is_served_without_request(httpx_mock, http_cache) -> None:
+    httpx_mock.add_response(url=SGS_CODE_URL, text=SGS_JSON_5)
+
+    assert sgs.get_json(1) == SGS_JSON_5
+    assert sgs.get_json(1) == SGS_JSON_5
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_expired_entry_revalidates_with_etag(httpx_mock, tmp_path) -> None:
+    http_module.enable_cache(tmp_path, ttl=0)
+    try:
+        httpx_mock.add_response(url=URL, text=SGS_JSON_5, headers={"ETag": '"v1"'})
+        httpx_mock.add_response(url=URL, status_code=304)
+
+        first = http_module.get_client().get(URL)
+        second = http_module.get_client().get(URL)
+    finally:
+        http_module.disable_cache()
+
+    assert first.headers[CACHE_STATUS_HEADER] == "MISS"
+    assert second.status_code == 200
+    assert second.text == SGS_JSON_5
+    assert second.headers[CACHE_STATUS_HEADER] == "REVALIDATED"
+    assert httpx_mock.get_requests()[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_expired_entry_revalidates_with_last_modified(httpx_mock, tmp_path) -> None:
+    last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+    http_module.enable_cache(tmp_path, ttl=0)
+    try:
+        httpx_mock.add_response(
+            url=URL, text=SGS_JSON_5, headers={"Last-Modified": last_modified}
+        )
+        httpx_mock.add_response(url=URL, text="[]", headers={"ETag": '"v2"'})
+
+        http_module.get_client().get(URL)
+        changed = http_module.get_client().get(URL)
+    finally:
+        http_module.disable_cache()
+
+    request = httpx_mock.get_requests()[1]
+    assert request.headers["If-Modified-Since"] == last_modified
+    assert changed.text == "[]"
+    assert changed.headers[CACHE_STATUS_HEADER] == "MISS"
+
+
+def test_error_responses_are_not_cached(httpx_mock, http_cache) -> None:
+    httpx_mock.add_response(url=URL, status_code=500)
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5)
+
+    assert http_module.get_client().get(URL).status_code == 500
+    assert http_module.get_client().get(URL).status_code == 200
+
+
+def test_cache_persists_across_instances(httpx_mock, http_cache) -> None:
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5, headers={"ETag": '"v1"'})
+    http_module.get_client().get(URL)
+
+    reopened = HTTPCache(http_cache.directory)
+    entry = reopened.load(cache_key("GET", URL))
+
+    assert entry is not None
+    assert entry.content == SGS_JSON_5.encode()
+    assert entry.etag == '"v1"'
+
+
+def test_clear_removes_entries(httpx_mock, http_cache) -> None:
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5)
+    http_module.get_client().get(URL)
+
+    http_cache.clear()
+
+    assert http_cache.load(cache_key("GET", URL)) is None
+
+
+def test_invalid_ttl_raises(tmp_path) -> None:
+    with pytest.raises(ValueError, match="non-negative"):
+        HTTPCache(tmp_path, ttl=-1)
+
+
+def test_async_stale_entry_is_served_and_refreshed(httpx_mock, tmp_path) -> None:
+    cache = http_module.enable_cache(tmp_path, ttl=0, stale_while_revalidate=60)
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5, headers={"ETag": '"v1"'})
+    httpx_mock.add_response(url=URL, status_code=304)
+
+    async def main() -> httpx.Response:
+        client = http_module.get_async_client()
+        await client.get(URL)
+        stale = await client.get(URL)
+        for _ in range(50):
+            if len(httpx_mock.get_requests()) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await client.aclose()
+        return stale
+
+    try:
+        time.sleep(0.01)
+        stale = asyncio.run(main())
+    finally:
+        http_module.disable_cache()
+
+    assert stale.headers[CACHE_STATUS_HEADER] == "STALE"
+    assert stale.text == SGS_JSON_5
+    assert httpx_mock.get_requests()[1].headers["If-None-Match"] == '"v1"'
+    assert cache.load(cache_key("GET", URL)).age() < 60
+
+
+REQUEST_TAG: contextvars.ContextVar[str] = contextvars.ContextVar("REQUEST_TAG")
+
+
+def test_concurrent_stale_hits_revalidate_once(httpx_mock, tmp_path) -> None:
+    http_module.enable_cache(tmp_path, ttl=0, stale_while_revalidate=60)
+    release = threading.Event()
+    tags = []
+
+    def not_modified(request: httpx.Request) -> httpx.Response:
+        tags.append(REQUEST_TAG.get(None))
+        release.wait(5)
+        return httpx.Response(304)
+
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5, headers={"ETag": '"v1"'})
+    httpx_mock.add_callback(not_modified, url=URL)
+    try:
+        client = http_module.get_client()
+        client.get(URL)
+        time.sleep(0.01)
+        REQUEST_TAG.set("caller")
+        statuses = [client.get(URL).headers[CACHE_STATUS_HEADER] for _ in range(5)]
+        release.set()
+        for _ in range(50):
+            if tags:
+                break
+            time.sleep(0.01)
+    finally:
+        http_module.disable_cache()
+
+    assert statuses == ["STALE"] * 5
+    assert len(httpx_mock.get_requests()) == 2
+    assert tags == ["caller"]
+
+
+def test_async_concurrent_stale_hits_revalidate_once(httpx_mock, tmp_path) -> None:
+    http_module.enable_cache(tmp_path, ttl=0, stale_while_revalidate=60)
+    httpx_mock.add_response(url=URL, text=SGS_JSON_5, headers={"ETag": '"v1"'})
+
+    async def not_modified(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(304)
+
+    httpx_mock.add_callback(not_modified, url=URL)
+
+    async def main() -> list[httpx.Response]:
+        client = http_module.get_async_client()
+        await client.get(URL)
+        await asyncio.sleep(0.01)
+        stale = await asyncio.gather(*(client.get(URL) for _ in range(5)))
+        await asyncio.sleep(0.2)
+        await client.aclose()
+        return stale
+
+    try:
+        stale = asyncio.run(main())
+    finally:
+        http_module.disable_cache()
+
+    assert [r.headers[CACHE_STATUS_HEADER] for r in stale] == ["STALE"] * 5
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_large_spooled_body_is_not_held_in_memory(httpx_mock, http_cache) -> None:
+    size = 8 * 1024 * 1024
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(200, stream=LargeBody(size)), url=URL
+    )
+    client = http_module.get_client()
+
+    tracemalloc.start()
+    try:
+        miss = stream_get(client, URL, threshold=1024)
+        hit = stream_get(client, URL, threshold=1024)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size // 4
+    assert miss.headers[CACHE_STATUS_HEADER] == "MISS"
+    assert hit.headers[CACHE_STATUS_HEADER] == "HIT"
+    assert len(httpx_mock.get_requests()) == 1
+    for response in (miss, hit):
+        with body_of(response) as body:
+            assert body.on_disk
+            assert body.size == size
@@ -0,0 +1,132 @@
+"""Tests for the connection settings of the shared clients."""
+
+import importlib.util
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb.http import HTTPConfig
+
+URL = "https://olinda.bcb.gov.br/olinda/servico/PTAX/versao/v1/odata/"
+
+
+@pytest.fixture
+def restore_config():
+    config = http_module.get_config()
+    yield
+    http_module._CONFIG = config
+    http_module._rebuild_clients()
+
+
+def connection_pool(transport):
+    # Walk the wrapper chain down to the httpcore pool
+    while not isinstance(transport, (httpx.HTTPTransport, httpx.AsyncHTTPTransport)):
+        transport = transport._transport
+    return transport._pool
+
+
+def test_defaults_match_httpx(monkeypatch) -> None:
+    for variable, _ in http_module._ENV_SETTINGS.values():
+        monkeypatch.delenv(variable, raising=False)
+
+    config = HTTPConfig.from_env()
+
+    assert config == HTTPConfig()
+    assert config.limits() == httpx.Limits(
+        max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0
+    )
+
+
+def test_settings_are_read_from_environment(monkeypatch) -> None:
+    monkeypatch.setenv("BCB_HTTP_TIMEOUT", "12.5")
+    monkeypatch.setenv("BCB_HTTP_MAX_CONNECTIONS", "none")
+    monkeypatch.setenv("BCB_HTTP_MAX_KEEPALIVE_CONNECTIONS", "40")
+    monkeypatch.setenv("BCB_HTTP_KEEPALIVE_EXPIRY", "30")
+    monkeypatch.setenv(
+        "BCB_HTTP_MAX_CONNECTIONS_PER_HOST", "olinda.bcb.gov.br=8, api.bcb.gov.br=4"
+    )
+    monkeypatch.setenv("BCB_HTTP_TRANSPORT_RETRIES", "2")
+    monkeypatch.setenv("BCB_HTTP_UPSTREAM", "http://127.0.0.1:8080")
+
+    config = HTTPConfig.from_env()
+
+    assert config.timeout == 12.5
+    assert config.max_connections is None
+    assert config.max_keepalive_connections == 40
+    assert config.keepalive_expiry == 30.0
+    assert config.max_connections_per_host == {
+        "olinda.bcb.gov.br": 8,
+        "api.bcb.gov.br": 4,
+    }
+    assert config.transport_retries == 2
+    assert config.upstream == "http://127.0.0.1:8080"
+
+
+def test_invalid_environment_values_are_ignored(monkeypatch, caplog) -> None:
+    monkeypatch.setenv("BCB_HTTP_MAX_CONNECTIONS", "many")
+    monkeypatch.setenv("BCB_HTTP2", "maybe")
+
+    config = HTTPConfig.from_env()
+
+    assert config.max_connections == 100
+    assert config.http2 is False
+    assert "BCB_HTTP_MAX_CONNECTIONS" in caplog.text
+
+
+def test_configure_rebuilds_clients_with_new_limits(restore_config) -> None:
+    old_client = http_module.get_client()
+
+    config = http_module.configure(
+        max_connections=200, keepalive_expiry=None, transport_retries=3
+    )
+
+    # Closed right away, rebuilt on next use
+    assert old_client.is_closed
+    assert http_module._CLIENT is None
+    assert http_module._ASYNC_CLIENT is None
+    client = http_module.get_client()
+    assert client is not old_client
+    assert config.max_keepalive_connections == 20
+    pool = connection_pool(client._transport)
+    assert pool._max_connections == 200
+    assert pool._keepalive_expiry is None
+    assert pool._retries == 3
+    async_client = http_module.get_async_client()
+    assert connection_pool(async_client._transport)._retries == 3
+
+
+def test_configure_timeout_applies_to_both_clients(restore_config) -> None:
+    http_module.configure(timeout=7)
+
+    assert http_module.get_client().timeout == httpx.Timeout(7)
+    assert http_module.get_async_client().timeout == httpx.Timeout(7)
+
+
+def test_per_host_pools_are_mounted(httpx_mock, restore_config) -> None:
+    httpx_mock.add_response(url=URL)
+    http_module.configure(max_connections_per_host={"olinda.bcb.gov.br": 4})
+
+    client = http_module.get_client()
+    transport = client._transport_for_url(httpx.URL(URL))
+
+    assert transport is not client._transport
+    assert connection_pool(transport)._max_connections == 4
+    assert client.get(URL).status_code == 200
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("h2") is not None, reason="h2 is installed"
+)
+def test_http2_requires_h2(restore_config) -> None:
+    with pytest.raises(ImportError, match="h2"):
+        http_module.configure(http2=True)
+
+    assert http_module.get_config().http2 is False
+
+
+@pytest.mark.skipif(importlib.util.find_spec("h2") is None, reason="needs h2")
+def test_http2_is_enabled_on_the_pool(restore_config) -> None:
+    http_module.configure(http2=True)
+
+    assert connection_pool(http_module.get_client()._transport)._http2 is True
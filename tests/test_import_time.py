@@ -0,0 +1,72 @@
+"""Tests guarding the lazy imports of ``bcb``."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import bcb
+
+PROBE = """
+import json, sys
+{statement}
+heavy = ("pandas", "lxml", "numpy", "httpx", "bcb.odata")
+modules = sorted(m for m in heavy if m in sys.modules)
+import bcb.http
+print(json.dumps({{
+    "modules": modules,
+    "clients": bcb.http._CLIENT is not None or bcb.http._ASYNC_CLIENT is not None,
+}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    # A fresh interpreter, so modules imported by the test session don't count
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def test_import_bcb_is_cheap() -> None:
+    result = probe("import bcb")
+
+    # Checked by the modules loaded rather than by wall-clock time, which
+    # is unreliable on loaded machines
+    assert result["modules"] == []
+    assert result["clients"] is False
+
+
+def test_sgs_text_path_does_not_import_pandas_or_lxml() -> None:
+    result = probe("from bcb import sgs")
+
+    assert "pandas" not in result["modules"]
+    assert "lxml" not in result["modules"]
+    assert result["clients"] is False
+
+
+def test_configure_does_not_build_clients() -> None:
+    result = probe("import bcb.http; bcb.http.configure(timeout=5.0)")
+
+    assert result["clients"] is False
+
+
+def test_odata_classes_are_loaded_on_access() -> None:
+    result = probe("import bcb; bcb.PTAX")
+
+    assert "lxml" in result["modules"]
+    assert "pandas" not in result["modules"]  # until a DataFrame is built
+
+
+def test_lazy_attributes_resolve() -> None:
+    from bcb.odata.api import PTAX
+
+    assert bcb.PTAX is PTAX
+    assert "PTAX" in dir(bcb)
+    assert bcb.sgs.get is not None
+    with pytest.raises(AttributeError):
+        bcb.missing
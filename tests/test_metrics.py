@@ -0,0 +1,157 @@
+"""Tests for request instrumentation hooks and the metrics registry."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb.metrics import Histogram, HTTPEvent, endpoint_of
+from bcb.retry import RetryPolicy
+
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
+ENDPOINT = "api.bcb.gov.br/dados/serie/bcdata.sgs.{n}/dados"
+
+
+@pytest.fixture
+def events():
+    received: list[HTTPEvent] = []
+    http_module.reset_metrics()
+    http_module.add_event_hook(received.append)
+    yield received
+    http_module.remove_event_hook(received.append)
+    http_module.reset_metrics()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        (URL, "/dados/serie/bcdata.sgs.{n}/dados"),
+        (
+            "https://olinda.bcb.gov.br/olinda/servico/PTAX/versao/v1/odata/"
+            "CotacaoMoedaDia(moeda=@moeda,dataCotacao=@dataCotacao)?$format=json",
+            "/olinda/servico/PTAX/versao/v1/odata/CotacaoMoedaDia(...)",
+        ),
+        ("https://ptax.bcb.gov.br/ptax_internet/consultaBoletim.do", None),
+    ],
+)
+def test_endpoint_of_collapses_identifiers(url: str, expected: str | None) -> None:
+    assert endpoint_of(url) == (expected or httpx.URL(url).path)
+
+
+def test_histogram_quantiles() -> None:
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in [0.05] * 90 + [0.5] * 10:
+        histogram.observe(value)
+
+    assert 0.05 <= histogram.quantile(0.5) <= 0.1
+    assert 0.1 <= histogram.quantile(0.99) <= 0.5
+    assert histogram.snapshot()["buckets"] == {"0.1": 90, "1.0": 10, "+Inf": 0}
+    assert Histogram().quantile(0.5) is None
+
+
+def test_request_emits_start_and_end_events(httpx_mock, events) -> None:
+    httpx_mock.add_response(url=URL, content=b"x" * 100)
+
+    http_module.get_client().get(URL)
+
+    assert [e.kind for e in events] == ["request_start", "request_end"]
+    end = events[-1]
+    assert end.host == "api.bcb.gov.br"
+    assert end.status_code == 200
+    assert end.bytes_received == 100
+    assert end.elapsed is not None and end.elapsed >= 0
+
+
+def test_metrics_snapshot_and_reset(httpx_mock, events) -> None:
+    httpx_mock.add_response(url=URL, content=b"x" * 10)
+    httpx_mock.add_response(url=URL, status_code=404)
+
+    http_module.get_client().get(URL)
+    http_module.get_client().get(URL)
+
+    snapshot = http_module.metrics_snapshot()
+    assert snapshot["counters"]["requests"] == 2
+    assert snapshot["counters"]["bytes_received"] == 10
+    endpoint = snapshot["endpoints"][ENDPOINT]
+    assert endpoint["status"] == {"200": 1, "404": 1}
+    assert endpoint["latency"]["count"] == 2
+
+    http_module.reset_metrics()
+
+    assert http_module.metrics_snapshot() == {"counters": {}, "endpoints": {}}
+
+
+def test_transport_errors_are_reported(httpx_mock, events) -> None:
+    httpx_mock.add_exception(httpx.ConnectError("down"), url=URL)
+
+    with pytest.raises(httpx.ConnectError):
+        http_module.get_client().get(URL)
+
+    assert events[-1].kind == "error"
+    assert isinstance(events[-1].error, httpx.ConnectError)
+    assert http_module.get_metrics().counter("errors") == 1
+
+
+def test_retries_are_reported(httpx_mock, events, monkeypatch) -> None:
+    monkeypatch.setattr(http_module, "_RETRY_POLICIES", {})
+    http_module.set_retry_policy(RetryPolicy(backoff_base=0, budget=None), "x")
+    httpx_mock.add_response(url=URL, status_code=503)
+    httpx_mock.add_response(url=URL)
+
+    @http_module.with_retry(module="x")
+    def fetch() -> httpx.Response:
+        return http_module.get_client().get(URL)
+
+    assert fetch().status_code == 200
+
+    retry = next(e for e in events if e.kind == "retry")
+    assert retry.status_code == 503
+    assert retry.attempt == 1
+    assert retry.endpoint == "/dados/serie/bcdata.sgs.{n}/dados"
+    assert http_module.metrics_snapshot()["endpoints"][ENDPOINT]["retries"] == 1
+
+
+def test_cache_hits_are_reported(httpx_mock, events, tmp_path) -> None:
+    httpx_mock.add_response(url=URL, content=b"[]")
+    http_module.enable_cache(tmp_path, ttl=60)
+    try:
+        http_module.get_client().get(URL)
+        http_module.get_client().get(URL)
+    finally:
+        http_module.disable_cache()
+
+    hits = [e for e in events if e.kind == "cache_hit"]
+    assert [e.cache_status for e in hits] == ["HIT"]
+    endpoint = http_module.metrics_snapshot()["endpoints"][ENDPOINT]
+    assert endpoint["cache_hits"] == 1
+    # Only the network response contributes to the latency histogram
+    assert endpoint["latency"]["count"] == 1
+
+
+def test_async_requests_are_instrumented(httpx_mock, events) -> None:
+    httpx_mock.add_response(url=URL, content=b"abc", is_reusable=True)
+
+    async def main() -> None:
+        async with http_module._make_async_client() as client:
+            await asyncio.gather(client.get(URL), client.get(URL))
+
+    asyncio.run(main())
+
+    assert http_module.get_metrics().counter("requests") == 2
+    assert http_module.get_metrics().counter("bytes_received") == 6
+    assert sum(e.kind == "request_end" for e in events) == 2
+
+
+def test_failing_hook_does_not_break_requests(httpx_mock, events) -> None:
+    def broken(event: HTTPEvent) -> None:
+        raise RuntimeError("hook bug")
+
+    httpx_mock.add_response(url=URL)
+    http_module.add_event_hook(broken)
+    try:
+        assert http_module.get_client().get(URL).status_code == 200
+    finally:
+        http_module.remove_event_hook(broken)
+
+    assert events[-1].kind == "request_end"
@@ -0,0 +1,114 @@
+"""Tests for fork safety and the process-pool helpers."""
+
+import functools
+import json
+import os
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import parallel
+from bcb.cassette import Cassette, Recording
+
+SERIES = {
+    1: [{"data": "01/01/2024", "valor": "1.5"}, {"data": "02/01/2024", "valor": "1.6"}],
+    433: [
+        {"data": "01/01/2024", "valor": "0.4"},
+        {"data": "03/01/2024", "valor": "0.5"},
+    ],
+}
+
+
+def sgs_url(code: int) -> str:
+    return (
+        f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.{code}/dados/ultimos/2"
+        "?formato=json"
+    )
+
+
+@pytest.fixture
+def recorded_series(tmp_path):
+    cassette = Cassette(tmp_path)
+    for code, rows in SERIES.items():
+        url = sgs_url(code)
+        content = json.dumps(rows).encode()
+        recording = Recording("GET", url, 200, [], content, 0.0, 0.0)
+        cassette.save(httpx.Request("GET", url), recording)
+    return tmp_path
+
+
+def replay(directory) -> dict:
+    # Workers replay the cassette instead of reaching the network
+    return {
+        "initializer": functools.partial(http_module.set_cassette, mode="replay"),
+        "initargs": (str(directory),),
+        "mp_context": "spawn",
+        "max_workers": 2,
+    }
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_fresh_clients() -> None:
+    parent_client = http_module.get_client()
+    parent_async = http_module.get_async_client()
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:  # child
+        try:
+            fresh = (
+                http_module.get_client() is not parent_client
+                and http_module.get_async_client() is not parent_async
+                and not parent_client.is_closed
+            )
+            os.write(write_fd, b"1" if fresh else b"0")
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert result == b"1"
+    assert http_module.get_client() is parent_client
+    assert not parent_client.is_closed
+
+
+def test_pid_change_rebuilds_clients(monkeypatch) -> None:
+    client = http_module.get_client()
+    monkeypatch.setattr(http_module, "_PID", -1)
+
+    rebuilt = http_module.get_client()
+
+    assert rebuilt is not client
+    assert http_module._PID == os.getpid()
+
+
+def test_process_map_preserves_order() -> None:
+    assert parallel.process_map(abs, [-3, 2, -1], max_workers=2) == [3, 2, 1]
+    assert parallel.process_map(abs, []) == []
+
+
+def test_sgs_get_matches_serial_get(recorded_series) -> None:
+    df = parallel.sgs_get({"selic": 1, "ipca": 433}, last=2, **replay(recorded_series))
+
+    http_module.set_cassette(recorded_series, mode="replay")
+    try:
+        from bcb import sgs
+
+        expected = sgs.get({"selic": 1, "ipca": 433}, last=2)
+    finally:
+        http_module.set_cassette(None)
+
+    assert df.equals(expected)
+
+
+def test_sgs_get_list_and_tidy_outputs(recorded_series) -> None:
+    frames = parallel.sgs_get([1, 433], last=2, multi=False, **replay(recorded_series))
+    tidy = parallel.sgs_get([1, 433], last=2, tidy=True, **replay(recorded_series))
+
+    assert [list(df.columns) for df in frames] == [["1"], ["433"]]
+    assert list(tidy.columns) == ["Date", "series", "value"]
+    assert len(tidy) == 6
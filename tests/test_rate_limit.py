@@ -0,0 +1,133 @@
+"""Tests for the shared per-host rate limiter."""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from bcb import http as http_module
+from bcb.ratelimit import RateLimiter, TokenBucket, parse_retry_after
+
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+
+
+@pytest.fixture
+def reset_rate_limit():
+    yield
+    http_module.set_rate_limit(None)
+
+
+def test_parse_retry_after_seconds_and_dates() -> None:
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) == 0.0
+    assert parse_retry_after("soon") == 0.0
+    now = time.time()
+    assert 9 <= parse_retry_after(formatdate(now + 10, usegmt=True), now=now) <= 10
+
+
+def test_token_bucket_spaces_reservations() -> None:
+    bucket = TokenBucket(rate=10, burst=1)
+
+    waits = [bucket.reserve() for _ in range(3)]
+
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(0.1, abs=0.02)
+    assert waits[2] == pytest.approx(0.2, abs=0.02)
+
+
+def test_token_bucket_allows_burst() -> None:
+    bucket = TokenBucket(rate=1, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() > 0
+
+
+def test_token_bucket_penalize_and_reward() -> None:
+    bucket = TokenBucket(rate=8, burst=1)
+
+    bucket.penalize(retry_after=0.5)
+
+    assert bucket.rate == 4
+    assert bucket.reserve() >= 0.45
+    for _ in range(40):
+        bucket.reward()
+    assert bucket.rate == 8
+
+
+def test_token_bucket_rejects_invalid_settings() -> None:
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError, match="burst"):
+        TokenBucket(rate=1, burst=0)
+
+
+def test_rate_limiter_uses_per_host_rates() -> None:
+    limiter = RateLimiter(per_host={"olinda.bcb.gov.br": 2})
+
+    assert limiter.bucket("api.bcb.gov.br") is None
+    assert limiter.bucket("olinda.bcb.gov.br").rate == 2
+    assert limiter.snapshot() == {"olinda.bcb.gov.br": 2}
+
+
+def test_rate_limiter_is_shared_across_threads() -> None:
+    bucket = TokenBucket(rate=100, burst=1)
+    waits: list[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        wait = bucket.reserve()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(round(w, 2) for w in waits) == [0.0, 0.01, 0.02, 0.03, 0.04]
+
+
+def test_shared_client_respects_rate_limit(httpx_mock, reset_rate_limit) -> None:
+    httpx_mock.add_response(url=URL, is_reusable=True)
+    http_module.set_rate_limit(rate=50)
+
+    started = time.monotonic()
+    for _ in range(4):
+        http_module.get_client().get(URL)
+
+    assert time.monotonic() - started >= 0.05
+
+
+def test_async_client_shares_limiter(httpx_mock, reset_rate_limit) -> None:
+    httpx_mock.add_response(url=URL, is_reusable=True)
+    limiter = http_module.set_rate_limit(per_host={"api.bcb.gov.br": 50})
+
+    async def main() -> None:
+        client = http_module.get_async_client()
+        await asyncio.gather(*[client.get(URL) for _ in range(4)])
+        await client.aclose()
+
+    started = time.monotonic()
+    asyncio.run(main())
+
+    assert time.monotonic() - started >= 0.05
+    assert http_module.get_rate_limiter() is limiter
+
+
+def test_rate_limited_response_lowers_host_rate(httpx_mock, reset_rate_limit) -> None:
+    httpx_mock.add_response(url=URL, status_code=429)
+    limiter = http_module.set_rate_limit(rate=20)
+
+    http_module.get_client().get(URL)
+
+    assert limiter.snapshot()["api.bcb.gov.br"] == 10
+
+
+def test_set_rate_limit_without_rates_disables(reset_rate_limit) -> None:
+    http_module.set_rate_limit(rate=5)
+
+    assert http_module.set_rate_limit() is None
+    assert http_module.get_rate_limiter() is None
@@ -34,12 +34,23 @@ class RecordingClient:
         self.calls.append((url, kwargs.copy()))
         return response_for_url(url)
 
+    # Streamed downloads build the request and send it separately
+    def build_request(self, method: str, url: str, **kwargs: Any) -> str:
+        self.calls.append((url, kwargs.copy()))
+        return url
+
+    def send(self, url: str, *, stream: bool = False) -> httpx.Response:
+        return response_for_url(url)
+
 
 class AsyncRecordingClient(RecordingClient):
     async def get(self, url: str, **kwargs: Any) -> httpx.Response:
         self.calls.append((url, kwargs.copy()))
         return response_for_url(url)
 
+    async def send(self, url: str, *, stream: bool = False) -> httpx.Response:
+        return response_for_url(url)
+
 
 def response_for_url(url: str) -> httpx.Response:
     request = httpx.Request("GET", url)
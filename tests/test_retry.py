@@ -0,0 +1,155 @@
+"""Tests for status-aware retry policies."""
+
+import json
+import re
+
+import httpx
+import pytest
+
+from bcb import currency
+from bcb import http as http_module
+from bcb.exceptions import BCBAPIError, BCBAPIServerError
+from bcb.retry import NO_RETRY, RetryBudget, RetryPolicy
+
+PTAX_ID_LIST_URL = re.compile(r".*exibeFormularioConsultaBoletim.*")
+FAST = RetryPolicy(backoff_base=0, budget=None)
+
+
+def make_response(status_code: int, headers: dict[str, str] | None = None):
+    request = httpx.Request("GET", "https://example.test/resource")
+    return httpx.Response(status_code, headers=headers, request=request)
+
+
+@pytest.fixture
+def restore_retry_policies(monkeypatch):
+    monkeypatch.setattr(
+        http_module, "_RETRY_POLICIES", dict(http_module._RETRY_POLICIES)
+    )
+    monkeypatch.setattr(
+        http_module, "_DEFAULT_RETRY_POLICY", http_module._DEFAULT_RETRY_POLICY
+    )
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        httpx.ConnectError("down"),
+        httpx.ReadTimeout("slow"),
+        httpx.RemoteProtocolError("reset"),
+        BCBAPIServerError("boom", 503),
+    ],
+)
+def test_transient_errors_are_retryable(exc: BaseException) -> None:
+    assert RetryPolicy().is_retryable_exception(exc)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        httpx.DecodingError("bad gzip"),
+        json.JSONDecodeError("bad", "doc", 0),
+        ValueError("parse"),
+        BCBAPIError("not found", 404),
+    ],
+)
+def test_permanent_errors_fail_fast(exc: BaseException) -> None:
+    assert not RetryPolicy().is_retryable_exception(exc)
+
+
+@pytest.mark.parametrize(
+    ("status_code", "expected"),
+    [(200, False), (400, False), (404, False), (429, True), (500, True)],
+)
+def test_response_classification(status_code: int, expected: bool) -> None:
+    assert RetryPolicy().is_retryable_response(make_response(status_code)) is expected
+
+
+def test_long_retry_after_is_not_retried() -> None:
+    policy = RetryPolicy(max_retry_after=5)
+
+    assert not policy.is_retryable_response(make_response(429, {"Retry-After": "120"}))
+
+
+def test_backoff_is_jittered_and_capped() -> None:
+    policy = RetryPolicy(backoff_base=1, backoff_max=3)
+
+    for retry_number in range(1, 6):
+        assert 0 <= policy.backoff(retry_number) <= min(3, 2 ** (retry_number - 1))
+
+
+def test_invalid_max_attempts_raises() -> None:
+    with pytest.raises(ValueError, match="max_attempts"):
+        RetryPolicy(max_attempts=0)
+
+
+def test_retry_budget_limits_retries() -> None:
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0, window=60)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_with_retry_honours_retry_after(restore_retry_policies) -> None:
+    responses = [make_response(429, {"Retry-After": "2"}), make_response(200)]
+    sleeps: list[float] = []
+    http_module.set_retry_policy(RetryPolicy(backoff_base=0.1, budget=None), "x")
+
+    @http_module.with_retry(module="x")
+    def fetch() -> httpx.Response:
+        return responses.pop(0)
+
+    fetch.retry.sleep = sleeps.append  # type: ignore[attr-defined]
+
+    assert fetch().status_code == 200
+    assert len(sleeps) == 1
+    assert 2 <= sleeps[0] <= 2.1
+
+
+def test_with_retry_returns_last_response_when_exhausted(
+    restore_retry_policies,
+) -> None:
+    calls: list[int] = []
+    http_module.set_retry_policy(RetryPolicy(max_attempts=3, backoff_base=0), "x")
+
+    @http_module.with_retry(module="x")
+    def fetch() -> httpx.Response:
+        calls.append(1)
+        return make_response(503)
+
+    assert fetch().status_code == 503
+    assert len(calls) == 3
+
+
+def test_with_retry_stops_when_budget_is_exhausted(restore_retry_policies) -> None:
+    calls: list[int] = []
+    budget = RetryBudget(ratio=0, min_retries_per_second=0.1, window=10)
+    http_module.set_retry_policy(RetryPolicy(backoff_base=0, budget=budget), "x")
+
+    @http_module.with_retry(module="x")
+    def fetch() -> httpx.Response:
+        calls.append(1)
+        raise httpx.ConnectError("down")
+
+    with pytest.raises(httpx.ConnectError):
+        fetch()
+
+    assert len(calls) == 2
+
+
+def test_module_policies_default_to_single_attempt_for_currency_and_odata() -> None:
+    assert http_module.get_retry_policy("currency") is NO_RETRY
+    assert http_module.get_retry_policy("odata") is NO_RETRY
+    assert http_module.get_retry_policy("sgs").max_attempts == 4
+
+
+def test_currency_policy_is_configurable(httpx_mock, restore_retry_policies) -> None:
+    http_module.set_retry_policy(FAST, module="currency")
+    httpx_mock.add_response(url=PTAX_ID_LIST_URL, status_code=502)
+    httpx_mock.add_exception(httpx.ReadTimeout("slow"), url=PTAX_ID_LIST_URL)
+    httpx_mock.add_response(url=PTAX_ID_LIST_URL, status_code=404)
+
+    with pytest.raises(BCBAPIError, match="404"):
+        currency._currency_id_list()
+
+    assert len(httpx_mock.get_requests()) == 3
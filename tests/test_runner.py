@@ -0,0 +1,251 @@
+"""Tests for the background event loop used by the sync API."""
+
+import asyncio
+import re
+import threading
+import time
+
+import httpx
+import pytest
+
+import bcb
+from bcb import deadline, runner, sgs
+from bcb import http as http_module
+from bcb.exceptions import SGSError
+from tests.conftest import SGS_JSON_5
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/.*")
+
+
+class Backend:
+    """Mock SGS server that records how many requests it handles at once."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.threads: set[str] = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.threads.add(threading.current_thread().name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.active -= 1
+        return httpx.Response(200, text=SGS_JSON_5)
+
+
+@pytest.fixture
+def backend(httpx_mock) -> Backend:
+    backend = Backend()
+    httpx_mock.add_callback(backend, url=SGS_URL, is_reusable=True)
+    return backend
+
+
+def test_run_returns_result_from_persistent_loop() -> None:
+    async def where():
+        return asyncio.get_running_loop(), threading.current_thread()
+
+    loop, thread = runner.run(where())
+
+    assert thread is not threading.current_thread()
+    assert runner.run(where()) == (loop, thread)
+    assert runner.running_loop() is loop
+
+
+def test_run_propagates_context() -> None:
+    async def active():
+        return http_module.current_session(), deadline.current()
+
+    client = bcb.Client()
+    with client.activate(), deadline.budget(10) as budget:
+        assert runner.run(active()) == (client, budget)
+    client.close()
+
+
+def test_run_propagates_exceptions() -> None:
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        runner.run(fail())
+
+
+def test_run_refuses_to_block_its_own_loop() -> None:
+    async def nested():
+        coro = asyncio.sleep(0)
+        runner.run(coro)
+
+    with pytest.raises(RuntimeError, match="background loop"):
+        runner.run(nested())
+
+
+def test_cancelling_future_cancels_task() -> None:
+    started = threading.Event()
+
+    async def forever():
+        started.set()
+        await asyncio.sleep(60)
+
+    future = runner.submit(forever())
+    started.wait(5)
+    future.cancel()
+
+    assert future.cancelled()
+
+
+def test_sync_get_fetches_codes_concurrently(backend) -> None:
+    df = sgs.get([1, 2, 3, 4], last=5)
+
+    assert list(df.columns) == ["1", "2", "3", "4"]
+    assert backend.peak > 1
+    assert backend.threads == {"bcb-loop"}
+
+
+def test_sync_get_inside_running_loop(backend) -> None:
+    # e.g. a Jupyter cell, whose thread already runs an event loop
+    async def cell():
+        return sgs.get({"a": 1, "b": 2}, last=5, output="text")
+
+    texts = asyncio.run(cell())
+
+    assert texts == {1: SGS_JSON_5, 2: SGS_JSON_5}
+
+
+def test_sync_get_raises_first_error(httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.1/.*"), text=SGS_JSON_5, is_optional=True
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*bcdata\.sgs\.2/.*"),
+        status_code=404,
+        json={"erro": {"detail": "Série não encontrada"}},
+    )
+
+    with pytest.raises(SGSError):
+        sgs.get([1, 2], last=5)
+
+
+def test_can_be_disabled(httpx_mock) -> None:
+    threads = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        threads.append(threading.current_thread())
+        return httpx.Response(200, text=SGS_JSON_5)
+
+    httpx_mock.add_callback(record, url=SGS_URL, is_reusable=True)
+    runner.set_enabled(False)
+    try:
+        df = sgs.get([1, 2, 3], last=5)
+        sgs.get(1, last=5)
+    finally:
+        runner.set_enabled()
+
+    assert len(df.columns) == 3
+    assert all(thread.name.startswith("bcb-sgs") for thread in threads[:3])
+    assert threads[3] is threading.current_thread()
+
+
+def test_disabled_runner_fetches_in_default_threads(httpx_mock) -> None:
+    lock = threading.Lock()
+    active = peak = 0
+
+    def record(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return httpx.Response(200, text=SGS_JSON_5)
+
+    httpx_mock.add_callback(record, url=SGS_URL, is_reusable=True)
+    runner.set_enabled(False)
+    try:
+        df = sgs.get(list(range(1, 13)), last=5)
+    finally:
+        runner.set_enabled()
+
+    assert len(df.columns) == 12
+    assert 1 < peak <= 8
+
+
+def test_max_workers_bounds_codes_in_flight(backend) -> None:
+    df = sgs.get({"e": 5, "d": 4, "c": 3, "b": 2, "a": 1}, last=5, max_workers=2)
+
+    assert list(df.columns) == ["e", "d", "c", "b", "a"]
+    assert backend.peak == 2
+
+
+def test_max_workers_one_fetches_in_calling_thread(httpx_mock) -> None:
+    threads = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        threads.append(threading.current_thread())
+        return httpx.Response(200, text=SGS_JSON_5)
+
+    httpx_mock.add_callback(record, url=SGS_URL, is_reusable=True)
+
+    sgs.get([1, 2], last=5, max_workers=1)
+
+    assert threads == [threading.current_thread()] * 2
+
+
+def test_max_workers_uses_threads_when_disabled(httpx_mock) -> None:
+    lock = threading.Lock()
+    active = peak = 0
+    threads = set()
+
+    def record(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        with lock:
+            threads.add(threading.current_thread().name)
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        code = re.search(r"sgs\.(\d+)", str(request.url)).group(1)
+        return httpx.Response(200, text=f'[{{"data":"01/01/2024","valor":"{code}"}}]')
+
+    httpx_mock.add_callback(record, url=SGS_URL, is_reusable=True)
+    runner.set_enabled(False)
+    try:
+        texts = sgs.get([4, 3, 2, 1], last=1, output="text", max_workers=3)
+    finally:
+        runner.set_enabled()
+
+    assert list(texts) == [4, 3, 2, 1]
+    assert all(f'"valor":"{code}"' in text for code, text in texts.items())
+    assert 1 < peak <= 3
+    assert all(name.startswith("bcb-sgs") for name in threads)
+
+
+def test_max_workers_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="max_workers"):
+        sgs.get([1, 2], last=5, max_workers=0)
+
+
+def test_session_close_closes_background_client(backend) -> None:
+    client = bcb.Client()
+
+    client.sgs.get([1, 2], last=5)
+    loop = runner.running_loop()
+    async_client = client._loop_clients[loop].client
+    client.close()
+
+    assert async_client.is_closed
+    assert loop not in client._loop_clients
+
+
+def test_shutdown_stops_thread_and_restarts_on_demand() -> None:
+    runner.get_loop()
+    thread = runner._THREAD
+
+    runner.shutdown()
+
+    assert not thread.is_alive()
+    assert runner.running_loop() is None
+    assert runner.run(asyncio.sleep(0, "again")) == "again"
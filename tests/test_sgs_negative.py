@@ -35,23 +35,27 @@ def test_get_json_404_raises(httpx_mock):
         sgs.get_json(1)
 
 
-def test_get_json_429_rate_limit_raises(httpx_mock):
+def test_get_json_429_rate_limit_raises(httpx_mock, monkeypatch):
     """Test that 429 response raises BCBRateLimitError."""
     from bcb.exceptions import BCBRateLimitError
 
+    _disable_sgs_retry_sleep(monkeypatch)
     httpx_mock.add_response(
         url=SGS_CODE_URL,
         status_code=429,
+        is_reusable=True,
     )
     with pytest.raises(BCBRateLimitError):
         sgs.get_json(1)
 
 
-def test_get_json_500_raises(httpx_mock):
+def test_get_json_500_raises(httpx_mock, monkeypatch):
     """Test that 500 response raises SGSError."""
+    _disable_sgs_retry_sleep(monkeypatch)
     httpx_mock.add_response(
         url=SGS_CODE_URL,
         status_code=500,
+        is_reusable=True,
     )
     with pytest.raises(SGSError):
         sgs.get_json(1)
@@ -96,11 +100,11 @@ def test_get_json_retries_timeout_then_succeeds(httpx_mock, monkeypatch):
     assert sgs.get_json(1) == SGS_JSON_5
 
 
-def test_get_json_does_not_retry_http_status_errors(httpx_mock, monkeypatch):
+def test_get_json_does_not_retry_client_errors(httpx_mock, monkeypatch):
     _disable_sgs_retry_sleep(monkeypatch)
     httpx_mock.add_response(
         url=SGS_CODE_URL,
-        status_code=500,
+        status_code=400,
     )
 
     with pytest.raises(SGSError):
@@ -109,6 +113,27 @@ def test_get_json_does_not_retry_http_status_errors(httpx_mock, monkeypatch):
     assert len(httpx_mock.get_requests()) == 1
 
 
+def test_get_json_retries_server_errors_then_succeeds(httpx_mock, monkeypatch):
+    _disable_sgs_retry_sleep(monkeypatch)
+    httpx_mock.add_response(url=SGS_CODE_URL, status_code=503)
+    httpx_mock.add_response(url=SGS_CODE_URL, text=SGS_JSON_5, status_code=200)
+
+    assert sgs.get_json(1) == SGS_JSON_5
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_get_json_stops_retrying_server_errors_after_max_attempts(
+    httpx_mock, monkeypatch
+):
+    _disable_sgs_retry_sleep(monkeypatch)
+    httpx_mock.add_response(url=SGS_CODE_URL, status_code=500, is_reusable=True)
+
+    with pytest.raises(SGSError):
+        sgs.get_json(1)
+
+    assert len(httpx_mock.get_requests()) == 4
+
+
 # ---------------------------------------------------------------------------
 # Malformed data (JSON)
 # ---------------------------------------------------------------------------
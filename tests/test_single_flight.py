@@ -0,0 +1,255 @@
+"""Tests for coalescing of identical in-flight requests."""
+
+import asyncio
+import threading
+import time
+import tracemalloc
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb.singleflight import AsyncSingleFlightTransport, SingleFlightTransport
+from bcb.spool import async_stream_get, body_of, stream_get
+
+URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?formato=json"
+
+
+class SlowTransport(httpx.BaseTransport):
+    def __init__(self, delay: float = 0.1, error: Exception | None = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.requests: list[httpx.Request] = []
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests.append(request)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(200, content=b'[{"valor": "1"}]')
+
+
+class AsyncSlowTransport(httpx.AsyncBaseTransport):
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, content=request.url.query)
+
+
+class ChunkStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Body of ``size`` bytes produced chunk by chunk, like a socket."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.chunk = bytes(range(256)) * 256
+
+    def __iter__(self):
+        for _ in range(self.size // len(self.chunk)):
+            yield self.chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+
+class LargeBodyTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def __init__(self, size: int, delay: float = 0.1) -> None:
+        self.size = size
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        time.sleep(self.delay)
+        return httpx.Response(200, stream=ChunkStream(self.size))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, stream=ChunkStream(self.size))
+
+
+@pytest.fixture
+def reset_single_flight():
+    yield
+    http_module.set_single_flight(False)
+
+
+def fetch_concurrently(client: httpx.Client, urls: list[str]) -> list[object]:
+    results: list[object] = [None] * len(urls)
+
+    def worker(i: int) -> None:
+        try:
+            results[i] = client.get(urls[i]).content
+        except Exception as ex:
+            results[i] = ex
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(urls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_threads_share_one_request() -> None:
+    upstream = SlowTransport()
+    client = httpx.Client(transport=SingleFlightTransport(upstream))
+
+    results = fetch_concurrently(client, [URL] * 8)
+
+    assert len(upstream.requests) == 1
+    assert results == [b'[{"valor": "1"}]'] * 8
+
+
+def test_query_parameter_order_is_canonicalised() -> None:
+    upstream = SlowTransport()
+    client = httpx.Client(transport=SingleFlightTransport(upstream))
+    base = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados"
+
+    fetch_concurrently(client, [f"{base}?a=1&b=2", f"{base}?b=2&a=1"])
+
+    assert len(upstream.requests) == 1
+
+
+def test_errors_reach_every_waiter() -> None:
+    upstream = SlowTransport(error=httpx.ConnectError("down"))
+    client = httpx.Client(transport=SingleFlightTransport(upstream))
+
+    results = fetch_concurrently(client, [URL] * 4)
+
+    assert len(upstream.requests) == 1
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+
+
+def test_sequential_requests_are_not_coalesced() -> None:
+    upstream = SlowTransport(delay=0)
+    transport = SingleFlightTransport(upstream)
+    client = httpx.Client(transport=transport)
+
+    client.get(URL)
+    client.get(URL)
+
+    assert len(upstream.requests) == 2
+    assert transport.in_flight() == 0
+
+
+def test_non_get_requests_are_not_coalesced() -> None:
+    upstream = SlowTransport()
+    client = httpx.Client(transport=SingleFlightTransport(upstream))
+    results: list[int] = []
+
+    def worker() -> None:
+        results.append(client.post(URL, content=b"x").status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(upstream.requests) == 3
+
+
+def test_async_tasks_share_one_request() -> None:
+    upstream = AsyncSlowTransport()
+
+    async def main() -> list[bytes]:
+        transport = AsyncSingleFlightTransport(upstream)
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(
+                *[client.get(URL) for _ in range(5)],
+                client.get(URL + "&x=1"),
+            )
+        return [r.content for r in responses]
+
+    contents = asyncio.run(main())
+
+    assert len(upstream.requests) == 2
+    assert contents[:5] == [b"formato=json"] * 5
+    assert contents[5] == b"formato=json&x=1"
+
+
+def test_async_followers_retry_when_leader_is_cancelled() -> None:
+    upstream = AsyncSlowTransport()
+
+    async def main() -> bytes:
+        transport = AsyncSingleFlightTransport(upstream)
+        async with httpx.AsyncClient(transport=transport) as client:
+            leader = asyncio.create_task(client.get(URL))
+            await asyncio.sleep(0.01)
+            follower = asyncio.create_task(client.get(URL))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            response = await follower
+        return response.content
+
+    assert asyncio.run(main()) == b"formato=json"
+    assert len(upstream.requests) == 2
+
+
+def test_spooled_bodies_are_shared_through_a_spool_file() -> None:
+    size = 8 * 1024 * 1024
+    upstream = LargeBodyTransport(size)
+    client = httpx.Client(transport=SingleFlightTransport(upstream))
+    bodies: list[object] = [None] * 4
+
+    def worker(i: int) -> None:
+        bodies[i] = body_of(stream_get(client, URL, threshold=1024))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    tracemalloc.start()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size // 4
+    assert len(upstream.requests) == 1
+    expected = bytes(range(256)) * 1024
+    for body in bodies:
+        assert body.on_disk and body.size == size
+        assert body.binary().read(len(expected)) == expected
+        body.close()
+
+
+def test_async_spooled_bodies_are_shared() -> None:
+    size = 1024 * 1024
+    upstream = LargeBodyTransport(size, delay=0.05)
+
+    async def main() -> list[int]:
+        transport = AsyncSingleFlightTransport(upstream)
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(
+                *[async_stream_get(client, URL, threshold=1024) for _ in range(3)]
+            )
+        bodies = [body_of(r) for r in responses]
+        assert all(body.on_disk for body in bodies)
+        return [body.size for body in bodies]
+
+    assert asyncio.run(main()) == [size] * 3
+    assert len(upstream.requests) == 1
+
+
+def test_shared_client_coalesces_when_enabled(httpx_mock, reset_single_flight) -> None:
+    def slow_response(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.1)
+        return httpx.Response(200, json=[{"valor": "1"}])
+
+    httpx_mock.add_callback(slow_response, url=URL, is_reusable=True)
+    http_module.set_single_flight()
+
+    results = fetch_concurrently(http_module.get_client(), [URL] * 4)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert len(set(results)) == 1
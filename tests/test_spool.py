@@ -0,0 +1,121 @@
+"""Tests for spooling response bodies to disk."""
+
+import asyncio
+import json
+import logging
+import re
+
+import httpx
+import pytest
+
+from bcb import http as http_module
+from bcb import sgs
+from bcb.spool import (
+    DEFAULT_SPOOL_THRESHOLD,
+    SpooledBody,
+    body_length,
+    body_of,
+    spool_response,
+    stream_get,
+)
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.1/.*")
+ROWS = [{"data": f"{day:02d}/01/2021", "valor": f"{day}.5"} for day in range(1, 31)]
+BIG_JSON = json.dumps(ROWS)
+
+
+@pytest.fixture
+def small_threshold():
+    http_module.configure(spool_threshold=64)
+    yield
+    http_module.configure(spool_threshold=DEFAULT_SPOOL_THRESHOLD)
+
+
+@pytest.fixture
+def no_text_decoding(monkeypatch):
+    # Fail if anything decodes a whole response body into a str
+    def forbidden(self):
+        raise AssertionError("response body decoded into memory")
+
+    monkeypatch.setattr(httpx.Response, "text", property(forbidden))
+
+
+def mock_client(content: bytes, status_code: int = 200) -> httpx.Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, content=content)
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_large_body_rolls_over_to_disk() -> None:
+    content = b"x" * 10_000
+    with mock_client(content) as client:
+        response = client.send(client.build_request("GET", "https://x"), stream=True)
+        body = spool_response(response, threshold=1024)
+
+    with body:
+        assert body.on_disk
+        assert body.size == len(content)
+        assert body.binary().read() == content
+        assert body.text().read() == content.decode()
+    assert response.is_closed
+
+
+def test_small_body_stays_in_memory() -> None:
+    with mock_client(b"[]") as client:
+        response = stream_get(client, "https://x", threshold=1024)
+
+    body = body_of(response)
+    assert not body.on_disk
+    assert body.read_text() == "[]"
+    assert body_length(response) == "2"
+
+
+def test_error_responses_are_read_normally() -> None:
+    with mock_client(b'{"erro": "x"}', status_code=404) as client:
+        response = stream_get(client, "https://x", threshold=1024)
+
+    assert response.content == b'{"erro": "x"}'
+    assert body_length(response) == str(len(response.content))
+
+
+def test_body_of_wraps_in_memory_responses() -> None:
+    response = httpx.Response(200, content="ação".encode())
+
+    body = body_of(response)
+
+    assert isinstance(body, SpooledBody)
+    assert body.read_text() == "ação"
+
+
+def test_sgs_parses_from_spool_file(
+    httpx_mock, small_threshold, no_text_decoding, caplog
+) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=BIG_JSON, is_reusable=True)
+
+    with caplog.at_level(logging.DEBUG, logger="bcb.sgs"):
+        df = sgs.get(1, last=30)
+
+    assert len(df) == 30
+    assert df.iloc[-1, 0] == 30.5
+    assert f"length={len(BIG_JSON)}" in caplog.text
+    assert sgs.get_json(1, last=30) == BIG_JSON
+
+
+def test_async_sgs_parses_from_spool_file(
+    httpx_mock, small_threshold, no_text_decoding
+) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=BIG_JSON, is_reusable=True)
+
+    df = asyncio.run(sgs.async_get({"x": 1}, last=30))
+    text = asyncio.run(sgs.async_get(1, last=30, output="text"))
+
+    assert list(df.columns) == ["x"]
+    assert len(df) == 30
+    assert text == BIG_JSON
+
+
+def test_spool_threshold_comes_from_the_environment(monkeypatch) -> None:
+    monkeypatch.setenv("BCB_HTTP_SPOOL_THRESHOLD", "4096")
+
+    assert http_module.HTTPConfig.from_env().spool_threshold == 4096
@@ -0,0 +1,134 @@
+"""Tests for the futures API (bcb.submit, sgs.submit, ...)."""
+
+import asyncio
+import concurrent.futures
+import re
+import threading
+from datetime import datetime
+
+import pytest
+
+import bcb
+from bcb import currency, deadline, sgs
+from bcb import http as http_module
+from tests.conftest import (
+    CURRENCY_ID_LIST_HTML,
+    CURRENCY_LIST_CSV,
+    CURRENCY_RATE_CSV,
+    ODATA_METADATA_XML,
+    ODATA_QUERY_RESPONSE_JSON,
+    ODATA_SERVICE_ROOT_JSON,
+    SGS_JSON_5,
+)
+
+SGS_URL = re.compile(r"https://api\.bcb\.gov\.br/dados/serie/bcdata\.sgs\.\d+/.*")
+EXPECTATIVAS_BASE_URL = (
+    "https://olinda.bcb.gov.br/olinda/servico/Expectativas/versao/v1/odata/"
+)
+
+
+def test_sgs_submit_returns_future(httpx_mock) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5, is_reusable=True)
+
+    future = sgs.submit({"a": 1, "b": 2}, last=5)
+
+    assert isinstance(future, concurrent.futures.Future)
+    df = future.result(timeout=5)
+    assert list(df.columns) == ["a", "b"]
+    assert len(df) == 5
+
+
+def test_sgs_submit_validates_eagerly() -> None:
+    with pytest.raises(ValueError):
+        sgs.submit(1, output="csv")
+
+
+def test_as_completed_with_names(httpx_mock) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5, is_reusable=True)
+    futures = {name: sgs.submit(code, last=5) for name, code in [("x", 1), ("y", 2)]}
+
+    results = {name: f.result() for name, f in bcb.as_completed(futures, timeout=5)}
+
+    assert set(results) == {"x", "y"}
+    assert all(len(df) == 5 for df in results.values())
+
+
+def test_as_completed_with_iterable() -> None:
+    futures = [bcb.submit(asyncio.sleep, 0, n) for n in range(3)]
+
+    assert sorted(f.result() for f in bcb.as_completed(futures, timeout=5)) == [
+        0,
+        1,
+        2,
+    ]
+
+
+def test_currency_submit(httpx_mock) -> None:
+    httpx_mock.add_response(
+        url=re.compile(r".*exibeFormularioConsultaBoletim.*"),
+        content=CURRENCY_ID_LIST_HTML,
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*www4\.bcb\.gov\.br.*\.csv"), text=CURRENCY_LIST_CSV
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*gerarCSVFechamento.*"),
+        text=CURRENCY_RATE_CSV,
+        headers={"Content-Type": "text/csv"},
+    )
+
+    future = currency.submit("USD", datetime(2020, 12, 1), datetime(2020, 12, 7))
+
+    assert list(future.result(timeout=5).columns) == ["USD"]
+
+
+def test_endpoint_submit(httpx_mock) -> None:
+    httpx_mock.add_response(url=EXPECTATIVAS_BASE_URL, text=ODATA_SERVICE_ROOT_JSON)
+    httpx_mock.add_response(
+        url=EXPECTATIVAS_BASE_URL + "$metadata", content=ODATA_METADATA_XML
+    )
+    httpx_mock.add_response(
+        url=re.compile(r".*ExpectativasMercadoAnuais.*"),
+        text=ODATA_QUERY_RESPONSE_JSON,
+    )
+    endpoint = bcb.Expectativas().get_endpoint("ExpectativasMercadoAnuais")
+
+    future = endpoint.submit(limit=1)
+
+    assert list(future.result(timeout=5)["Indicador"]) == ["IPCA"]
+
+
+def test_submit_sync_callable_runs_in_worker_with_context() -> None:
+    def where():
+        return threading.current_thread().name, deadline.current()
+
+    with deadline.budget(10) as budget:
+        name, active = bcb.submit(where).result(timeout=5)
+
+    assert name.startswith("bcb-worker")
+    assert active is budget
+
+
+def test_submit_session_bound_function(httpx_mock) -> None:
+    httpx_mock.add_response(url=SGS_URL, text=SGS_JSON_5)
+    http_module.reset_metrics()
+
+    with bcb.Client() as client:
+        df = bcb.submit(client.sgs.get, 1, last=5).result(timeout=5)
+
+    assert len(df) == 5
+    assert client.metrics_snapshot()["counters"]["requests"] == 1
+    assert "requests" not in http_module.metrics_snapshot()["counters"]
+
+
+def test_submit_propagates_exceptions() -> None:
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        bcb.submit(fail).result(timeout=5)
+
+
+def test_submit_rejects_arguments_with_coroutine_object() -> None:
+    with pytest.raises(TypeError):
+        bcb.submit(asyncio.sleep(0), 1)
@@ -0,0 +1,144 @@
+"""Tests for the local stand-in server and the load harness."""
+
+import functools
+from datetime import date
+
+import httpx
+import pandas as pd
+import pytest
+
+from bcb import sgs
+from bcb import http as http_module
+from bcb.exceptions import BCBRateLimitError, SGSError
+from bcb.retry import RetryPolicy
+from bcb.testing import LoadReport, Scenario, StandInServer, run_load, sgs_payload
+from bcb.upstream import UpstreamTransport
+
+
+@pytest.fixture
+def server():
+    with StandInServer(Scenario(rows=30, seed=1)) as server:
+        yield server
+
+
+@pytest.fixture
+def no_retries(monkeypatch):
+    monkeypatch.setattr(http_module, "_RETRY_POLICIES", {})
+    http_module.set_retry_policy(RetryPolicy(max_attempts=1), "sgs")
+
+
+def test_sgs_through_shared_clients(server) -> None:
+    with server.activate():
+        df = sgs.get({"selic": 432, "ipca": 433}, start="2024-01-01", end="2024-01-31")
+        last = sgs.get(1, last=7)
+
+    assert list(df.columns) == ["selic", "ipca"]
+    assert len(df) == 23  # weekdays of January 2024
+    assert df.index[0] == pd.Timestamp(2024, 1, 1)
+    assert len(last) == 7
+    assert http_module.get_config().upstream is None
+    assert server.stats()["statuses"] == {200: 3}
+
+
+def test_session_currency_and_odata(server) -> None:
+    with server.client() as client:
+        rates = client.currency.get(["USD", "EUR"], "2020-12-01", "2020-12-07")
+        endpoint = client.Expectativas().get_endpoint("ExpectativasMercadoAnuais")
+        records = endpoint.query().limit(4).collect()
+
+    assert list(rates.columns) == ["EUR", "USD"]
+    assert len(rates) == 5
+    assert list(records.columns) == ["Indicador", "Data", "Valor"]
+    assert len(records) == 4
+
+
+def test_throttling_sends_retry_after(no_retries) -> None:
+    scenario = Scenario(throttle_rate=1, retry_after=0)
+    with StandInServer(scenario) as server, server.client() as client:
+        with pytest.raises(BCBRateLimitError):
+            client.sgs.get(1, last=5)
+        response = client.get_client().get(
+            "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados/ultimos/5"
+        )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "0"
+
+
+def test_server_errors_and_scenario_swap(no_retries, server) -> None:
+    server.scenario = Scenario(error_rate=1)
+    with server.client() as client:
+        with pytest.raises(SGSError, match="503"):
+            client.sgs.get(1, last=5)
+        server.scenario = Scenario()
+        assert len(client.sgs.get(1, last=5)) == 5
+
+    assert server.stats()["statuses"] == {503: 1, 200: 1}
+
+
+def test_invalid_scenario() -> None:
+    with pytest.raises(ValueError):
+        Scenario(error_rate=1.5)
+    with pytest.raises(ValueError):
+        Scenario(error_rate=0.6, throttle_rate=0.6)
+
+
+def test_upstream_keeps_path_and_host() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200)
+
+    transport = UpstreamTransport(httpx.MockTransport(handler), "http://mirror:81/bcb")
+    with httpx.Client(transport=transport) as client:
+        response = client.get("https://api.bcb.gov.br/dados/serie?formato=json")
+
+    assert str(seen[0].url) == "http://mirror:81/bcb/dados/serie?formato=json"
+    assert seen[0].headers["Host"] == "api.bcb.gov.br"
+    assert response.request.url.host == "api.bcb.gov.br"
+
+
+def test_run_load_sync_and_async(server) -> None:
+    with server.activate():
+        sync = run_load(lambda: sgs.get(1, last=5), calls=12, concurrency=4)
+        async_ = run_load(
+            functools.partial(sgs.async_get, 1, last=5), calls=12, concurrency=4
+        )
+
+    for report in (sync, async_):
+        assert report.calls == 12
+        assert len(report.latencies) == 12
+        assert report.error_count == 0
+        assert 0 < report.p50 <= report.p95 <= report.p99
+        assert report.throughput > 0
+    assert server.stats()["requests"] == 24
+    assert "p95 ms" in str(sync)
+
+
+def test_run_load_counts_errors() -> None:
+    def fail():
+        raise ValueError("boom")
+
+    report = run_load(fail, calls=5, concurrency=2)
+
+    assert report.errors == {"ValueError": 5}
+    assert report.latencies == ()
+
+
+def test_percentiles() -> None:
+    report = LoadReport(
+        concurrency=1, calls=100, elapsed=2.0, latencies=tuple(range(1, 101))
+    )
+
+    assert (report.p50, report.p95, report.p99) == (50, 95, 99)
+    assert report.throughput == 50
+
+
+def test_sgs_payload() -> None:
+    text = sgs_payload(433, [date(2024, 1, 2), date(2024, 1, 3)]).decode()
+
+    assert text == (
+        '[{"data":"02/01/2024","valor":"433.00"},'
+        '{"data":"03/01/2024","valor":"433.01"}]'
+    )